@@ -0,0 +1,93 @@
+"""Przepustowość lokalnego serwera API przy wielu równoczesnych klientach.
+
+Serwer udostępnia syntetyczną playlistę i syntetyczne EPG (bez sieci). Każdy klient używa jednego
+połączenia keep-alive i na zmianę pyta o grupy, strony kanałów, wyszukiwanie i programy. Połowa
+zapytań wysyła If-None-Match z poprzednim ETag, jak przeglądarka lub ekran odświeżający dane.
+
+Użycie: python benchmarks/bench_api.py [liczba_kanałów] [liczba_klientów] [zapytań_na_klienta]
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+import statistics
+import http.client
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fastiptv  # noqa: E402
+from bench_playlist import write_synthetic_playlist  # noqa: E402
+
+
+def synthetic_epg(channels):
+    """Zbuduj EPG: kanał kanal{idx}.pl z nazwą 'Kanał {idx}' i 24 godzinnymi programami od teraz."""
+    now = int(time.time()) // 3600 * 3600
+    data = {'channel_names': {}}
+    for idx in range(channels):
+        channel_id = f"kanal{idx}.pl"
+        data['channel_names'][channel_id] = [f"Kanał {idx}"]
+        data[channel_id] = fastiptv.build_programme_schedule(
+            [(now + hour * 3600, now + (hour + 1) * 3600, f"Program {hour}", 0, 0) for hour in range(24)])
+    return data
+
+
+def client(port, paths, count, latencies, statuses):
+    """Wyślij count zapytań przez jedno połączenie; zapisz czasy i kody odpowiedzi."""
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    etags = {}
+    for number in range(count):
+        path = paths[number % len(paths)]
+        headers = {"Accept-Encoding": "gzip"}
+        if number % 2 and path in etags:
+            headers["If-None-Match"] = etags[path]
+        start = time.perf_counter()
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        statuses.append(response.status)
+        if response.getheader("ETag"):
+            etags[path] = response.getheader("ETag")
+    connection.close()
+
+
+def main(channels, clients, per_client):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "synthetic.m3u")
+        write_synthetic_playlist(path, channels)
+        fastiptv.PLAYLIST = fastiptv.load_playlist(path)
+    fastiptv.PLAYLIST.build_search_index()
+    fastiptv.install_epg_data(synthetic_epg(min(channels, 5000)))
+    url = fastiptv.start_api_server("127.0.0.1", 0)
+    port = int(url.rsplit(":", 1)[1])
+    paths = ["/api/groups", "/api/status", "/api/proxy"]
+    paths += [f"/api/channels?group={urllib.parse.quote(f'Grupa {idx}')}&limit=100" for idx in range(10)]
+    paths += [f"/api/search?q={urllib.parse.quote(query)}" for query in ("kanal 12", "Kanał 99", "kanl 5")]
+    paths += [f"/api/epg/now?group={urllib.parse.quote(f'Grupa {idx}')}" for idx in range(5)]
+
+    latencies = []
+    statuses = []
+    threads = [threading.Thread(target=client, args=(port, paths, per_client, latencies, statuses))
+               for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    fastiptv.stop_api_server()
+
+    latencies.sort()
+    print(f"{channels} kanałów, {clients} klientów x {per_client} zapytań: {elapsed:.2f} s, "
+          f"{len(latencies) / elapsed:.0f} zapytań/s")
+    print(f"  mediana {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+    print("  kody: " + ", ".join(f"{code}: {statuses.count(code)}" for code in sorted(set(statuses))))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+         int(sys.argv[3]) if len(sys.argv) > 3 else 200)
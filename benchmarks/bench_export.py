@@ -0,0 +1,77 @@
+"""Eksport playlisty M3U z katalogu: czas, szczyt pamięci i zgodność po ponownym wczytaniu.
+
+Syntetyczna playlista ma tvg-id tylko w co drugim kanale, a syntetyczne EPG zna nazwy wszystkich
+kanałów z pierwszych 5000 numerów, więc uzupełnianie tvg-id ma co robić.
+
+Użycie: python benchmarks/bench_export.py [liczba_kanałów]
+"""
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fastiptv  # noqa: E402
+
+EPG_CHANNELS = 5000
+
+
+def write_playlist(path, count):
+    """Zapisz playlistę z count kanałami w 50 grupach; tvg-id tylko w kanałach o parzystym numerze."""
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("#EXTM3U\n")
+        for idx in range(count):
+            tvg_id = f' tvg-id="kanal{idx}.pl"' if idx % 2 == 0 else ""
+            file.write(f'#EXTINF:-1{tvg_id} tvg-logo="http://logo.example/{idx}.png" '
+                       f'group-title="Grupa {idx % 50}",Kanał {idx % EPG_CHANNELS}\n')
+            if idx % 10 == 0:
+                file.write("#EXTVLCOPT:http-user-agent=Mozilla/5.0\n")
+            file.write(f"http://stream.example:8080/live/user/pass/{idx}.ts\n")
+
+
+def install_epg():
+    """Zainstaluj EPG z nazwami 'Kanał N' (bez programów - eksport potrzebuje tylko dopasowań)."""
+    data = {'channel_names': {f"kanal{idx}.pl": [f"Kanał {idx}"] for idx in range(EPG_CHANNELS)}}
+    fastiptv.install_epg_data(data)
+
+
+def measure(label, path, catalog, **kwargs):
+    start = time.perf_counter()
+    stats = fastiptv.export_playlist(path, catalog, **kwargs)
+    elapsed = time.perf_counter() - start
+    # Pamięć mierzona osobnym przebiegiem - tracemalloc zawyża czasy
+    tracemalloc.start()
+    fastiptv.export_playlist(path, catalog, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<40} {elapsed:7.2f} s  {stats['channels']:8} kanałów  {stats['bytes'] / 1024 / 1024:7.1f} MB  "
+          f"szczyt pamięci {peak / 1024 / 1024:6.1f} MB  tvg-id dla {stats['enriched']} nazw")
+    return stats
+
+
+def main(count):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, "source.m3u")
+        write_playlist(source, count)
+        catalog = fastiptv.load_playlist(source)
+        catalog.build_search_index()
+        install_epg()
+        print(f"{count} kanałów w katalogu")
+        output = os.path.join(tmp_dir, "export.m3u8")
+        measure("cała playlista", output, catalog)
+        reloaded = fastiptv.load_playlist(output)
+        same = len(reloaded) == len(catalog) and all(
+            reloaded.record(idx) == catalog.record(idx) for idx in range(0, len(catalog), max(1, len(catalog) // 1000)))
+        print(f"  ponowne wczytanie: {len(reloaded)} kanałów, rekordy zgodne: {same}")
+        measure("group=Grupa 1|Grupa 2", output, catalog, filters=["group=Grupa 1|Grupa 2"])
+        measure("name~kanał 12; group!=Grupa 3", output, catalog, filters=["name~kanał 12", "group!=Grupa 3"])
+        measure("tvg-id= (bez tvg-id) + uzupełnianie z EPG", output, catalog, filters=["tvg-id="],
+                enrich_tvg_id=True)
+        enriched = fastiptv.load_playlist(output)
+        filled = sum(1 for idx in range(len(enriched)) if enriched.channel(idx)['attrs'].get('tvg-id'))
+        print(f"  po uzupełnieniu: {filled}/{len(enriched)} kanałów ma tvg-id")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,75 @@
+"""Czas uruchomienia i przełączania kanałów przez menedżer odtwarzaczy, z udawanym VLC (benchmarks/fake_vlc.py).
+
+Użycie: python benchmarks/bench_player.py [liczba_przełączeń]
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fastiptv  # noqa: E402
+
+FAKE_VLC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_vlc.py")
+
+
+def wait_for_switches(count, timeout=30):
+    """Poczekaj, aż menedżer zapisze count pomiarów zmiany kanału."""
+    deadline = time.perf_counter() + timeout
+    while len(fastiptv.PLAYER_SWITCH_TIMES) < count and time.perf_counter() < deadline:
+        time.sleep(0.01)
+
+
+def main(switches):
+    # Pomiary zmian kanału trafiają do pliku tymczasowego, a nie do zap_metrics.jsonl użytkownika
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fastiptv.ZAP_METRICS_FILE = os.path.join(tmp_dir, "zap_metrics.jsonl")
+        measure(switches)
+
+
+def measure(switches):
+    """Uruchom udawany VLC, przełącz kanały i wypisz czasy."""
+    fastiptv.VLC_PATH = FAKE_VLC
+    try:
+        start = time.perf_counter()
+        fastiptv.play_stream_vlc("http://stream.example/1.ts", "Kanał 1")
+        print(f"play_stream_vlc wraca po {(time.perf_counter() - start) * 1000:.1f} ms (bez czekania na VLC)")
+        wait_for_switches(1)
+        pid = fastiptv.PLAYERS[0].process.pid
+        for idx in range(switches):
+            fastiptv.play_stream_vlc(f"http://stream.example/{idx + 2}.ts", f"Kanał {idx + 2}")
+            wait_for_switches(idx + 2)
+        print(f"Ten sam proces po {switches} przełączeniach: {fastiptv.PLAYERS[0].process.pid == pid} (PID {pid})")
+
+        # Opcje #EXTVLCOPT wymuszają ponowne uruchomienie
+        fastiptv.play_stream_vlc("http://stream.example/opt.ts", "Kanał z opcjami", ["http-user-agent=Test"])
+        wait_for_switches(switches + 2)
+        fastiptv.play_stream_vlc("http://stream.example/side.ts", "Obok", new_window=True)
+        wait_for_switches(switches + 3)
+        print(f"Odtwarzacze obok siebie: {[player.process.pid for player in fastiptv.PLAYERS]}")
+
+        for kind in ("uruchomienie", "przełączenie"):
+            times = sorted(latency for sample_kind, latency in fastiptv.PLAYER_SWITCH_TIMES if sample_kind == kind)
+            print(f"  {kind:<13} {len(times):3} pomiarów, mediana {times[len(times) // 2] * 1000:7.1f} ms, "
+                  f"max {times[-1] * 1000:7.1f} ms")
+
+        # Zamknięty z zewnątrz proces jest usuwany z listy przy następnym reap_players
+        fastiptv.PLAYERS[0].process.terminate()
+        fastiptv.PLAYERS[0].process.wait()
+        fastiptv.reap_players()
+        print(f"Po zamknięciu jednego okna: {len(fastiptv.PLAYERS)} odtwarzacz(e)")
+
+        # Przełączenie, zanim świeży VLC otworzy port RC - polecenie czeka w tle, menu nie jest blokowane
+        fastiptv.play_stream_vlc("http://stream.example/fresh.ts", "Świeży", new_window=True)
+        start = time.perf_counter()
+        fastiptv.play_stream_vlc("http://stream.example/early.ts", "Od razu po starcie")
+        print(f"Przełączenie tuż po starcie wraca po {(time.perf_counter() - start) * 1000:.1f} ms")
+        wait_for_switches(switches + 4)
+        print(f"  ...kanał w VLC: {fastiptv.PLAYERS[-1].channel_name}, przełączeń RC: {fastiptv.PLAYERS[-1].switches}")
+    finally:
+        fastiptv.stop_players()
+    print(f"Po stop_players: {len(fastiptv.PLAYERS)} odtwarzaczy")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,105 @@
+"""Porównanie szybkości i pamięci parsera M3U z poprzednią wersją opartą na re.findall.
+
+Użycie: python benchmarks/bench_playlist.py [liczba_kanałów ...]
+"""
+import os
+import re
+import sys
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fastiptv  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+# Poprzednia implementacja parse_playlist (punkt odniesienia)
+def legacy_parse_playlist(data):
+    """Przetwarzaj zawartość playlisty na słownik grup i kanałów (wersja z re.findall)."""
+    groups = {}
+    lines = data.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        if line.startswith("#EXTINF:"):
+            attrs = {}
+            channel_name = "Nieznany kanał"
+            if ',' in line:
+                extinf, name = line.split(',', 1)
+                channel_name = name.strip()
+            else:
+                extinf = line
+            matches = re.findall(r'([\w-]+)="([^"]+)"', extinf)
+            for key, value in matches:
+                attrs[key] = value
+            current_group = attrs.get('group-title', 'Inne')
+            i += 1
+            if i < len(lines):
+                url = lines[i].strip()
+                if url.startswith("http"):
+                    if current_group not in groups:
+                        groups[current_group] = []
+                    groups[current_group].append({
+                        'name': channel_name,
+                        'url': url,
+                    })
+        i += 1
+    return dict(sorted(groups.items()))
+
+
+def legacy_load(path):
+    """Wczytaj plik i przetwórz go poprzednią implementacją."""
+    with open(path, "r", encoding="utf-8") as file:
+        data = file.read()
+    return legacy_parse_playlist(data)
+
+
+def write_synthetic_playlist(path, count):
+    """Zapisz syntetyczną playlistę z count kanałami w 50 grupach."""
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('#EXTM3U url-tvg="http://epg.example/guide.xml"\n')
+        for idx in range(count):
+            group = f"Grupa {idx % 50}"
+            file.write(
+                f'#EXTINF:-1 tvg-id="kanal{idx}.pl" tvg-name="Kanał {idx}" '
+                f'tvg-logo="http://logo.example/{idx}.png" group-title="{group}",Kanał {idx} HD\n'
+            )
+            if idx % 10 == 0:
+                file.write("#EXTVLCOPT:http-user-agent=Mozilla/5.0\n")
+            file.write(f"http://stream.example:8080/live/user/pass/{idx}.ts\n")
+
+
+def measure(func, path, trace_memory):
+    """Zmierz czas (lub szczyt pamięci) wczytania playlisty."""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    groups = func(path)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    channels = len(groups) if isinstance(groups, fastiptv.ChannelCatalog) else sum(len(channels) for channels in groups.values())
+    return elapsed, peak, channels
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for count in sizes:
+            path = os.path.join(tmp_dir, f"synthetic_{count}.m3u")
+            write_synthetic_playlist(path, count)
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            print(f"\n{count} kanałów ({size_mb:.1f} MB)")
+            for label, func in (("legacy parse_playlist", legacy_load), ("fastiptv.load_playlist", fastiptv.load_playlist)):
+                elapsed, _, channels = measure(func, path, trace_memory=False)
+                # Pamięć mierzona osobnym przebiegiem - tracemalloc zawyża czasy
+                _, peak, _ = measure(func, path, trace_memory=True)
+                print(f"  {label:<24} {elapsed:8.3f} s  {channels / elapsed:12.0f} kanałów/s  "
+                      f"szczyt pamięci {peak / 1024 / 1024:8.1f} MB  ({channels} kanałów)")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
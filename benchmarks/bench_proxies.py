@@ -0,0 +1,159 @@
+"""Testowanie proxy na lokalnych, udawanych serwerach proxy.
+
+Kandydaci to działające proxy (odpowiedź JSON po losowym opóźnieniu), proxy zwracające HTML,
+"czarne dziury" (przyjmują połączenie i milczą) oraz zamknięte porty. Dzięki temu można zmierzyć
+run_proxy_tests bez sieci i bez zapytań do ip-api.com.
+
+Użycie: python benchmarks/bench_proxies.py [liczba_kandydatów] [--legacy]
+"""
+import os
+import sys
+import time
+import json
+import socket
+import random
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fastiptv  # noqa: E402
+
+GOOD_PROXIES = 200
+HTML_PROXIES = 100
+SILENT_PROXIES = 100
+
+
+async def fake_proxy(reader, writer, kind, delay):
+    """Obsłuż jedno połączenie udawanego proxy."""
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+        if kind == "silent":
+            await asyncio.sleep(3600)
+        await asyncio.sleep(delay)
+        if kind == "good":
+            body = json.dumps({"status": "success", "countryCode": "PL", "query": "127.0.0.1"}).encode()
+            content_type = b"application/json"
+        else:
+            body = b"<html><body>Access denied</body></html>"
+            content_type = b"text/html"
+        writer.write(b"HTTP/1.0 200 OK\r\nContent-Type: " + content_type +
+                     b"\r\nContent-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+        await writer.drain()
+    except (OSError, asyncio.IncompleteReadError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+def start_fake_proxies():
+    """Uruchom udawane proxy w osobnej pętli asyncio; zwraca listę (port, rodzaj) i pętlę."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    async def start_all():
+        listeners = []
+        for kind, count in (("good", GOOD_PROXIES), ("html", HTML_PROXIES), ("silent", SILENT_PROXIES)):
+            for _ in range(count):
+                delay = random.uniform(0.02, 0.3)
+
+                async def handler(reader, writer, kind=kind, delay=delay):
+                    await fake_proxy(reader, writer, kind, delay)
+                server = await asyncio.start_server(handler, "127.0.0.1", 0, backlog=64)
+                listeners.append((server.sockets[0].getsockname()[1], kind))
+        return listeners
+
+    return asyncio.run_coroutine_threadsafe(start_all(), loop).result(), loop
+
+
+def closed_ports(count):
+    """Zwróć numery portów, na których nikt nie nasłuchuje."""
+    ports = []
+    for _ in range(count):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        ports.append(sock.getsockname()[1])
+        sock.close()
+    return ports
+
+
+def candidates(total):
+    """Zbuduj listę kandydatów w formacie parse_proxy_data, wymieszaną losowo."""
+    listeners, loop = start_fake_proxies()
+    proxies = [{"ip": "127.0.0.1", "port": str(port), "country": None, "country_code": None, "kind": kind}
+               for port, kind in listeners]
+    proxies += [{"ip": "127.0.0.1", "port": str(port), "country": None, "country_code": None, "kind": "closed"}
+                for port in closed_ports(max(total - len(proxies), 0))]
+    random.shuffle(proxies)
+    return proxies, loop
+
+
+def legacy_test_proxy(proxy):
+    """Poprzedni test jednego proxy z fastiptv.py: zapytanie requests przez proxy i pomiar latencji."""
+    proxy_url = f"{proxy['ip']}:{proxy['port']}"
+    try:
+        proxies = {
+            "http": f"http://{proxy_url}",
+            "https": f"http://{proxy_url}",
+        }
+        start_time = time.time()
+        # Jedna sesja "proxy-test" dla wszystkich kandydatów - proxy podawane w zapytaniu
+        response = fastiptv.http_get("http://ip-api.com/json", profile="proxy-test", proxies=proxies)
+        latency = time.time() - start_time
+        if response.status_code == 200:
+            data = response.json()
+            country_code = data.get("countryCode")
+            return True, latency, country_code
+    except requests.exceptions.RequestException:
+        pass
+    return False, None, None
+
+
+def legacy_test(proxies):
+    """Poprzedni sposób: ThreadPoolExecutor(10) i requests przez proxy."""
+    results = []
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        futures = {executor.submit(legacy_test_proxy, proxy): proxy for proxy in proxies}
+        for future in as_completed(futures):
+            is_working, latency, _ = future.result()
+            results.append((futures[future], is_working, latency))
+    fastiptv.close_http_sessions("proxy-test")
+    return results
+
+
+def report(label, results, elapsed, total):
+    working = [result for result in results if result[1]]
+    wrong = sum(1 for proxy, is_working, _ in results if is_working != (proxy['kind'] == "good"))
+    print(f"  {label:<32} {elapsed:7.2f} s  przetestowano {len(results):5}/{total}  "
+          f"działa {len(working):4}  błędnie rozpoznane {wrong}")
+
+
+def main(total, legacy):
+    proxies, _ = candidates(total)
+    print(f"{len(proxies)} kandydatów ({GOOD_PROXIES} działających, {HTML_PROXIES} HTML, "
+          f"{SILENT_PROXIES} milczących, reszta zamknięte porty)")
+    start = time.perf_counter()
+    results = fastiptv.run_proxy_tests(proxies)
+    report(f"asyncio ({fastiptv.PROXY_ASYNC_CONCURRENCY} naraz)", results, time.perf_counter() - start, len(proxies))
+
+    start = time.perf_counter()
+    results = fastiptv.run_proxy_tests(proxies, max_working=fastiptv.PROXY_TEST_ENOUGH)
+    report(f"asyncio, stop po {fastiptv.PROXY_TEST_ENOUGH} działających", results, time.perf_counter() - start, len(proxies))
+
+    cancel_event = threading.Event()
+    threading.Timer(0.5, cancel_event.set).start()
+    start = time.perf_counter()
+    results = fastiptv.run_proxy_tests(proxies, cancel_event=cancel_event)
+    report("asyncio, anulowanie po 0.5 s", results, time.perf_counter() - start, len(proxies))
+
+    if legacy:
+        start = time.perf_counter()
+        results = legacy_test(proxies)
+        report("ThreadPoolExecutor(10) + requests", results, time.perf_counter() - start, len(proxies))
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--legacy"]
+    main(int(args[0]) if args else 5000, "--legacy" in sys.argv)
@@ -0,0 +1,107 @@
+"""Czas startu programu: od uruchomienia interpretera do narysowania menu głównego.
+
+run.py i fastiptv.py są kopiowane do katalogu tymczasowego (bez config.json, więc bez autoładowania EPG)
+i uruchamiane z odpowiedzią 'q' na standardowym wejściu - proces rysuje menu i od razu kończy pracę.
+Budżet obowiązuje oba sposoby startu: `python run.py` (zalecany w README) i `python -m run`. run.py to
+kilkuwierszowy plik startowy, a program w fastiptv.py jest wczytywany ze skompilowanego __pycache__
+(zapisanego przy pierwszym, rozgrzewającym uruchomieniu - jak po pierwszym starcie u użytkownika).
+Dodatkowo `python -X importtime -c "import fastiptv"` pokazuje najdroższe importy i sprawdza, że moduły
+potrzebne tylko konkretnym funkcjom (requests, asyncio, ElementTree...) nie są ładowane przy starcie.
+
+Kod wyjścia 1, gdy mediana któregokolwiek sposobu startu przekracza budżet albo przy starcie pojawi się
+któryś z ciężkich modułów (do użycia w CI).
+
+Użycie: python benchmarks/bench_startup.py [budżet_ms] [liczba_prób]
+"""
+import os
+import sys
+import time
+import shutil
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAM_FILES = ["run.py", "fastiptv.py"]
+DEFAULT_BUDGET_MS = 150
+DEFAULT_RUNS = 15
+# Moduły, które mają być importowane dopiero przy pierwszym użyciu funkcji
+LAZY_MODULES = ["requests", "urllib3", "asyncio", "xml.etree.ElementTree", "gzip", "difflib",
+                "hashlib", "concurrent.futures", "rich.traceback", "rich.progress"]
+
+
+def child_env():
+    """Środowisko procesu potomnego: stała szerokość terminala i zapisywanie plików .pyc."""
+    env = dict(os.environ, COLUMNS="120", LINES="50")
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def timed_run(args, cwd, stdin_data=b""):
+    """Uruchom proces i zwróć (czas w ms, stdout, stderr)."""
+    start = time.perf_counter()
+    result = subprocess.run(args, cwd=cwd, input=stdin_data, capture_output=True, env=child_env())
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"{args} zakończył się kodem {result.returncode}:\n{result.stderr.decode(errors='replace')}")
+    return elapsed, result.stdout, result.stderr
+
+
+def median_ms(args, cwd, runs, stdin_data=b""):
+    """Mediana czasu z runs prób (pierwsze uruchomienie rozgrzewa pamięć podręczną systemu plików)."""
+    timed_run(args, cwd, stdin_data)
+    return statistics.median(timed_run(args, cwd, stdin_data)[0] for _ in range(runs))
+
+
+def parse_importtime(stderr):
+    """Zwróć słownik moduł -> (czas własny, czas łączny) w µs z wyjścia -X importtime."""
+    modules = {}
+    for line in stderr.decode(errors="replace").splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # nagłówek
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main(budget_ms, runs):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in PROGRAM_FILES:
+            shutil.copy(os.path.join(ROOT, name), tmp_dir)
+        python = sys.executable
+        interpreter = median_ms([python, "-c", "pass"], tmp_dir, runs)
+        imported = median_ms([python, "-c", "import fastiptv"], tmp_dir, runs)
+        launches = {
+            "python run.py": median_ms([python, "run.py"], tmp_dir, runs, stdin_data=b"q\n"),
+            "python -m run": median_ms([python, "-m", "run"], tmp_dir, runs, stdin_data=b"q\n"),
+        }
+        _, _, stderr = timed_run([python, "-X", "importtime", "-c", "import fastiptv"], tmp_dir)
+
+    modules = parse_importtime(stderr)
+    print(f"Pusty interpreter:          {interpreter:7.1f} ms")
+    print(f"import fastiptv (z .pyc):   {imported:7.1f} ms")
+    for label, elapsed in launches.items():
+        print(f"{label + ' do menu:':<27} {elapsed:7.1f} ms  (budżet {budget_ms} ms, mediana z {runs} prób)")
+    print("\nNajdroższe importy (łącznie, µs):")
+    for name, (_, cumulative) in sorted(modules.items(), key=lambda item: -item[1][1])[:12]:
+        print(f"  {cumulative:8}  {name}")
+
+    eager = [name for name in LAZY_MODULES if name in modules]
+    failed = False
+    if eager:
+        print(f"\n[BŁĄD] Przy starcie importowane są: {', '.join(eager)}")
+        failed = True
+    for label, elapsed in launches.items():
+        if elapsed > budget_ms:
+            print(f"\n[BŁĄD] {label}: menu rysuje się po {elapsed:.1f} ms, budżet to {budget_ms} ms")
+            failed = True
+    if not failed:
+        print("\nOK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS,
+                  int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_RUNS))
@@ -0,0 +1,100 @@
+"""Sprawdzanie dostępności strumieni na lokalnym serwerze HTTP udającym dostawcę IPTV.
+
+Serwer zwraca playlisty HLS, strumienie MPEG-TS, błędy 404, strony HTML i wolne odpowiedzi,
+więc wynik probe_streams można porównać z oczekiwanym stanem każdego kanału.
+
+Użycie: python benchmarks/bench_streams.py [liczba_kanałów] [opóźnienie_ms]
+"""
+import os
+import sys
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fastiptv  # noqa: E402
+
+KINDS = ["hls", "ts", "dead", "html", "slow"]
+TS_PACKET = b'\x47' + b'\xff' * 187
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Odpowiedzi zależne od pierwszego segmentu ścieżki (/hls/, /ts/, /dead/, /html/, /slow/)."""
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+
+    def do_GET(self):
+        kind = self.path.strip("/").split("/", 1)[0]
+        time.sleep(self.delay)
+        if kind == "hls":
+            self.reply(200, "application/vnd.apple.mpegurl", b"#EXTM3U\n#EXT-X-VERSION:3\n#EXTINF:10,\nseg1.ts\n")
+        elif kind == "ts":
+            self.reply(200, "video/mp2t", TS_PACKET * 64)
+        elif kind == "html":
+            self.reply(200, "text/html", b"<html><body>Account expired</body></html>")
+        elif kind == "slow":
+            time.sleep(fastiptv.STREAM_PROBE_TIMEOUT[1] + 1)
+            self.reply(200, "video/mp2t", TS_PACKET)
+        else:
+            self.reply(404, "text/plain", b"not found")
+
+    def reply(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class QuietServer(ThreadingHTTPServer):
+    """Serwer bez wypisywania zerwanych połączeń (klient kończy czytanie po kilku KB)."""
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+def start_server(delay):
+    """Uruchom serwer w wątku; zwraca serwer i adres bazowy."""
+    StandInHandler.delay = delay
+    server = QuietServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main(count, delay_ms):
+    server, base_url = start_server(delay_ms / 1000)
+    channels = [(f"{base_url}/{KINDS[idx % len(KINDS)]}/{idx}", None) for idx in range(count)]
+    try:
+        summary = fastiptv.probe_streams(channels)
+        print(f"{count} kanałów, opóźnienie serwera {delay_ms} ms, {fastiptv.STREAM_PROBE_WORKERS} wątków: "
+              f"{summary['elapsed']:.2f} s ({count / summary['elapsed']:.0f} kanałów/s), działa {summary['alive']}")
+        wrong = 0
+        for url, _ in channels:
+            expected_alive = url.split("/")[3] in ("hls", "ts")
+            if fastiptv.get_stream_health(url)['alive'] != expected_alive:
+                wrong += 1
+        print(f"Błędnie rozpoznane: {wrong}")
+        summary = fastiptv.probe_streams(channels)
+        print(f"Drugie sprawdzenie (pamięć podręczna): {summary['cached']} z cache, {summary['checked']} sprawdzonych")
+        for kind in KINDS:
+            result = fastiptv.get_stream_health(f"{base_url}/{kind}/{KINDS.index(kind)}")
+            ttfb = f"{result['ttfb'] * 1000:.0f} ms" if result['ttfb'] is not None else "-"
+            print(f"  {kind:<5} alive={result['alive']!s:<5} status={result['status']} ttfb={ttfb} "
+                  f"typ={result['content_type']} rodzaj={result['kind']} błąd={result['error']}")
+    finally:
+        server.shutdown()
+    if wrong:
+        print(f"\n[BŁĄD] {wrong} kanałów rozpoznanych błędnie")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500, int(sys.argv[2]) if len(sys.argv) > 2 else 50))
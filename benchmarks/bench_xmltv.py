@@ -0,0 +1,101 @@
+"""Eksport przewodnika XMLTV dla playlisty: czas, rozmiar względem pełnego źródła i zgodność po ponownym wczytaniu.
+
+Syntetyczne źródło XMLTV ma wiele kanałów z tygodniowym planem godzinnych programów (od doby wstecz),
+a playlista zawiera tylko część z nich - jak typowy pełny przewodnik, z którego używamy ułamka kanałów.
+Czasy mają strefę źródła, która w połowie tygodnia zmienia się z +0200 na +0100 (jak przy końcu czasu letniego);
+po ponownym wczytaniu eksportu czasy i strefy muszą być takie same jak w źródle.
+
+Użycie: python benchmarks/bench_xmltv.py [kanały_EPG] [kanały_playlisty] [godziny]
+"""
+import os
+import sys
+import time
+import calendar
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fastiptv  # noqa: E402
+
+DAYS = 7
+
+
+def write_xmltv(path, channels):
+    """Zapisz XMLTV z channels kanałami i godzinnymi programami przez DAYS dni, od doby przed teraz."""
+    first = (calendar.timegm(datetime.now().timetuple()) // 3600 - 24) * 3600
+    hours = [time.strftime("%Y%m%d%H%M%S", time.gmtime(first + hour * 3600)) + (" +0200" if hour < DAYS * 12 else " +0100")
+             for hour in range(DAYS * 24 + 1)]
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n<tv>\n')
+        for idx in range(channels):
+            file.write(f'  <channel id="kanal{idx}.pl">\n    <display-name>Kanał {idx}</display-name>\n'
+                       f'    <icon src="http://logo.example/{idx}.png"/>\n  </channel>\n')
+        for idx in range(channels):
+            for hour in range(DAYS * 24):
+                file.write(f'  <programme start="{hours[hour]}" stop="{hours[hour + 1]}" channel="kanal{idx}.pl">\n'
+                           f'    <title lang="pl">Program {hour % 24} &amp; wiadomości</title>\n'
+                           f'    <desc lang="pl">Opis programu {hour} na kanale {idx}.</desc>\n  </programme>\n')
+        file.write("</tv>\n")
+
+
+def write_playlist(path, channels, epg_channels):
+    """Zapisz playlistę, której kanały pokrywają co (epg_channels // channels)-ty kanał EPG."""
+    step = max(1, epg_channels // channels)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("#EXTM3U\n")
+        for idx in range(channels):
+            file.write(f'#EXTINF:-1 group-title="Grupa {idx % 10}",Kanał {idx * step}\n'
+                       f"http://stream.example/{idx}.ts\n")
+
+
+def load_epg(path):
+    """Wczytaj plik XMLTV tak jak źródło EPG (iterparse) i zainstaluj dane."""
+    data = {}
+    with open(path, "rb") as stream:
+        count, elapsed = fastiptv.parse_epg_stream(stream, data)
+    fastiptv.install_epg_data(data)
+    return data, count, elapsed
+
+
+def schedule_entries(schedule):
+    """Zwróć plan kanału jako listę krotek (start, stop, tytuł, strefa startu, strefa końca)."""
+    return list(zip(schedule['starts'], schedule['stops'], schedule['titles'],
+                    schedule['start_offsets'], schedule['stop_offsets']))
+
+
+def main(epg_channels, playlist_channels, hours):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, "full.xml")
+        write_xmltv(source, epg_channels)
+        playlist = os.path.join(tmp_dir, "playlist.m3u")
+        write_playlist(playlist, playlist_channels, epg_channels)
+        source_size = os.path.getsize(source)
+        data, count, elapsed = load_epg(source)
+        catalog = fastiptv.load_playlist(playlist)
+        print(f"Źródło: {epg_channels} kanałów, {count} programów, {source_size / 1024 / 1024:.1f} MB "
+              f"(wczytane w {elapsed:.2f} s); playlista: {len(catalog)} kanałów; okno {hours} h")
+
+        for name in ("subset.xml", "subset.xml.gz"):
+            output = os.path.join(tmp_dir, name)
+            stats = fastiptv.export_xmltv(output, catalog, hours)
+            print(f"  {name:<14} {stats['elapsed']:6.2f} s  {stats['channels']:6} kanałów  "
+                  f"{stats['programmes']:8} programów  {stats['bytes'] / 1024:9.0f} KB  "
+                  f"{stats['bytes'] / source_size * 100:5.1f}% źródła")
+
+        # Ponowne wczytanie: te same kanały i programy co w oknie pełnego przewodnika
+        window_start = calendar.timegm(datetime.now().timetuple())
+        window_end = window_start + hours * 3600
+        matched = set(fastiptv.match_epg_ids(catalog.names).values()) - {None}
+        expected = {channel_id: [entry for entry in schedule_entries(data[channel_id])
+                                 if entry[1] > window_start and entry[0] < window_end]
+                    for channel_id in matched}
+        reloaded, _, _ = load_epg(os.path.join(tmp_dir, "subset.xml"))
+        same = set(reloaded['channel_names']) == set(expected) and all(
+            schedule_entries(reloaded[channel_id]) == entries for channel_id, entries in expected.items())
+        print(f"  ponowne wczytanie: {len(reloaded['channel_names'])} kanałów, zgodne z oknem źródła: {same}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+         int(sys.argv[3]) if len(sys.argv) > 3 else fastiptv.EXPORT_XMLTV_HOURS)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Udawany VLC do testów menedżera odtwarzaczy: przyjmuje argumenty jak VLC i obsługuje część poleceń RC.
+
+Start trwa FAKE_VLC_STARTUP sekund (domyślnie 0.8), a odtwarzanie zaczyna się FAKE_VLC_BUFFER
+sekund (domyślnie 0.2) po poleceniu add - tak jak prawdziwy VLC, który musi się uruchomić i zbuforować strumień.
+"""
+import os
+import sys
+import time
+import socket
+
+STARTUP = float(os.environ.get("FAKE_VLC_STARTUP", "0.8"))
+BUFFER = float(os.environ.get("FAKE_VLC_BUFFER", "0.2"))
+
+
+def main(args):
+    rc_host = args[args.index("--rc-host") + 1]
+    host, _, port = rc_host.rpartition(":")
+    time.sleep(STARTUP)
+    playing_from = time.monotonic() + BUFFER
+    server = socket.socket()
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind((host, int(port)))
+    server.listen(1)
+    while True:
+        client, _ = server.accept()
+        client.sendall(b"VLC media player 3.0.0 (fake)\r\nCommand Line Interface initialized. Type `help' for help.\r\n> ")
+        buffer = b""
+        while True:
+            chunk = client.recv(4096)
+            if not chunk:
+                break
+            buffer += chunk
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                command = line.decode().strip()
+                reply = ""
+                if command.startswith("add "):
+                    playing_from = time.monotonic() + BUFFER
+                elif command in ("clear", "stop"):
+                    playing_from = None
+                elif command == "is_playing":
+                    reply = "1" if playing_from is not None and time.monotonic() >= playing_from else "0"
+                elif command in ("quit", "shutdown"):
+                    client.sendall(b"Shutting down.\r\n")
+                    client.close()
+                    return
+                client.sendall((reply + "\r\n" if reply else "") .encode() + b"> ")
+        client.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,4699 @@
+import os
+import sys
+import json
+import gc
+import time
+import threading
+import importlib
+import logging
+from datetime import datetime, timedelta
+from rich.console import Console
+from rich.table import Table
+from rich.prompt import Prompt
+from rich.text import Text
+from rich.panel import Panel
+from rich.theme import Theme
+from rich import box
+import io
+import unicodedata
+import bisect
+import calendar
+import urllib.parse
+import pickle
+from array import array
+
+
+# Moduł importowany dopiero przy pierwszym użyciu (krótszy start programu)
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+
+# Moduły potrzebne tylko przy pobieraniu, testach proxy, EPG i pamięci podręcznej
+asyncio = LazyModule("asyncio")
+requests = LazyModule("requests")
+ET = LazyModule("xml.etree.ElementTree")
+gzip = LazyModule("gzip")
+difflib = LazyModule("difflib")  # Do porównywania nazw kanałów
+hashlib = LazyModule("hashlib")
+socket = LazyModule("socket")
+subprocess = LazyModule("subprocess")
+concurrent_futures = LazyModule("concurrent.futures")  # Pule wątków (EPG, scalanie playlist, sprawdzanie strumieni)
+
+# Funkcja do uzyskiwania ścieżki bazowej
+def get_base_path():
+    """Zwraca ścieżkę bazową do zasobów."""
+    if getattr(sys, 'frozen', False):
+        # PyInstaller tworzy atrybut 'frozen'
+        return os.path.dirname(sys.executable)
+    else:
+        return os.path.dirname(os.path.abspath(__file__))
+
+def resource_path(relative_path):
+    """Zwraca pełną ścieżkę do zasobu."""
+    base_path = get_base_path()
+    return os.path.join(base_path, relative_path)
+
+# Konfiguracja Rich i logowania
+custom_theme = Theme({
+    "title": "bold magenta",
+    "options": "bold cyan",
+    "highlight": "bold yellow",
+    "error": "bold red",
+    "success": "bold green",
+    "info": "bold blue"
+})
+console = Console(theme=custom_theme)
+
+# Funkcja do formatowania nieobsłużonych wyjątków przez Rich
+def rich_excepthook(exc_type, exc_value, exc_traceback):
+    """Zainstaluj rich.traceback przy pierwszym nieobsłużonym wyjątku (import kosztuje kilkadziesiąt ms startu)."""
+    from rich.traceback import install
+    install()
+    sys.excepthook(exc_type, exc_value, exc_traceback)
+
+sys.excepthook = rich_excepthook  # Rich będzie formatował tracebacki
+
+# Konfiguracja logowania (plik otwierany dopiero przy pierwszym wpisie)
+LOG_FILE = "error.log"
+logging.basicConfig(
+    handlers=[logging.FileHandler(resource_path(LOG_FILE), delay=True)],
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Globalne zmienne
+PLAYLIST = None  # ChannelCatalog po załadowaniu playlisty
+CURRENT_GROUP = "Wszystkie"
+PROXY_URL = None
+VLC_PATH = None
+EPG_DATA = {}
+EPG_LOADED = False  # Flaga informująca, czy EPG zostało załadowane
+EPG_MATCH_INDEX = {'exact': {}, 'names': [], 'trigrams': {}, 'cache': {}}
+EPG_MATCH_CANDIDATES = 50  # Liczba kandydatów przekazywanych do dopasowania rozmytego
+EPG_LOCK = threading.Lock()  # Chroni podmianę EPG_DATA/EPG_MATCH_INDEX przez wątek ładujący
+EPG_LOAD_STATUS = {'running': False, 'started_at': None, 'finished_at': None, 'sources': {}}
+EPG_AUTOLOAD = False  # Czy ładować wszystkie źródła EPG w tle przy starcie
+EXTINF_KEY_CACHE = {}  # Segment ' klucz=' z linii #EXTINF -> klucz atrybutu
+XMLTV_OFFSET_CACHE = {}  # Strefa z końca czasu XMLTV (np. " +0200") -> przesunięcie w minutach
+SEARCH_FUZZY_CANDIDATES = 20  # Maksymalna liczba wyników przybliżonych w wyszukiwaniu
+SEARCH_FUZZY_SCAN_LIMIT = 20000  # Ile wpisów list n-gramów można przejrzeć przy wyszukiwaniu przybliżonym
+# Litery, których NFKD nie rozkłada na literę bazową i znak diakrytyczny
+FOLD_TRANSLATION = str.maketrans({'ł': 'l', 'đ': 'd', 'ø': 'o', 'ħ': 'h', 'ı': 'i'})
+EPG_SOURCES = []
+EPG_WORKERS = 4  # Liczba równolegle pobieranych źródeł EPG
+DEFAULT_EPG_SOURCES = [
+    "http://epg.ovh/pl/plar.xml",
+    "http://epg.ovh/pl/pl.xml",
+    # Możesz dodać inne polskie źródła EPG
+]
+
+# Domyślne źródła proxy
+DEFAULT_PROXY_SOURCES = {
+    "FreeProxyList": "https://raw.githubusercontent.com/clarketm/proxy-list/master/proxy-list-raw.txt",
+    "ProxyScrape": "https://api.proxyscrape.com/v2/?request=getproxies&protocol=http&timeout=10000&country=all",
+    "GeoNode": "https://proxylist.geonode.com/api/proxy-list?limit=500&page=1&sort_by=lastChecked&sort_type=desc&protocols=http",
+}
+
+# Ścieżka do konfiguracji i playlists
+CONFIG_FILE = "config.json"
+PLAYLISTS_DIR = "playlists"  # Upewnij się, że nazwa folderu jest zgodna
+
+# Pamięć podręczna playlist (plik obok playlisty)
+PLAYLIST_CACHE_SUFFIX = ".cache"
+PLAYLIST_CACHE_VERSION = 3
+PLAYLIST_MERGE_WORKERS = 4  # Liczba równolegle wczytywanych playlist przy scalaniu
+MERGE_SOURCES = {}  # ścieżka playlisty -> rozmiar, mtime i katalog z ostatniego scalania (tylko bieżące pliki)
+
+# Zdalne playlisty (nazwa -> URL), pobierane strumieniowo w tle
+REMOTE_PLAYLISTS = {}
+REMOTE_PLAYLISTS_CACHE_DIR = "remote"
+PLAYLIST_LOCK = threading.Lock()
+PLAYLIST_LOAD_STATUS = {'running': False, 'source': None, 'status': None, 'channels': 0, 'bytes': 0,
+                        'started_at': None, 'first_channel_at': None, 'finished_at': None}
+
+# Sprawdzanie dostępności strumieni
+STREAM_HEALTH = {}  # adres strumienia -> wynik ostatniego sprawdzenia
+STREAM_PROBE_TTL = 600  # Po tylu sekundach wynik sprawdzenia strumienia jest nieaktualny
+STREAM_PROBE_WORKERS = 32  # Liczba równolegle sprawdzanych strumieni
+STREAM_PROBE_BYTES = 4096  # Tyle bajtów strumienia wystarcza do rozpoznania HLS/MPEG-TS
+STREAM_PROBE_TIMEOUT = (3, 5)  # Limit czasu połączenia i odczytu przy sprawdzaniu strumienia
+
+# Pamięć podręczna EPG na dysku
+EPG_CACHE_DIR = "epg_cache"
+EPG_CACHE_INDEX = "index.json"
+EPG_CACHE_VERSION = 2
+EPG_CACHE_TTL_HOURS = 12  # Przez tyle godzin EPG z cache jest używane bez pytania serwera
+EPG_CACHE_MAX_AGE_DAYS = 7  # Starsze wpisy są usuwane
+EPG_CACHE_MAX_MB = 200  # Limit rozmiaru cache (usuwane najdawniej używane)
+EPG_CACHE_LOCK = threading.Lock()  # Serializuje odczyt-modyfikację-zapis index.json przez równoległe wątki EPG
+AVAILABLE_PROXY_SOURCES = {}
+ENABLED_PROXY_SOURCES = []
+HTTP_SESSIONS = {}  # (profil, proxy) -> requests.Session z pulą połączeń
+POOLED_ADAPTER_CLASS = None  # Tworzona przy pierwszej sesji (pooled_adapter_class)
+HTTP_LOCK = threading.Lock()
+HTTP_STATS = {'requests': 0, 'opened': 0}  # Zapytania i nowo otwarte połączenia (reszta to połączenia ponownie użyte)
+HTTP_MAX_HOSTS = 32  # Ile pul (hostów) trzyma jedna sesja
+HTTP_MAX_PER_HOST = 8  # Limit równoczesnych połączeń do jednego hosta
+HTTP_RETRIES = 3  # Ponowienia po błędzie połączenia/odczytu i statusach 429/5xx
+HTTP_BACKOFF_FACTOR = 0.5  # Odstęp ponowień: 0.5 s, 1 s, 2 s...
+HTTP_TIMEOUT = (5, 30)  # Limit czasu połączenia i odczytu
+PROXY_TEST_MAX_PER_HOST = 2
+PROXY_TEST_TIMEOUT = (5, 5)  # Testy proxy bez ponowień i z krótkim limitem czasu
+PROXY_TEST_URL = "http://ip-api.com/json"  # Adres sprawdzany przez testowane proxy (odpowiedź JSON z countryCode)
+PROXY_ASYNC_CONCURRENCY = 500  # Liczba równocześnie testowanych proxy
+PROXY_CONNECT_TIMEOUT = 2.0  # Wstępny test TCP - proxy, z którym nie da się połączyć, odpada od razu
+PROXY_HTTP_TIMEOUT = 5.0  # Limit czasu na odpowiedź HTTP przez proxy
+PROXY_RESPONSE_LIMIT = 65536
+PROXY_TEST_ENOUGH = 50  # Testy kończą się po znalezieniu tylu działających proxy (tyle pokazuje wybór proxy)
+PROXY_DB = None  # Baza wyników testów proxy (wczytywana przy pierwszym użyciu)
+PROXY_DB_FILE = "proxy_stats.json"
+PROXY_DB_LOCK = threading.RLock()  # Baza jest zmieniana przez monitor proxy i czytana przez menu
+PROXY_DB_HALF_LIFE_HOURS = 24  # Po tylu godzinach wynik testu waży o połowę mniej
+PROXY_DB_LATENCY_SAMPLES = 20  # Ile ostatnich pomiarów latencji pamiętać
+PROXY_DB_MAX_AGE_DAYS = 14  # Proxy niedziałające od tylu dni są usuwane z bazy
+PROXY_DB_MAX_ENTRIES = 5000
+PROXY_DB_RETEST = 100  # Ile najlepszych proxy z bazy sprawdzać w trybie "sprawdzone wcześniej"
+PROXY_MONITOR_INTERVAL = 30  # Co ile sekund monitor sprawdza aktywne i zapasowe proxy
+PROXY_MONITOR_FAILURES = 2  # Po tylu nieudanych sprawdzeniach z rzędu proxy jest przełączane
+PROXY_MONITOR_MAX_LATENCY = 3.0  # Wolniejsze proxy (w sekundach) liczy się jako niedziałające
+PROXY_MONITOR_EVENTS = 20  # Ile ostatnich zdarzeń monitora pamiętać
+PROXY_STANDBY_SIZE = 5  # Liczba zapasowych proxy sprawdzanych w tle
+PROXY_MONITOR_LOCK = threading.Lock()  # Chroni PROXY_URL przy przełączaniu oraz pulę zapasową i zdarzenia monitora
+PLAYERS = []  # Uruchomione procesy VLC (VLCPlayer); ostatni dostaje kolejne kanały
+PLAYER_LOCK = threading.Lock()
+PLAYER_RC_TIMEOUT = 2.0  # Limit czasu odpowiedzi interfejsu RC VLC
+PLAYER_RC_STARTUP_WAIT = 5.0  # Jak długo czekać na port RC świeżo uruchomionego VLC
+PLAYER_SWITCH_TIMEOUT = 15.0  # Jak długo mierzyć czas do rozpoczęcia odtwarzania
+PLAYER_SWITCH_SAMPLES = 100
+PLAYER_SWITCH_TIMES = []  # (rodzaj, czas w s) ostatnich uruchomień i przełączeń kanału
+ZAP_METRICS_FILE = "zap_metrics.jsonl"  # Pomiary faz zmiany kanału (jeden rekord JSON na linię)
+ZAP_METRICS_MAX_MB = 10  # Większy plik jest przenoszony do .1 i zaczynany od nowa
+ZAP_PROBE_STREAM = False  # Czy przed startem VLC mierzyć pierwszy bajt strumienia osobnym zapytaniem (zap_probe_stream)
+ZAP_LOCK = threading.Lock()
+ZAP_PHASES = {
+    'epg': "EPG w tabeli kanałów",
+    'vlc_path': "Ścieżka do VLC",
+    'stream_ttfb': "Pierwszy bajt strumienia",
+    'launch': "Start VLC / polecenie RC",
+    'playing': "Do rozpoczęcia odtwarzania",
+    'total': "Całość",
+}
+PROXY_MONITOR_STATUS = {'thread': None, 'stop_event': None, 'standby': {}, 'failures': 0,
+                        'last_check': None, 'latency': None, 'events': []}
+CLI_EXIT_PARTIAL = 3  # Kod wyjścia trybu wsadowego, gdy zawiodła tylko część źródeł (2 zajmuje argparse)
+API_SERVER = None  # Lokalny serwer HTTP/JSON (start_api_server)
+API_SERVER_CLASSES = None  # Tworzone przy pierwszym starcie (api_server_classes)
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+API_CACHE = {}  # (ścieżka, parametry) -> (wersja stanu, gotowa odpowiedź)
+API_CACHE_LOCK = threading.Lock()
+STATE_VERSION = 0  # Rośnie przy każdej podmianie lub zmianie PLAYLIST i EPG_DATA (bump_state_version)
+STATE_VERSION_LOCK = threading.Lock()
+API_BUILD_LOCKS = [threading.Lock() for _ in range(16)]  # Blokady budowania odpowiedzi (wg skrótu zapytania)
+API_CACHE_SIZE = 256  # Ile gotowych odpowiedzi pamiętać
+API_DEFAULT_LIMIT = 100  # Domyślna liczba kanałów na stronę
+API_MAX_LIMIT = 1000
+API_GZIP_MIN_BYTES = 1024  # Mniejsze odpowiedzi nie są kompresowane
+API_GZIP_LEVEL = 6
+EXPORT_DIR = "exports"  # Domyślny folder eksportowanych playlist
+EXPORT_BUFFER_BYTES = 1024 * 1024  # Bufor zapisu eksportu (plik jest pisany kanał po kanale)
+EXPORT_GZIP_LEVEL = 6
+EXPORT_XMLTV_HOURS = 48  # Okno czasowe eksportowanego przewodnika XMLTV (od teraz)
+CHANNEL_FILTER_OPS = ("!=", "!~", "^=", "=", "~")  # Operatory filtrów kanałów (dłuższe sprawdzane najpierw)
+
+# Funkcja do załadowania konfiguracji
+def load_config():
+    """Załaduj konfigurację z pliku JSON."""
+    global ENABLED_PROXY_SOURCES, AVAILABLE_PROXY_SOURCES, VLC_PATH, EPG_SOURCES
+    global EPG_CACHE_TTL_HOURS, EPG_CACHE_MAX_AGE_DAYS, EPG_CACHE_MAX_MB, EPG_AUTOLOAD, REMOTE_PLAYLISTS
+    global HTTP_MAX_PER_HOST, HTTP_RETRIES, API_HOST, API_PORT, EXPORT_XMLTV_HOURS, ZAP_PROBE_STREAM
+    config_path = resource_path(CONFIG_FILE)
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, "r", encoding="utf-8") as file:
+                config = json.load(file)
+            AVAILABLE_PROXY_SOURCES = config.get("available_proxy_sources", DEFAULT_PROXY_SOURCES)
+            ENABLED_PROXY_SOURCES = config.get("enabled_proxy_sources", list(AVAILABLE_PROXY_SOURCES.keys()))
+            VLC_PATH = config.get("vlc_path")
+            EPG_SOURCES = config.get("epg_sources", DEFAULT_EPG_SOURCES)
+            EPG_CACHE_TTL_HOURS = config.get("epg_cache_ttl_hours", EPG_CACHE_TTL_HOURS)
+            EPG_CACHE_MAX_AGE_DAYS = config.get("epg_cache_max_age_days", EPG_CACHE_MAX_AGE_DAYS)
+            EPG_CACHE_MAX_MB = config.get("epg_cache_max_mb", EPG_CACHE_MAX_MB)
+            EPG_AUTOLOAD = config.get("epg_autoload", EPG_AUTOLOAD)
+            REMOTE_PLAYLISTS = config.get("remote_playlists", {})
+            HTTP_MAX_PER_HOST = config.get("http_max_per_host", HTTP_MAX_PER_HOST)
+            HTTP_RETRIES = config.get("http_retries", HTTP_RETRIES)
+            API_HOST = config.get("api_host", API_HOST)
+            API_PORT = config.get("api_port", API_PORT)
+            EXPORT_XMLTV_HOURS = config.get("export_xmltv_hours", EXPORT_XMLTV_HOURS)
+            ZAP_PROBE_STREAM = config.get("zap_probe_stream", ZAP_PROBE_STREAM)
+        except Exception as e:
+            logging.warning(f"Nie udało się załadować konfiguracji: {e}")
+            AVAILABLE_PROXY_SOURCES = DEFAULT_PROXY_SOURCES.copy()
+            ENABLED_PROXY_SOURCES = list(AVAILABLE_PROXY_SOURCES.keys())
+            EPG_SOURCES = DEFAULT_EPG_SOURCES.copy()
+    else:
+        # Jeśli plik konfiguracyjny nie istnieje, użyj domyślnych wartości
+        AVAILABLE_PROXY_SOURCES = DEFAULT_PROXY_SOURCES.copy()
+        ENABLED_PROXY_SOURCES = list(AVAILABLE_PROXY_SOURCES.keys())
+        EPG_SOURCES = DEFAULT_EPG_SOURCES.copy()
+
+# Funkcja do zapisania konfiguracji
+def save_config():
+    """Zapisz konfigurację do pliku JSON."""
+    config = {
+        "available_proxy_sources": AVAILABLE_PROXY_SOURCES,
+        "enabled_proxy_sources": ENABLED_PROXY_SOURCES,
+        "vlc_path": VLC_PATH,
+        "epg_sources": EPG_SOURCES,
+        "epg_cache_ttl_hours": EPG_CACHE_TTL_HOURS,
+        "epg_cache_max_age_days": EPG_CACHE_MAX_AGE_DAYS,
+        "epg_cache_max_mb": EPG_CACHE_MAX_MB,
+        "epg_autoload": EPG_AUTOLOAD,
+        "remote_playlists": REMOTE_PLAYLISTS,
+        "http_max_per_host": HTTP_MAX_PER_HOST,
+        "http_retries": HTTP_RETRIES,
+        "api_host": API_HOST,
+        "api_port": API_PORT,
+        "export_xmltv_hours": EXPORT_XMLTV_HOURS,
+        "zap_probe_stream": ZAP_PROBE_STREAM,
+    }
+    config_path = resource_path(CONFIG_FILE)
+    try:
+        with open(config_path, "w", encoding="utf-8") as file:
+            json.dump(config, file, indent=4)
+    except Exception as e:
+        logging.error(f"Nie udało się zapisać konfiguracji: {e}")
+
+# Funkcja do tworzenia adaptera requests z pulami liczącymi połączenia
+def pooled_adapter_class():
+    """Zwróć klasę adaptera używającego pul z licznikami (także dla połączeń przez proxy).
+
+    Klasy powstają przy pierwszej sesji HTTP, bo dziedziczą po urllib3/requests, których import
+    wydłużałby start programu. Wywoływana pod HTTP_LOCK.
+    """
+    global POOLED_ADAPTER_CLASS
+    if POOLED_ADAPTER_CLASS is not None:
+        return POOLED_ADAPTER_CLASS
+    from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+
+    # Połączenia liczone przy tworzeniu; pula wstawia je przez publiczny atrybut ConnectionCls
+    class CountingHTTPConnection(HTTPConnection):
+        def __init__(self, *args, **kwargs):
+            count_http_event('opened')
+            super().__init__(*args, **kwargs)
+
+    class CountingHTTPSConnection(HTTPSConnection):
+        def __init__(self, *args, **kwargs):
+            count_http_event('opened')
+            super().__init__(*args, **kwargs)
+
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = CountingHTTPConnection
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = CountingHTTPSConnection
+
+    pool_classes = {'http': CountingHTTPConnectionPool, 'https': CountingHTTPSConnectionPool}
+
+    # Adapter liczący wysłane zapytania
+    class PooledHTTPAdapter(requests.adapters.HTTPAdapter):
+        def send(self, request, *args, **kwargs):
+            count_http_event('requests')
+            return super().send(request, *args, **kwargs)
+
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = pool_classes
+
+        def proxy_manager_for(self, proxy, **proxy_kwargs):
+            manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+            manager.pool_classes_by_scheme = pool_classes
+            return manager
+
+    POOLED_ADAPTER_CLASS = PooledHTTPAdapter
+    return POOLED_ADAPTER_CLASS
+
+# Funkcja do zliczania zdarzeń warstwy HTTP
+def count_http_event(name):
+    """Zwiększ licznik w HTTP_STATS."""
+    with HTTP_LOCK:
+        HTTP_STATS[name] += 1
+
+# Funkcja do odczytu liczników połączeń
+def http_stats():
+    """Zwróć liczbę zapytań, nowo otwartych i ponownie użytych połączeń."""
+    with HTTP_LOCK:
+        requests_count, opened = HTTP_STATS['requests'], HTTP_STATS['opened']
+    return {'requests': requests_count, 'opened': opened, 'reused': max(requests_count - opened, 0)}
+
+# Funkcja do wyznaczania ustawień profilu HTTP
+def http_profile(profile):
+    """Zwróć (limit połączeń na host, liczba ponowień, limit czasu) dla profilu sesji."""
+    if profile == "probe":
+        return STREAM_PROBE_WORKERS, 0, STREAM_PROBE_TIMEOUT
+    if profile == "proxy-test":
+        return PROXY_TEST_MAX_PER_HOST, 0, PROXY_TEST_TIMEOUT
+    return HTTP_MAX_PER_HOST, HTTP_RETRIES, HTTP_TIMEOUT
+
+# Funkcja do pobierania współdzielonej sesji HTTP
+def get_http_session(proxy=None, profile="default"):
+    """Zwróć sesję z pulą połączeń dla danego proxy (IP:PORT lub None) i profilu; sesje są tworzone raz."""
+    key = (profile, proxy)
+    with HTTP_LOCK:
+        session = HTTP_SESSIONS.get(key)
+        if session is not None:
+            return session
+        per_host, retries, _ = http_profile(profile)
+        retry = 0  # Bez ponowień requests zgłasza oryginalny błąd (np. ReadTimeout)
+        if retries:
+            from urllib3.util.retry import Retry
+            # Przekierowania obsługuje requests, więc urllib3 ponawia tylko błędy połączenia/odczytu i statusy
+            retry = Retry(total=None, connect=retries, read=retries, status=retries, other=retries,
+                          backoff_factor=HTTP_BACKOFF_FACTOR, status_forcelist=(429, 500, 502, 503, 504),
+                          raise_on_status=False)
+        # pool_block=True - limit połączeń na host jest twardy, nadmiarowe wątki czekają na wolne połączenie
+        adapter = pooled_adapter_class()(pool_connections=HTTP_MAX_HOSTS, pool_maxsize=per_host,
+                                         pool_block=True, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if proxy:
+            session.proxies = {"http": f"http://{proxy}", "https": f"http://{proxy}"}
+        HTTP_SESSIONS[key] = session
+        return session
+
+# Funkcja do wykonywania zapytania GET przez współdzieloną sesję
+def http_get(url, proxy=None, profile="default", timeout=None, **kwargs):
+    """Wykonaj GET przez sesję z puli; domyślny limit czasu pochodzi z profilu."""
+    if timeout is None:
+        timeout = http_profile(profile)[2]
+    return get_http_session(proxy, profile).get(url, timeout=timeout, **kwargs)
+
+# Funkcja do zamykania sesji HTTP
+def close_http_sessions(profile=None, keep_proxy=None):
+    """Zamknij i zapomnij sesje danego profilu (lub wszystkie) poza sesją proxy keep_proxy, zwalniając połączenia."""
+    with HTTP_LOCK:
+        keys = [key for key in HTTP_SESSIONS
+                if (profile is None or key[0] == profile) and (keep_proxy is None or key[1] != keep_proxy)]
+        sessions = [HTTP_SESSIONS.pop(key) for key in keys]
+    for session in sessions:
+        session.close()
+
+# Funkcja do zwalniania sesji testów proxy
+def release_proxy_test_sessions():
+    """Zamknij sesje "proxy-test" po serii testów; zostaje tylko sesja aktywnego proxy (keep-alive monitora)."""
+    close_http_sessions("proxy-test", keep_proxy=PROXY_URL)
+
+# Funkcja do zarządzania źródłami EPG
+def configure_epg_sources():
+    """Zarządzaj źródłami EPG (dodaj/usuń własne)."""
+    global EPG_SOURCES
+    while True:
+        options = EPG_SOURCES + ["Dodaj własne źródło", "Usuń źródło", "Zapisz i powrót"]
+        choice = display_menu(options, "Zarządzanie źródłami EPG")
+        if choice is None or choice == len(options) - 1:
+            save_config()
+            console.print("[success]Zapisano zmiany w źródłach EPG.[/success]")
+            wait_for_enter("Naciśnij Enter, aby powrócić do menu głównego...")
+            break
+        elif choice == len(options) - 3:
+            add_custom_epg_source()
+        elif choice == len(options) - 2:
+            remove_epg_source()
+        else:
+            # Wyświetl podgląd wybranego źródła
+            console.print(f"[info]Źródło EPG: {EPG_SOURCES[choice]}[/info]")
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+
+# Funkcja do dodawania własnego źródła EPG
+def add_custom_epg_source():
+    """Dodaj własne źródło EPG."""
+    global EPG_SOURCES
+    url = Prompt.ask("[bold yellow]Podaj URL nowego źródła EPG[/bold yellow]").strip()
+    if url:
+        if url in EPG_SOURCES:
+            console.print("[error]Takie źródło EPG już istnieje.[/error]")
+        else:
+            EPG_SOURCES.append(url)
+            console.print(f"[success]Dodano nowe źródło EPG: {url}[/success]")
+    else:
+        console.print("[error]URL nie może być pusty.[/error]")
+
+# Funkcja do usuwania źródła EPG
+def remove_epg_source():
+    """Usuń źródło EPG."""
+    global EPG_SOURCES
+    if not EPG_SOURCES:
+        console.print("[error]Brak źródeł EPG do usunięcia.[/error]")
+        wait_for_enter("Naciśnij Enter, aby kontynuować...")
+        return
+    options = EPG_SOURCES + ["Anuluj"]
+    choice = display_menu(options, "Usuń źródło EPG")
+    if choice is not None and choice < len(EPG_SOURCES):
+        source_to_remove = EPG_SOURCES[choice]
+        EPG_SOURCES.remove(source_to_remove)
+        console.print(f"[success]Usunięto źródło EPG: {source_to_remove}[/success]")
+    else:
+        console.print("[info]Anulowano usuwanie źródła.[/info]")
+
+# Funkcja do pobierania i parsowania EPG
+def load_epg():
+    """Uruchom ładowanie danych EPG w tle (lub pokaż postęp trwającego ładowania)."""
+    if EPG_LOAD_STATUS['running']:
+        show_epg_load_status()
+        return
+    # Pozwól użytkownikowi wybrać źródło EPG
+    if not EPG_SOURCES:
+        console.print("[error]Brak dostępnych źródeł EPG. Dodaj źródło w konfiguracji EPG.[/error]")
+        return
+
+    choice = display_menu(EPG_SOURCES + ["Wszystkie źródła (równolegle)", "Pokaż stan ładowania"], "Wybierz źródło EPG")
+    if choice is None:
+        console.print("[info]Anulowano ładowanie EPG.[/info]")
+        return
+    if choice == len(EPG_SOURCES) + 1:
+        show_epg_load_status()
+        return
+    sources = list(EPG_SOURCES) if choice == len(EPG_SOURCES) else [EPG_SOURCES[choice]]
+    start_epg_background_load(sources)
+    console.print("[success]Ładowanie EPG rozpoczęte w tle. Programy pojawią się na listach kanałów, gdy dane będą gotowe.[/success]")
+
+# Funkcja do uruchamiania ładowania EPG w tle
+def start_epg_background_load(sources):
+    """Uruchom wątek ładujący EPG; zwraca False, jeśli ładowanie już trwa."""
+    with EPG_LOCK:
+        if EPG_LOAD_STATUS['running']:
+            return False
+        EPG_LOAD_STATUS['running'] = True
+        EPG_LOAD_STATUS['started_at'] = time.time()
+        EPG_LOAD_STATUS['finished_at'] = None
+        EPG_LOAD_STATUS['sources'] = {
+            source: {'status': "oczekuje", 'fetch_time': 0.0, 'parse_time': 0.0, 'programmes': 0}
+            for source in sources
+        }
+    thread = threading.Thread(target=run_epg_load, args=(sources,), name="epg-loader", daemon=True)
+    thread.start()
+    return True
+
+# Funkcja wykonywana w wątku ładującym EPG
+def run_epg_load(sources):
+    """Pobierz źródła EPG i podmieniaj przewodnik po każdym ukończonym źródle."""
+    completed = [None] * len(sources)
+
+    def on_progress(source, programme_count, elapsed):
+        EPG_LOAD_STATUS['sources'][source].update(
+            status="przetwarzanie", programmes=programme_count, parse_time=elapsed)
+
+    def on_done(idx, data, stats):
+        EPG_LOAD_STATUS['sources'][sources[idx]] = stats
+        completed[idx] = data
+        # Scal ukończone źródła (w kolejności priorytetu) i podmień przewodnik w całości
+        install_epg_data(merge_epg_data([data for data in completed if data]))
+
+    try:
+        fetch_epg_sources(sources, on_done, on_progress)
+    except Exception as e:
+        logging.exception(f"Błąd podczas ładowania EPG w tle: {e}")
+    finally:
+        with EPG_LOCK:
+            EPG_LOAD_STATUS['running'] = False
+            EPG_LOAD_STATUS['finished_at'] = time.time()
+        for source, stats in EPG_LOAD_STATUS['sources'].items():
+            logging.info(f"EPG {source}: {stats['status']}, pobieranie {stats['fetch_time']:.2f} s, "
+                         f"przetwarzanie {stats['parse_time']:.2f} s, {stats['programmes']} programów")
+
+# Funkcja do atomowej podmiany danych EPG
+def install_epg_data(data):
+    """Podmień EPG_DATA i indeks dopasowań jednym przypisaniem; czytelnicy nie widzą stanu pośredniego."""
+    global EPG_DATA, EPG_MATCH_INDEX, EPG_LOADED
+    index = build_epg_match_index(data)
+    with EPG_LOCK:
+        EPG_DATA = data
+        EPG_MATCH_INDEX = index
+        EPG_LOADED = True
+        bump_state_version()
+
+# Funkcja do wyświetlania stanu ładowania EPG
+def show_epg_load_status():
+    """Wyświetl stan ładowania EPG dla każdego źródła."""
+    if not EPG_LOAD_STATUS['sources']:
+        console.print("[info]EPG nie było jeszcze ładowane.[/info]")
+        return
+    table = Table(show_header=True, header_style="bold magenta", box=box.ROUNDED)
+    table.add_column("Źródło", style="options")
+    table.add_column("Status", style="highlight")
+    table.add_column("Pobieranie", justify="right")
+    table.add_column("Przetwarzanie", justify="right")
+    table.add_column("Programy", justify="right")
+    table.add_column("Programy/s", justify="right")
+    for source, stats in list(EPG_LOAD_STATUS['sources'].items()):
+        rate = stats['programmes'] / stats['parse_time'] if stats['parse_time'] > 0 else 0
+        table.add_row(source, stats['status'], f"{stats['fetch_time']:.2f} s",
+                      f"{stats['parse_time']:.2f} s", str(stats['programmes']), f"{rate:.0f}")
+    console.print(table)
+    data = EPG_DATA
+    total = sum(len(schedule['starts']) for key, schedule in data.items() if key != 'channel_names')
+    state = "trwa ładowanie" if EPG_LOAD_STATUS['running'] else "zakończono"
+    console.print(f"[info]EPG ({state}): {len(data.get('channel_names', {}))} kanałów, {total} programów.[/info]")
+    stats = http_stats()
+    console.print(f"[info]Połączenia HTTP: {stats['requests']} zapytań, {stats['opened']} nowych, "
+                  f"{stats['reused']} ponownie użytych.[/info]")
+
+# Funkcja do równoległego pobierania wielu źródeł EPG
+def fetch_epg_sources(sources, done_callback=None, progress_callback=None):
+    """Pobierz i przetwórz źródła EPG w puli wątków; zwraca listę (dane, statystyki) w kolejności źródeł."""
+    results = [None] * len(sources)
+    with concurrent_futures.ThreadPoolExecutor(max_workers=max(1, min(EPG_WORKERS, len(sources)))) as executor:
+        futures = {}
+        for idx, source in enumerate(sources):
+            data = {}
+            report = None
+            if progress_callback:
+                report = (lambda src: lambda count, elapsed: progress_callback(src, count, elapsed))(source)
+            futures[executor.submit(fetch_epg_source, source, data, report)] = (idx, source, data)
+        for future in concurrent_futures.as_completed(futures):
+            idx, source, data = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                logging.warning(f"Błąd podczas pobierania EPG z {source}: {e}")
+                data = {}
+                stats = {'status': f"błąd ({e.__class__.__name__})", 'fetch_time': 0.0, 'parse_time': 0.0, 'programmes': 0}
+            results[idx] = (data, stats)
+            if done_callback:
+                done_callback(idx, data, stats)
+    return results
+
+# Funkcja do scalania EPG z wielu źródeł
+def merge_epg_data(datasets):
+    """Scal dane EPG; wcześniejsze źródło ma pierwszeństwo, nakładające się programy są pomijane."""
+    channel_names = {}
+    entries = {}
+    for data in datasets:
+        for channel_id, names in data.get('channel_names', {}).items():
+            merged_names = channel_names.setdefault(channel_id, [])
+            merged_names.extend(name for name in names if name not in merged_names)
+        for channel_id, schedule in data.items():
+            if channel_id == 'channel_names':
+                continue
+            accepted = entries.get(channel_id)
+            incoming = list(zip(schedule['starts'], schedule['stops'], schedule['titles'],
+                                schedule['start_offsets'], schedule['stop_offsets']))
+            if accepted is None:
+                entries[channel_id] = incoming
+                continue
+            # Program z niższego priorytetu dodaj tylko, gdy nie nachodzi na już przyjęte
+            accepted_starts = [entry[0] for entry in accepted]
+            additions = []
+            for entry in incoming:
+                pos = bisect.bisect_right(accepted_starts, entry[0])
+                if pos > 0 and accepted[pos - 1][1] > entry[0]:
+                    continue
+                if pos < len(accepted) and accepted[pos][0] < entry[1]:
+                    continue
+                additions.append(entry)
+            if additions:
+                accepted.extend(additions)
+                accepted.sort()
+    merged = {channel_id: build_programme_schedule(channel_entries) for channel_id, channel_entries in entries.items()}
+    merged['channel_names'] = channel_names
+    return merged
+
+# Funkcja do pobierania jednego źródła EPG (z użyciem pamięci podręcznej)
+def fetch_epg_source(source, target, progress_callback=None):
+    """Załaduj EPG ze źródła do słownika target; zwraca statystyki ze statusem 'cache', 'network' lub 'offline'."""
+    stats = {'status': "network", 'fetch_time': 0.0, 'parse_time': 0.0, 'programmes': 0}
+    start = time.perf_counter()
+    meta = get_epg_cache_index().get(epg_cache_key(source))
+    if meta and time.time() - meta['fetched_at'] < EPG_CACHE_TTL_HOURS * 3600:
+        if load_epg_cache(source, target):
+            return epg_cache_stats(stats, "cache", target, start)
+        meta = None
+
+    headers = {}
+    if meta:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+    try:
+        response = http_get(source, stream=True, headers=headers)
+    except requests.exceptions.RequestException as e:
+        logging.warning(f"Nie udało się połączyć ze źródłem EPG {source}: {e}")
+        if meta and load_epg_cache(source, target):
+            return epg_cache_stats(stats, "offline", target, start)
+        raise
+    stats['fetch_time'] = time.perf_counter() - start
+
+    if response.status_code == 304 and headers:
+        response.close()
+        if load_epg_cache(source, target, touch_fetched=True):
+            logging.info(f"EPG z {source} nie zmieniło się (304), użyto pamięci podręcznej")
+            return epg_cache_stats(stats, "cache", target, start)
+        # Brak lub uszkodzony plik cache - 304 nic nie da, pobierz całość bez nagłówków warunkowych
+        response = http_get(source, stream=True)
+        stats['fetch_time'] = time.perf_counter() - start
+
+    # Zamknięcie odpowiedzi oddaje połączenie do puli (limit na host jest twardy)
+    with response:
+        if response.status_code != 200:
+            raise RuntimeError(f"Status {response.status_code}")
+
+        try:
+            with open_epg_stream(response, source) as stream:
+                programme_count, elapsed = parse_epg_stream(stream, target, progress_callback)
+        except Exception as e:
+            # Niepełne EPG nie trafia do cache; poprzednia kompletna wersja jest lepsza niż żadna
+            logging.warning(f"Przerwane przetwarzanie EPG z {source}: {e}")
+            if load_epg_cache(source, target):
+                return epg_cache_stats(stats, "offline", target, start)
+            raise
+    logging.info(f"EPG z {source}: {programme_count} programów w {elapsed:.1f} s")
+    save_epg_cache(source, target, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    stats['parse_time'] = elapsed
+    stats['programmes'] = programme_count
+    return stats
+
+# Funkcja do uzupełniania statystyk po wczytaniu EPG z cache
+def epg_cache_stats(stats, status, data, start):
+    """Uzupełnij statystyki źródła wczytanego z pamięci podręcznej."""
+    stats['status'] = status
+    stats['parse_time'] = time.perf_counter() - start - stats['fetch_time']
+    stats['programmes'] = sum(len(schedule['starts']) for key, schedule in data.items() if key != 'channel_names')
+    return stats
+
+# Funkcja do wyznaczania klucza cache dla źródła EPG
+def epg_cache_key(source):
+    """Zwróć nazwę pliku cache dla adresu źródła EPG."""
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+# Funkcja do odczytu indeksu cache EPG
+def get_epg_cache_index():
+    """Wczytaj indeks pamięci podręcznej EPG (metadane źródeł)."""
+    index_path = os.path.join(resource_path(EPG_CACHE_DIR), EPG_CACHE_INDEX)
+    try:
+        with open(index_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logging.warning(f"Nie udało się wczytać indeksu cache EPG: {e}")
+        return {}
+
+# Funkcja do zapisu indeksu cache EPG
+def save_epg_cache_index(index):
+    """Zapisz indeks pamięci podręcznej EPG (wywołujący trzyma EPG_CACHE_LOCK)."""
+    cache_dir = resource_path(EPG_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    index_path = os.path.join(cache_dir, EPG_CACHE_INDEX)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(index, file, indent=4)
+    os.replace(tmp_path, index_path)
+
+# Funkcja do zapisu przetworzonego EPG do cache
+def save_epg_cache(source, data, etag=None, last_modified=None):
+    """Zapisz przetworzone EPG źródła (plany i nazwy kanałów) do pamięci podręcznej."""
+    try:
+        cache_dir = resource_path(EPG_CACHE_DIR)
+        os.makedirs(cache_dir, exist_ok=True)
+        key = epg_cache_key(source)
+        data_path = os.path.join(cache_dir, key + ".bin")
+        tmp_path = data_path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump({'version': EPG_CACHE_VERSION, 'data': data}, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, data_path)
+        now = time.time()
+        with EPG_CACHE_LOCK:
+            index = get_epg_cache_index()
+            index[key] = {
+                'source': source,
+                'etag': etag,
+                'last_modified': last_modified,
+                'fetched_at': now,
+                'last_used': now,
+                'size': os.path.getsize(data_path),
+            }
+            evict_epg_cache(index)
+            save_epg_cache_index(index)
+    except Exception as e:
+        logging.error(f"Nie udało się zapisać cache EPG dla {source}: {e}")
+
+# Funkcja do wczytania EPG z cache
+def load_epg_cache(source, target, touch_fetched=False):
+    """Wczytaj EPG źródła z pamięci podręcznej do target; zwraca True przy powodzeniu."""
+    key = epg_cache_key(source)
+    data_path = os.path.join(resource_path(EPG_CACHE_DIR), key + ".bin")
+    try:
+        with open(data_path, "rb") as file:
+            payload = pickle.load(file)
+        if payload.get('version') != EPG_CACHE_VERSION:
+            return False
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        logging.warning(f"Uszkodzony cache EPG dla {source}: {e}")
+        return False
+    target.clear()
+    target.update(payload['data'])
+    try:
+        with EPG_CACHE_LOCK:
+            index = get_epg_cache_index()
+            if key in index:
+                index[key]['last_used'] = time.time()
+                if touch_fetched:
+                    index[key]['fetched_at'] = time.time()
+                save_epg_cache_index(index)
+    except Exception as e:
+        logging.warning(f"Nie udało się zaktualizować indeksu cache EPG: {e}")
+    return True
+
+# Funkcja do usuwania przeterminowanych i nadmiarowych wpisów cache EPG
+def evict_epg_cache(index):
+    """Usuń z cache wpisy starsze niż limit wieku oraz najdawniej używane ponad limit rozmiaru."""
+    cache_dir = resource_path(EPG_CACHE_DIR)
+    now = time.time()
+    max_age = EPG_CACHE_MAX_AGE_DAYS * 86400
+    max_size = EPG_CACHE_MAX_MB * 1024 * 1024
+    expired = [key for key, meta in index.items() if now - meta['fetched_at'] > max_age]
+    total_size = sum(meta['size'] for key, meta in index.items() if key not in expired)
+    # Najdawniej używane wpisy usuwamy jako pierwsze
+    for key in sorted(index, key=lambda k: index[k]['last_used']):
+        if total_size <= max_size:
+            break
+        if key not in expired:
+            expired.append(key)
+            total_size -= index[key]['size']
+    for key in expired:
+        index.pop(key, None)
+        try:
+            os.remove(os.path.join(cache_dir, key + ".bin"))
+        except FileNotFoundError:
+            pass
+        logging.info(f"Usunięto wpis cache EPG: {key}")
+
+# Funkcja do otwierania strumienia EPG z odpowiedzi HTTP
+def open_epg_stream(response, source):
+    """Zwróć strumień bajtów XMLTV czytany bezpośrednio z odpowiedzi HTTP (z rozpakowaniem .gz)."""
+    # Content-Encoding (gzip/deflate) dekoduje urllib3, plik .gz rozpakowujemy sami
+    response.raw.decode_content = True
+    content_type = response.headers.get("Content-Type", "")
+    if source.endswith('.gz') or "gzip" in content_type:
+        return gzip.GzipFile(fileobj=response.raw)
+    return response.raw
+
+# Funkcja do parsowania EPG
+def parse_epg(xml_data):
+    """Przetwórz dane EPG w formacie XMLTV."""
+    data = {}
+    parse_epg_stream(io.BytesIO(xml_data), data)
+    install_epg_data(data)
+
+# Funkcja do strumieniowego parsowania EPG
+def parse_epg_stream(stream, target, progress_callback=None, report_every=5000):
+    """Przetwórz XMLTV przyrostowo (iterparse) do słownika target, zwalniając elementy zaraz po ich odczytaniu.
+
+    Przy błędzie (np. ucięty plik) wyjątek jest przekazywany dalej, a target pozostaje nietknięty.
+    """
+    channels_info = {}
+    schedules = {}
+    programme_count = 0
+    start = time.perf_counter()
+    try:
+        context = ET.iterparse(stream, events=("start", "end"))
+        _, root = next(context)
+        for event, elem in context:
+            if event != "end":
+                continue
+            if elem.tag == 'channel':
+                channel_id = elem.get('id')
+                display_names = [name.text for name in elem.findall('display-name')]
+                channels_info[channel_id] = display_names
+            elif elem.tag == 'programme':
+                channel_id = elem.get('channel')
+                start_str = elem.get('start')
+                stop_str = elem.get('stop')
+                start_ts = xmltv_epoch(start_str)
+                stop_ts = xmltv_epoch(stop_str)
+                title = elem.findtext('title')
+                if title is None:
+                    title = "Brak tytułu"
+                if start_ts is not None and stop_ts is not None:
+                    schedules.setdefault(channel_id, []).append((start_ts, stop_ts, sys.intern(title),
+                                                                 xmltv_offset(start_str), xmltv_offset(stop_str)))
+                programme_count += 1
+                if progress_callback and programme_count % report_every == 0:
+                    progress_callback(programme_count, time.perf_counter() - start)
+            else:
+                continue
+            # Zwolnij przetworzony element i odetnij go od korzenia, aby pamięć nie rosła
+            elem.clear()
+            root.clear()
+    except Exception as e:
+        # Niepełny przewodnik nie może wyglądać na poprawny (trafiłby do cache razem z ETag)
+        logging.error(f"Błąd podczas parsowania EPG: {e}")
+        raise
+    for channel_id, entries in schedules.items():
+        target[channel_id] = build_programme_schedule(entries)
+    # Dodaj informacje o nazwach kanałów
+    target['channel_names'] = channels_info
+    elapsed = time.perf_counter() - start
+    if progress_callback:
+        progress_callback(programme_count, elapsed)
+    return programme_count, elapsed
+
+# Funkcja do parsowania czasu XMLTV na znacznik czasu
+def xmltv_epoch(time_str):
+    """Przetwórz czas XMLTV na liczbę sekund czasu ściennego źródła.
+
+    Strefa z końca napisu jest pomijana (odczytuje ją osobno xmltv_offset), a wynik porównywany jest z lokalnym
+    zegarem przeliczonym tak samo (calendar.timegm). Pola są cięte ręcznie - wielokrotnie szybciej niż strptime
+    przy setkach tysięcy programów.
+    """
+    try:
+        return calendar.timegm((int(time_str[0:4]), int(time_str[4:6]), int(time_str[6:8]),
+                                int(time_str[8:10]), int(time_str[10:12]), int(time_str[12:14])))
+    except Exception as e:
+        logging.error(f"Błąd parsowania czasu XMLTV: {e}")
+        return None
+
+# Funkcja do odczytu przesunięcia strefy z czasu XMLTV
+def xmltv_offset(time_str):
+    """Zwróć przesunięcie strefy czasu XMLTV (np. '+0200') w minutach; czas bez strefy to UTC, czyli 0."""
+    zone = time_str[14:]
+    # Przewodnik używa kilku stref, a programów są setki tysięcy - wynik zapamiętujemy
+    offset = XMLTV_OFFSET_CACHE.get(zone)
+    if offset is None:
+        text = zone.strip()
+        offset = 0
+        if len(text) == 5 and text[0] in "+-" and text[1:].isdigit():
+            offset = int(text[1:3]) * 60 + int(text[3:5])
+            if text[0] == "-":
+                offset = -offset
+        if len(XMLTV_OFFSET_CACHE) < 256:
+            XMLTV_OFFSET_CACHE[zone] = offset
+    return offset
+
+# Funkcja do zamiany znacznika czasu na datetime
+def epoch_to_datetime(timestamp):
+    """Zamień znacznik czasu z xmltv_epoch z powrotem na obiekt datetime."""
+    return datetime(1970, 1, 1) + timedelta(seconds=timestamp)
+
+# Funkcja do budowania posortowanego planu programów kanału
+def build_programme_schedule(entries):
+    """Zbuduj zwarty, posortowany plan z krotek (start, stop, tytuł, strefa startu, strefa końca).
+
+    Równoległe tablice startów/końców, tytuły oraz przesunięcia strefy ze źródła w minutach
+    (eksport XMLTV zapisuje je z powrotem, bo znaczniki to czas ścienny bez strefy).
+    """
+    entries.sort()
+    return {
+        'starts': array('q', [entry[0] for entry in entries]),
+        'stops': array('q', [entry[1] for entry in entries]),
+        'titles': [entry[2] for entry in entries],
+        'start_offsets': array('h', [entry[3] for entry in entries]),
+        'stop_offsets': array('h', [entry[4] for entry in entries]),
+    }
+
+# Funkcja do wyszukiwania programów w planie kanału
+def schedule_lookup(schedule, timestamp):
+    """Zwróć indeksy programu trwającego i następnego w chwili timestamp (O(log n))."""
+    starts = schedule['starts']
+    next_idx = bisect.bisect_right(starts, timestamp)
+    current_idx = next_idx - 1
+    if current_idx < 0 or schedule['stops'][current_idx] <= timestamp:
+        current_idx = None
+    if next_idx >= len(starts):
+        next_idx = None
+    return current_idx, next_idx
+
+# Funkcja do odczytu pojedynczego programu z planu
+def schedule_programme(schedule, idx):
+    """Zwróć program o podanym indeksie jako słownik (start, stop, title)."""
+    if idx is None:
+        return None
+    return {
+        'start': epoch_to_datetime(schedule['starts'][idx]),
+        'stop': epoch_to_datetime(schedule['stops'][idx]),
+        'title': schedule['titles'][idx],
+    }
+
+# Funkcja do normalizacji nazwy kanału
+def normalize_channel_name(name):
+    """Sprowadź nazwę kanału do postaci porównywalnej (małe litery, tylko znaki alfanumeryczne)."""
+    return " ".join("".join(ch if ch.isalnum() else " " for ch in name.casefold()).split())
+
+# Funkcja do wyznaczania trigramów nazwy
+def name_trigrams(normalized_name):
+    """Zwróć zbiór trigramów znormalizowanej nazwy (z dopełnieniem spacjami)."""
+    padded = f" {normalized_name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+# Funkcja do budowania indeksu dopasowań nazw kanałów EPG
+def build_epg_match_index(data):
+    """Zbuduj indeks nazw kanałów EPG (dokładne dopasowania + trigramy) raz na załadowanie EPG."""
+    exact = {}
+    names = []
+    trigrams = {}
+    for channel_id, display_names in data.get('channel_names', {}).items():
+        for name in display_names:
+            if not name:
+                continue
+            normalized = normalize_channel_name(name)
+            exact.setdefault(normalized, channel_id)
+            name_idx = len(names)
+            names.append((name, channel_id))
+            for gram in name_trigrams(normalized):
+                trigrams.setdefault(gram, []).append(name_idx)
+    return {
+        'exact': exact,
+        'names': names,
+        'trigrams': trigrams,
+        'cache': {},  # nazwa z playlisty -> channel_id (lub None)
+    }
+
+# Funkcja do dopasowania kanału z EPG do kanału z playlisty
+def match_channel_epg(channel_name, index=None):
+    """Znajdź najlepsze dopasowanie kanału EPG do podanej nazwy kanału."""
+    if index is None:
+        index = EPG_MATCH_INDEX
+    cache = index['cache']
+    if channel_name in cache:
+        return cache[channel_name]
+
+    normalized = normalize_channel_name(channel_name)
+    matched_channel_id = index['exact'].get(normalized)
+    if matched_channel_id is None:
+        # Zawęź kandydatów do nazw o największej liczbie wspólnych trigramów
+        shared = {}
+        for gram in name_trigrams(normalized):
+            for name_idx in index['trigrams'].get(gram, ()):
+                shared[name_idx] = shared.get(name_idx, 0) + 1
+        best = sorted(shared, key=shared.get, reverse=True)[:EPG_MATCH_CANDIDATES]
+        names = index['names']
+        candidate_ids = {names[name_idx][0]: names[name_idx][1] for name_idx in best}
+        # Użyj funkcji get_close_matches tylko na zawężonej liście kandydatów
+        matches = difflib.get_close_matches(channel_name, list(candidate_ids), n=1, cutoff=0.6)
+        if matches:
+            matched_channel_id = candidate_ids[matches[0]]
+    cache[channel_name] = matched_channel_id
+    return matched_channel_id
+
+# Funkcja do wyszukiwania programów kanału w danej chwili
+def channel_epg_at(channel_name, timestamp, data, index):
+    """Zwróć (aktualny, następny) program kanału w chwili timestamp (znacznik z xmltv_epoch)."""
+    matched_channel_id = match_channel_epg(channel_name, index)
+    if not matched_channel_id or matched_channel_id == 'channel_names':
+        return None, None
+    schedule = data.get(matched_channel_id)
+    if not schedule:
+        return None, None
+    current_idx, next_idx = schedule_lookup(schedule, timestamp)
+    return schedule_programme(schedule, current_idx), schedule_programme(schedule, next_idx)
+
+# Funkcja do wyświetlania EPG dla kanału
+def get_channel_epg(channel_name, when=None):
+    """Pobierz aktualne i następne programy dla danego kanału (domyślnie teraz, lub w chwili when)."""
+    return get_channels_epg([channel_name], when)[0]
+
+# Funkcja do pobierania EPG dla wielu kanałów naraz
+def get_channels_epg(channel_names, when=None):
+    """Pobierz pary (aktualny, następny) dla listy kanałów w jednym przebiegu."""
+    # Migawka spójnej pary (dane, indeks) - wątek ładujący może ją w każdej chwili podmienić
+    with EPG_LOCK:
+        loaded, data, index = EPG_LOADED, EPG_DATA, EPG_MATCH_INDEX
+    if not loaded:
+        return [(None, None) for _ in channel_names]
+    if when is None:
+        when = datetime.now()
+    timestamp = calendar.timegm(when.timetuple())
+    return [channel_epg_at(name, timestamp, data, index) for name in channel_names]
+
+# Funkcja do rozpoznawania segmentu z kluczem atrybutu EXTINF
+def extinf_key(segment):
+    """Zwróć klucz z segmentu ' klucz=' (przed wartością w cudzysłowie) lub None, jeśli segment jest nietypowy."""
+    key = EXTINF_KEY_CACHE.get(segment, False)
+    if key is not False:
+        return key
+    key = None
+    if segment.endswith('=') and segment.count('=') == 1 and ',' not in segment:
+        key = sys.intern(segment[segment.rfind(' ') + 1:-1]) or None
+    # Segmenty powtarzają się w całej playliście, więc wynik zapamiętujemy (z limitem rozmiaru)
+    if len(EXTINF_KEY_CACHE) < 4096:
+        EXTINF_KEY_CACHE[segment] = key
+    return key
+
+# Funkcja do przetwarzania nagłówka EXTINF
+def parse_extinf(line):
+    """Rozbierz linię #EXTINF na (czas, atrybuty, nazwa) bez wyrażeń regularnych."""
+    # Po podziale na cudzysłowach segmenty parzyste leżą poza cudzysłowami, nieparzyste to wartości
+    segments = line[8:].split('"')
+    if len(segments) % 2 == 1:
+        # Szybka ścieżka: same atrybuty klucz="wartość", nazwa po przecinku w ostatnim segmencie
+        cached_key = EXTINF_KEY_CACHE.get
+        keys = [cached_key(segment, False) for segment in segments[:-1:2]]
+        if False in keys:
+            keys = [extinf_key(segment) for segment in segments[:-1:2]]
+        if None not in keys:
+            head, _, name = segments[-1].partition(',')
+            first = (segments[0] if keys else head).lstrip()
+            space = first.find(' ')
+            duration = (first[:space] if space != -1 else first).strip()
+            if '=' in duration:
+                duration = ""
+            attrs = {key: value for key, value in zip(keys, segments[1::2]) if value}
+            return duration, attrs, name.strip()
+    return parse_extinf_general(segments)
+
+# Funkcja do przetwarzania nietypowych nagłówków EXTINF
+def parse_extinf_general(segments):
+    """Rozbierz segmenty #EXTINF z atrybutami bez cudzysłowów lub przecinkami przed cudzysłowem."""
+    name = ""
+    for idx in range(0, len(segments), 2):
+        if ',' in segments[idx]:
+            # Pierwszy przecinek poza cudzysłowami oddziela nazwę kanału
+            head, _, rest = segments[idx].partition(',')
+            name = '"'.join([rest] + segments[idx + 1:])
+            segments = segments[:idx] + [head]
+            break
+    attrs = {}
+    tokens = segments[0].split()
+    duration = tokens[0] if tokens else ""
+    for idx in range(0, len(segments), 2):
+        tokens = segments[idx].split()
+        if idx == 0:
+            tokens = tokens[1:]
+        for token in tokens:
+            key, eq, value = token.partition('=')
+            if not eq:
+                continue
+            if not value and idx + 1 < len(segments):
+                value = segments[idx + 1]
+            if key and value:
+                attrs[sys.intern(key)] = value
+    return duration, attrs, name.strip()
+
+# Funkcja do strumieniowego przetwarzania playlisty
+def iter_playlist(lines):
+    """Przejdź jednokrotnie po liniach M3U i zwracaj kolejne kanały ze wszystkimi atrybutami."""
+    pending = None
+    for raw_line in lines:
+        line = raw_line.strip()
+        if not line:
+            continue
+        if line[0] == '#':
+            if line.startswith("#EXTINF:"):
+                duration, attrs, name = parse_extinf(line)
+                pending = {
+                    'name': name or "Nieznany kanał",
+                    'url': None,
+                    'group': attrs.get('group-title'),
+                    'duration': duration,
+                    'attrs': attrs,
+                    'options': None,
+                }
+            elif pending is not None:
+                # Dyrektywy między #EXTINF a adresem URL dotyczą bieżącego kanału
+                if line.startswith("#EXTGRP:"):
+                    if not pending['group']:
+                        pending['group'] = line[8:].strip()
+                elif line.startswith("#EXTVLCOPT:"):
+                    if pending['options'] is None:
+                        pending['options'] = []
+                    pending['options'].append(line[11:].strip())
+            continue
+        if pending is not None:
+            pending['url'] = line
+            pending['group'] = sys.intern(pending['group'] or 'Inne')
+            yield pending
+            pending = None
+
+# Klasa zwartego katalogu kanałów
+class ChannelCatalog:
+    """Kolumnowy katalog kanałów: równoległe listy zamiast słownika na każdy kanał."""
+    __slots__ = ('names', 'urls', 'group_ids', 'group_names', 'group_lookup', 'group_members',
+                 'attrs', 'durations', 'options', 'search_index', 'source_ids', 'source_names', 'provenance')
+
+    def __init__(self):
+        self.names = []
+        self.urls = []
+        self.group_ids = array('I')
+        self.group_names = []
+        self.group_lookup = {}
+        self.group_members = []  # id grupy -> array indeksów kanałów
+        self.attrs = []  # spłaszczone krotki (klucz, wartość, klucz, wartość, ...)
+        self.durations = {}  # tylko czasy inne niż "-1"
+        self.options = {}  # tylko kanały z #EXTVLCOPT
+        self.search_index = None
+        self.source_ids = array('H')  # tylko w katalogach scalonych: źródło (plik) każdego kanału
+        self.source_names = []
+        self.provenance = {}  # kanał -> krotka id dodatkowych źródeł, w których był duplikatem
+
+    @classmethod
+    def from_records(cls, records):
+        """Zbuduj katalog z rekordów zwracanych przez iter_playlist."""
+        catalog = cls()
+        for record in records:
+            catalog.add(record)
+        return catalog
+
+    def add(self, record, source=None):
+        """Dodaj kanał (rekord z iter_playlist) i zwróć jego identyfikator (indeks); source to nazwa pliku źródłowego.
+
+        Katalog może być czytany w trakcie dopisywania (TUI, serwer API), więc kolumny są uzupełniane przed names,
+        które wyznacza len(), a indeks trafia do grupy na końcu, gdy kanał jest już kompletny.
+        """
+        idx = len(self.names)
+        if source is not None:
+            self.source_ids.append(self.source_id(source))
+        group = record['group']
+        group_id = self.group_lookup.get(group)
+        if group_id is None:
+            group_id = len(self.group_names)
+            self.group_members.append(array('I'))
+            self.group_names.append(group)
+            self.group_lookup[group] = group_id
+        self.urls.append(record['url'])
+        self.group_ids.append(group_id)
+        attrs = record.get('attrs')
+        if attrs:
+            if 'group-title' in attrs:
+                attrs['group-title'] = group  # wspólny, internowany napis zamiast kopii w każdym kanale
+            self.attrs.append(tuple(item for pair in attrs.items() for item in pair))
+        else:
+            self.attrs.append(())
+        duration = record.get('duration')
+        if duration and duration != "-1":
+            self.durations[idx] = duration
+        if record.get('options'):
+            self.options[idx] = tuple(record['options'])
+        self.names.append(record['name'])
+        self.group_members[group_id].append(idx)
+        return idx
+
+    def source_id(self, source):
+        """Zwróć identyfikator źródła (pliku) o podanej nazwie, dodając je w razie potrzeby."""
+        if source not in self.source_names:
+            self.source_names.append(source)
+        return self.source_names.index(source)
+
+    def add_provenance(self, idx, source):
+        """Zapisz, że kanał idx występował też w źródle source (jako duplikat)."""
+        source_id = self.source_id(source)
+        if self.source_ids and self.source_ids[idx] == source_id:
+            return
+        extra = self.provenance.get(idx, ())
+        if source_id not in extra:
+            self.provenance[idx] = extra + (source_id,)
+
+    def sources_of(self, idx):
+        """Zwróć listę nazw źródeł kanału (pierwsze to źródło, z którego kanał pochodzi)."""
+        if not self.source_ids:
+            return []
+        return [self.source_names[source_id] for source_id in (self.source_ids[idx],) + self.provenance.get(idx, ())]
+
+    def record(self, idx):
+        """Zwróć kanał jako rekord w formacie iter_playlist (do scalania i eksportu)."""
+        flat = self.attrs[idx]
+        return {
+            'name': self.names[idx],
+            'url': self.urls[idx],
+            'group': self.group_of(idx),
+            'duration': self.durations.get(idx, "-1"),
+            'attrs': dict(zip(flat[::2], flat[1::2])),
+            'options': list(self.options.get(idx, ())) or None,
+        }
+
+    def __len__(self):
+        return len(self.names)
+
+    def to_columns(self):
+        """Zwróć kolumny katalogu jako zwykłe listy, tablice i słowniki (cache nie zależy od nazwy modułu klasy)."""
+        columns = {slot: getattr(self, slot) for slot in self.__slots__ if slot != 'search_index'}
+        columns['search_index'] = self.search_index.to_columns() if self.search_index is not None else None
+        return columns
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Odtwórz katalog (i indeks wyszukiwania) z kolumn zwróconych przez to_columns."""
+        catalog = cls.__new__(cls)
+        for slot in cls.__slots__:
+            if slot != 'search_index':
+                setattr(catalog, slot, columns[slot])
+        index_columns = columns['search_index']
+        catalog.search_index = SearchIndex.from_columns(index_columns) if index_columns is not None else None
+        return catalog
+
+    def build_search_index(self):
+        """Zbuduj (od nowa) indeks wyszukiwania nazw kanałów."""
+        self.search_index = SearchIndex(self.names)
+        return self.search_index
+
+    def search(self, query, limit=None, fuzzy=True):
+        """Wyszukaj kanały po nazwie; zwraca listę (id kanału, ranga) - patrz SearchIndex.search."""
+        if self.search_index is None or len(self.search_index.folded) != len(self.names):
+            self.build_search_index()
+        return self.search_index.search(query, limit, fuzzy)
+
+    def channel(self, idx):
+        """Zwróć widok kanału o podanym identyfikatorze (O(1))."""
+        if not 0 <= idx < len(self.names):
+            raise IndexError(idx)
+        return Channel(self, idx)
+
+    def group_of(self, idx):
+        """Zwróć nazwę grupy kanału."""
+        return self.group_names[self.group_ids[idx]]
+
+    def groups(self):
+        """Zwróć posortowaną listę (nazwa grupy, liczba kanałów)."""
+        # Kopia elementów - katalog może być w tym czasie uzupełniany przez wątek pobierający playlistę
+        return sorted((name, len(self.group_members[group_id])) for name, group_id in list(self.group_lookup.items()))
+
+    def group_view(self, group):
+        """Zwróć widok kanałów grupy bez kopiowania danych (pusty dla nieznanej grupy)."""
+        group_id = self.group_lookup.get(group)
+        return GroupView(self, self.group_members[group_id] if group_id is not None else array('I'))
+
+    def memory_report(self):
+        """Zwróć przybliżone zużycie pamięci katalogu w bajtach (łącznie i na kolumnę)."""
+        seen = set()
+
+        def size_of(obj):
+            # Internowane napisy współdzielone między kanałami liczymy raz
+            if id(obj) in seen:
+                return 0
+            seen.add(id(obj))
+            return sys.getsizeof(obj)
+
+        columns = {
+            'names': sys.getsizeof(self.names) + sum(size_of(name) for name in self.names),
+            'urls': sys.getsizeof(self.urls) + sum(size_of(url) for url in self.urls),
+            'groups': sys.getsizeof(self.group_ids) + sum(sys.getsizeof(members) for members in self.group_members)
+                      + sum(size_of(name) for name in self.group_names),
+            'attrs': sys.getsizeof(self.attrs) + sum(size_of(attrs) + sum(size_of(item) for item in attrs)
+                                                     for attrs in self.attrs),
+            'extra': sys.getsizeof(self.durations) + sys.getsizeof(self.options)
+                     + sum(sys.getsizeof(options) for options in self.options.values()),
+        }
+        total = sum(columns.values())
+        return {
+            'channels': len(self.names),
+            'groups': len(self.group_names),
+            'bytes': total,
+            'bytes_per_channel': total / len(self.names) if self.names else 0,
+            'columns': columns,
+        }
+
+# Klasa widoku pojedynczego kanału
+class Channel:
+    """Lekki widok kanału w katalogu; obsługuje dostęp channel['name'] jak dawny słownik."""
+    __slots__ = ('catalog', 'idx')
+
+    def __init__(self, catalog, idx):
+        self.catalog = catalog
+        self.idx = idx
+
+    def __getitem__(self, key):
+        catalog = self.catalog
+        if key == 'name':
+            return catalog.names[self.idx]
+        if key == 'url':
+            return catalog.urls[self.idx]
+        if key == 'group':
+            return catalog.group_of(self.idx)
+        if key == 'id':
+            return self.idx
+        if key == 'attrs':
+            flat = catalog.attrs[self.idx]
+            return dict(zip(flat[::2], flat[1::2]))
+        if key == 'duration':
+            return catalog.durations.get(self.idx, "-1")
+        if key == 'options':
+            return list(catalog.options.get(self.idx, ()))
+        if key == 'sources':
+            return catalog.sources_of(self.idx)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"Channel({self.idx}, {self['name']!r})"
+
+# Klasa widoku kanałów jednej grupy
+class GroupView:
+    """Sekwencja kanałów grupy oparta na tablicy indeksów katalogu (bez kopiowania)."""
+    __slots__ = ('catalog', 'indices')
+
+    def __init__(self, catalog, indices):
+        self.catalog = catalog
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [Channel(self.catalog, idx) for idx in self.indices[item]]
+        return Channel(self.catalog, self.indices[item])
+
+    def __iter__(self):
+        for idx in self.indices:
+            yield Channel(self.catalog, idx)
+
+# Funkcja do ujednolicania tekstu do wyszukiwania
+def fold_text(text):
+    """Sprowadź tekst do małych liter bez znaków diakrytycznych ("Polsát" -> "polsat", "Łódź" -> "lodz")."""
+    if text.isascii():
+        return text.lower()  # Bez znaków diakrytycznych - wynik jak casefold, bez rozkładu NFKD
+    decomposed = unicodedata.normalize('NFKD', text.casefold().translate(FOLD_TRANSLATION))
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+# Klasa indeksu wyszukiwania kanałów
+class SearchIndex:
+    """Indeks nazw kanałów: znormalizowane nazwy, posortowana lista prefiksów i wystąpienia n-gramów (2 i 3 znaki)."""
+    __slots__ = ('folded', 'exact', 'sorted_folded', 'sorted_ids', 'postings', 'last_search')
+
+    def __init__(self, names):
+        self.folded = [fold_text(name) for name in names]
+        self.exact = {}
+        self.postings = {}
+        for idx, folded in enumerate(self.folded):
+            self.exact.setdefault(folded, array('I')).append(idx)
+            for size in (2, 3):
+                for gram in {folded[i:i + size] for i in range(len(folded) - size + 1)}:
+                    posting = self.postings.get(gram)
+                    if posting is None:
+                        posting = self.postings[gram] = array('I')
+                    posting.append(idx)
+        order = sorted(range(len(self.folded)), key=self.folded.__getitem__)
+        self.sorted_ids = array('I', order)
+        self.sorted_folded = [self.folded[idx] for idx in order]
+        self.last_search = None  # (zapytanie, pełny wynik) - jedna krotka, podmieniana jednym przypisaniem
+
+    def to_columns(self):
+        """Zwróć dane indeksu jako zwykłe kolumny (bez stanu pisania na bieżąco)."""
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot != 'last_search'}
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Odtwórz indeks z kolumn zwróconych przez to_columns."""
+        index = cls.__new__(cls)
+        for slot in cls.__slots__:
+            if slot != 'last_search':
+                setattr(index, slot, columns[slot])
+        index.last_search = None
+        return index
+
+    def prefix_matches(self, query):
+        """Zwracaj kolejno (alfabetycznie) kanały, których nazwa zaczyna się od query."""
+        pos = bisect.bisect_left(self.sorted_folded, query)
+        while pos < len(self.sorted_folded) and self.sorted_folded[pos].startswith(query):
+            yield self.sorted_ids[pos]
+            pos += 1
+
+    def substring_candidates(self, query):
+        """Zwróć kanały mogące zawierać query: poprzedni wynik (pisanie na bieżąco) lub najkrótszą listę n-gramu."""
+        # Jeden odczyt krotki - równoległe wyszukiwania (serwer API) nie zobaczą zapytania z cudzym wynikiem
+        last_search = self.last_search
+        if last_search and last_search[0] in query:
+            # Zapytanie rozszerza poprzednie - wystarczy zawęzić poprzedni, pełny wynik
+            return last_search[1]
+        if len(query) < 2:
+            return range(len(self.folded))
+        size = 3 if len(query) >= 3 else 2
+        postings = [self.postings.get(query[i:i + size]) for i in range(len(query) - size + 1)]
+        if not all(postings):
+            return ()
+        return min(postings, key=len)
+
+    def substring_matches(self, query):
+        """Zwracaj kanały zawierające query; pełny przebieg zapamiętuje wynik dla kolejnych, dłuższych zapytań."""
+        folded = self.folded
+        matches = []
+        for idx in self.substring_candidates(query):
+            if query in folded[idx]:
+                matches.append(idx)
+                yield idx
+        self.last_search = (query, matches)
+
+    def fuzzy_matches(self, query, exclude, limit):
+        """Zwróć kanały podobne do query (wspólne rzadkie trigramy, potem difflib) poza exclude."""
+        grams = [query[i:i + 3] for i in range(len(query) - 2)]
+        postings = sorted((self.postings.get(gram, ()) for gram in set(grams)), key=len)
+        shared = {}
+        visited = 0
+        for posting in postings:
+            # Najpierw rzadkie trigramy; bardzo częste (np. "hd ") niewiele mówią, a kosztują najwięcej
+            if visited and visited + len(posting) > SEARCH_FUZZY_SCAN_LIMIT:
+                break
+            visited += len(posting)
+            for idx in posting:
+                shared[idx] = shared.get(idx, 0) + 1
+        best = sorted((idx for idx in shared if idx not in exclude), key=shared.get, reverse=True)
+        scored = []
+        for idx in best[:SEARCH_FUZZY_CANDIDATES * 5]:
+            ratio = difflib.SequenceMatcher(None, query, self.folded[idx]).ratio()
+            if ratio >= 0.6:
+                scored.append((-ratio, idx))
+        scored.sort()
+        return [idx for _, idx in scored[:limit]]
+
+    def search(self, query, limit=None, fuzzy=True):
+        """Wyszukaj kanały; zwraca listę (id kanału, ranga): 0 dokładne, 1 prefiks, 2 fragment, 3 przybliżone."""
+        query = fold_text(query.strip())
+        if not query:
+            return []
+        results = []
+        found = set()
+        ranked_sources = (
+            (0, self.exact.get(query, ())),
+            (1, self.prefix_matches(query)),
+            (2, self.substring_matches(query)),
+        )
+        for rank, source in ranked_sources:
+            for idx in source:
+                if limit is not None and len(results) >= limit:
+                    return results
+                if idx not in found:
+                    found.add(idx)
+                    results.append((idx, rank))
+        if fuzzy and len(query) >= 3:
+            remaining = SEARCH_FUZZY_CANDIDATES if limit is None else min(limit - len(results), SEARCH_FUZZY_CANDIDATES)
+            if remaining > 0:
+                results.extend((idx, 3) for idx in self.fuzzy_matches(query, found, remaining))
+        return results
+
+# Funkcja do przetwarzania playlisty na grupy i kanały
+def parse_playlist(data):
+    """Przetwarzaj zawartość playlisty (tekst lub iterowalne linie) na katalog grup i kanałów."""
+    if isinstance(data, str):
+        data = data.splitlines()
+    # Przy milionach nowych obiektów cykliczny GC wielokrotnie przegląda całą stertę - wyłącz go na czas parsowania
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return ChannelCatalog.from_records(iter_playlist(data))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+# Funkcja do ładowania playlisty z pliku
+def load_playlist(file_path):
+    """Wczytaj playlistę z określonego pliku."""
+    try:
+        with open(file_path, "r", encoding="utf-8") as file:
+            # Plik jest czytany linia po linii - cała treść nie trafia naraz do pamięci
+            return parse_playlist(file)
+    except Exception as e:
+        raise RuntimeError(f"Błąd ładowania playlisty: {e}")
+
+# Funkcja do ładowania playlisty z użyciem pamięci podręcznej
+def load_playlist_cached(file_path, stats=None):
+    """Wczytaj playlistę wraz z indeksem wyszukiwania z pliku cache obok playlisty lub przetwórz ją od nowa."""
+    if stats is None:
+        stats = {}
+    stats['status'] = "cache"
+    cache_path = file_path + PLAYLIST_CACHE_SUFFIX
+    try:
+        stat = os.stat(file_path)
+    except OSError as e:
+        raise RuntimeError(f"Błąd ładowania playlisty: {e}")
+    header = read_playlist_cache_header(cache_path)
+    sha1 = None
+    if header and header['path'] == os.path.abspath(file_path) and header['size'] == stat.st_size:
+        if header['mtime_ns'] == stat.st_mtime_ns:
+            catalog = read_playlist_cache(cache_path)
+            if catalog is not None:
+                return catalog
+        else:
+            sha1 = file_sha1(file_path)
+            if header['sha1'] == sha1:
+                # Plik tylko "dotknięty" (nowy mtime, ta sama treść) - cache nadal aktualny
+                catalog = read_playlist_cache(cache_path)
+                if catalog is not None:
+                    write_playlist_cache(cache_path, file_path, catalog, stat, sha1)
+                    return catalog
+
+    stats['status'] = "przetworzono"
+    # Nagłówek opisuje plik sprzed parsowania - zmiana w trakcie unieważni cache przy następnym wczytaniu
+    if sha1 is None:
+        sha1 = file_sha1(file_path)
+    catalog = load_playlist(file_path)
+    catalog.build_search_index()
+    write_playlist_cache(cache_path, file_path, catalog, stat, sha1)
+    return catalog
+
+# Funkcja do liczenia skrótu pliku
+def file_sha1(file_path):
+    """Policz SHA-1 zawartości pliku (czytanego blokami)."""
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Funkcja do odczytu nagłówka cache playlisty
+def read_playlist_cache_header(cache_path):
+    """Odczytaj nagłówek cache playlisty (bez wczytywania katalogu); None, jeśli brak lub nieaktualny format."""
+    try:
+        with open(cache_path, "rb") as file:
+            header = pickle.load(file)
+        if isinstance(header, dict) and header.get('version') == PLAYLIST_CACHE_VERSION:
+            return header
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.debug(f"Pominięto uszkodzony cache playlisty {cache_path}: {e}")
+    return None
+
+# Funkcja do odczytu katalogu z cache playlisty
+def read_playlist_cache(cache_path):
+    """Wczytaj katalog kanałów z cache playlisty; None, jeśli plik jest uszkodzony."""
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(cache_path, "rb") as file:
+            pickle.load(file)  # nagłówek
+            columns = pickle.load(file)
+        if isinstance(columns, dict):
+            return ChannelCatalog.from_columns(columns)
+    except Exception as e:
+        logging.debug(f"Pominięto uszkodzony cache playlisty {cache_path}: {e}")
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return None
+
+# Funkcja do zapisu cache playlisty
+def write_playlist_cache(cache_path, file_path, catalog, stat, sha1):
+    """Zapisz kolumny katalogu (z indeksem wyszukiwania) do pliku cache obok playlisty.
+
+    stat i sha1 muszą pochodzić sprzed parsowania pliku, z którego powstał katalog.
+    """
+    try:
+        header = {
+            'version': PLAYLIST_CACHE_VERSION,
+            'path': os.path.abspath(file_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha1': sha1,
+        }
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump(header, file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(catalog.to_columns(), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logging.warning(f"Nie udało się zapisać cache playlisty {cache_path}: {e}")
+
+# Funkcja do ładowania playlisty z pliku
+def load_playlist_from_file():
+    """Załaduj playlistę z pliku."""
+    global PLAYLIST, EPG_LOADED
+    playlists = list_playlists()
+    if not playlists:
+        console.print("[error]Brak dostępnych playlist w folderze 'playlists'.[/error]")
+        wait_for_enter("Naciśnij Enter, aby wrócić do menu...")
+        return
+
+    choice = display_menu(playlists + ["Scal kilka playlist"], "Wybierz Playlistę")
+    if choice == len(playlists):
+        merge_playlists_menu()
+    elif choice is not None:
+        file_path = os.path.join(resource_path(PLAYLISTS_DIR), playlists[choice])
+        try:
+            PLAYLIST = load_playlist_cached(file_path)
+            bump_state_version()
+            console.print(f"[success]Playlista '{playlists[choice]}' załadowana pomyślnie![/success]")
+            console.print(f"[info]{len(PLAYLIST)} kanałów w {len(PLAYLIST.group_names)} grupach.[/info]")
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+        except RuntimeError as e:
+            logging.error(str(e))
+            console.print(f"[error]{str(e)}[/error]")
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+
+# Funkcja do normalizacji adresu strumienia
+def normalize_stream_url(url):
+    """Sprowadź URL strumienia do postaci porównywalnej (małe litery schematu/hosta, bez domyślnego portu i fragmentu)."""
+    try:
+        parts = urllib.parse.urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    path = parts.path.rstrip("/") or "/"
+    return urllib.parse.urlunsplit((scheme, netloc, path, parts.query, ""))
+
+# Funkcja do scalania wielu playlist
+def merge_playlists(file_paths, report_callback=None):
+    """Wczytaj playlisty równolegle i scal je w jeden katalog bez duplikatów; zwraca (katalog, statystyki plików)."""
+    stats = [None] * len(file_paths)
+    catalogs = [None] * len(file_paths)
+    # Katalogi playlist spoza bieżącego scalania (np. usuniętych z folderu) nie są już potrzebne
+    for file_path in set(MERGE_SOURCES) - set(file_paths):
+        del MERGE_SOURCES[file_path]
+
+    def load_one(file_path):
+        start = time.perf_counter()
+        file_stats = {'file': os.path.basename(file_path), 'status': None, 'channels': 0, 'duplicates': 0}
+        stat = os.stat(file_path)
+        cached = MERGE_SOURCES.get(file_path)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            catalog = cached['catalog']
+            file_stats['status'] = "bez zmian"
+        else:
+            # load_playlist_cached przetwarza plik tylko, gdy zmienił się jego skrót treści
+            catalog = load_playlist_cached(file_path, file_stats)
+            MERGE_SOURCES[file_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'catalog': catalog}
+        file_stats['channels'] = len(catalog)
+        file_stats['load_time'] = time.perf_counter() - start
+        return catalog, file_stats
+
+    with concurrent_futures.ThreadPoolExecutor(max_workers=max(1, min(PLAYLIST_MERGE_WORKERS, len(file_paths)))) as executor:
+        futures = {executor.submit(load_one, file_path): idx for idx, file_path in enumerate(file_paths)}
+        for future in concurrent_futures.as_completed(futures):
+            idx = futures[future]
+            try:
+                catalogs[idx], stats[idx] = future.result()
+            except Exception as e:
+                logging.error(f"Błąd ładowania playlisty {file_paths[idx]}: {e}")
+                stats[idx] = {'file': os.path.basename(file_paths[idx]), 'status': f"błąd: {e}",
+                              'channels': 0, 'duplicates': 0, 'load_time': 0.0}
+            if report_callback:
+                report_callback(stats[idx])
+
+    merged = ChannelCatalog()
+    seen_urls = {}
+    seen_ids = {}
+    for source_idx, catalog in enumerate(catalogs):
+        if catalog is None:
+            continue
+        start = time.perf_counter()
+        source_name = os.path.basename(file_paths[source_idx])
+        index = catalog.search_index
+        folded_names = index.folded if index is not None and len(index.folded) == len(catalog) else None
+        for idx in range(len(catalog)):
+            url_key = normalize_stream_url(catalog.urls[idx])
+            flat = catalog.attrs[idx]
+            tvg_id = dict(zip(flat[::2], flat[1::2])).get('tvg-id')
+            id_key = None
+            if tvg_id:
+                id_key = (tvg_id.casefold(), folded_names[idx] if folded_names else fold_text(catalog.names[idx]))
+            # Duplikat: ten sam adres lub ten sam tvg-id przy tej samej nazwie kanału
+            existing = seen_urls.get(url_key)
+            if existing is None and id_key is not None:
+                existing = seen_ids.get(id_key)
+            if existing is not None:
+                merged.add_provenance(existing, source_name)
+                stats[source_idx]['duplicates'] += 1
+                continue
+            new_idx = merged.add(catalog.record(idx), source_name)
+            seen_urls[url_key] = new_idx
+            if id_key is not None:
+                seen_ids[id_key] = new_idx
+        stats[source_idx]['merge_time'] = time.perf_counter() - start
+    merged.build_search_index()
+    return merged, stats
+
+# Funkcja do scalania playlist z folderu
+def merge_playlists_menu():
+    """Scal wszystkie lub wybrane playlisty z folderu 'playlists' w jeden katalog."""
+    global PLAYLIST
+    playlists = list_playlists()
+    if not playlists:
+        console.print("[error]Brak dostępnych playlist w folderze 'playlists'.[/error]")
+        wait_for_enter("Naciśnij Enter, aby wrócić do menu...")
+        return
+    for idx, name in enumerate(playlists, start=1):
+        console.print(f"[options]{idx}. {name}[/options]")
+    selection = Prompt.ask("[bold yellow]Podaj numery playlist do scalenia (np. 1,3) lub Enter dla wszystkich[/bold yellow]",
+                           default="", show_default=False).strip()
+    if selection:
+        try:
+            chosen = [playlists[int(part) - 1] for part in selection.split(",") if part.strip()]
+        except (ValueError, IndexError):
+            console.print("[error]Nieprawidłowy wybór playlist.[/error]")
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+            return
+    else:
+        chosen = playlists
+    file_paths = [os.path.join(resource_path(PLAYLISTS_DIR), name) for name in chosen]
+
+    from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TimeElapsedColumn(),
+        console=console
+    ) as progress:
+        task = progress.add_task(f"Scalanie {len(file_paths)} playlist...", total=len(file_paths))
+        merged, stats = merge_playlists(file_paths, lambda file_stats: progress.update(task, advance=1))
+    PLAYLIST = merged
+    bump_state_version()
+
+    table = Table(show_header=True, header_style="bold magenta", box=box.ROUNDED)
+    table.add_column("Plik", style="options")
+    table.add_column("Status", style="highlight")
+    table.add_column("Kanały", justify="right")
+    table.add_column("Duplikaty", justify="right")
+    table.add_column("Wczytanie", justify="right")
+    table.add_column("Scalanie", justify="right")
+    for file_stats in stats:
+        table.add_row(file_stats['file'], file_stats['status'], str(file_stats['channels']), str(file_stats['duplicates']),
+                      f"{file_stats['load_time']:.2f} s", f"{file_stats.get('merge_time', 0.0):.2f} s")
+    console.print(table)
+    console.print(f"[success]Scalona playlista: {len(merged)} kanałów w {len(merged.group_names)} grupach.[/success]")
+    wait_for_enter("Naciśnij Enter, aby kontynuować...")
+
+# Funkcja do zarządzania zdalnymi playlistami
+def remote_playlists_menu():
+    """Wybierz zdalną playlistę do załadowania lub zarządzaj listą adresów."""
+    while True:
+        names = list(REMOTE_PLAYLISTS.keys())
+        options = names + ["Dodaj zdalną playlistę", "Usuń zdalną playlistę", "Pokaż stan ładowania", "Powrót"]
+        choice = display_menu(options, "Zdalne playlisty")
+        if choice is None or choice == len(options) - 1:
+            break
+        elif choice == len(options) - 4:
+            add_remote_playlist()
+        elif choice == len(options) - 3:
+            remove_remote_playlist()
+        elif choice == len(options) - 2:
+            show_playlist_load_status()
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+        else:
+            if start_remote_playlist_load(names[choice]):
+                console.print("[success]Pobieranie playlisty rozpoczęte w tle - kanały pojawiają się w grupach na bieżąco.[/success]")
+            else:
+                console.print("[error]Trwa już ładowanie innej playlisty.[/error]")
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+            break
+
+# Funkcja do dodawania zdalnej playlisty
+def add_remote_playlist():
+    """Dodaj adres zdalnej playlisty (M3U lub Xtream get.php?...&type=m3u_plus)."""
+    name = Prompt.ask("[bold yellow]Podaj nazwę playlisty[/bold yellow]").strip()
+    url = Prompt.ask("[bold yellow]Podaj URL playlisty[/bold yellow]").strip()
+    if name and url:
+        if name in REMOTE_PLAYLISTS:
+            console.print("[error]Playlista o tej nazwie już istnieje.[/error]")
+        else:
+            REMOTE_PLAYLISTS[name] = url
+            save_config()
+            console.print(f"[success]Dodano zdalną playlistę: {name}[/success]")
+    else:
+        console.print("[error]Nazwa i URL nie mogą być puste.[/error]")
+    wait_for_enter("Naciśnij Enter, aby kontynuować...")
+
+# Funkcja do usuwania zdalnej playlisty
+def remove_remote_playlist():
+    """Usuń zdalną playlistę z konfiguracji."""
+    names = list(REMOTE_PLAYLISTS.keys())
+    if not names:
+        console.print("[error]Brak zdalnych playlist do usunięcia.[/error]")
+        wait_for_enter("Naciśnij Enter, aby kontynuować...")
+        return
+    choice = display_menu(names + ["Anuluj"], "Usuń zdalną playlistę")
+    if choice is not None and choice < len(names):
+        REMOTE_PLAYLISTS.pop(names[choice])
+        save_config()
+        console.print(f"[success]Usunięto zdalną playlistę: {names[choice]}[/success]")
+    else:
+        console.print("[info]Anulowano usuwanie playlisty.[/info]")
+    wait_for_enter("Naciśnij Enter, aby kontynuować...")
+
+# Funkcja do uruchamiania pobierania zdalnej playlisty w tle
+def start_remote_playlist_load(name):
+    """Podmień PLAYLIST na katalog wypełniany w tle z adresu zdalnej playlisty; False, jeśli ładowanie już trwa."""
+    global PLAYLIST
+    url = REMOTE_PLAYLISTS[name]
+    with PLAYLIST_LOCK:
+        if PLAYLIST_LOAD_STATUS['running']:
+            return False
+        PLAYLIST_LOAD_STATUS.update(running=True, source=name, status="łączenie", channels=0, bytes=0,
+                                    started_at=time.time(), first_channel_at=None, finished_at=None)
+    catalog = ChannelCatalog()
+    PLAYLIST = catalog
+    bump_state_version()
+    thread = threading.Thread(target=run_remote_playlist_load, args=(url, catalog), name="playlist-loader", daemon=True)
+    thread.start()
+    return True
+
+# Funkcja wykonywana w wątku pobierającym zdalną playlistę
+def run_remote_playlist_load(url, catalog):
+    """Pobierz playlistę strumieniowo i dodawaj kanały do katalogu w miarę napływu danych."""
+    global PLAYLIST
+    status = PLAYLIST_LOAD_STATUS
+
+    def on_channel(count, received):
+        if status['first_channel_at'] is None:
+            status['first_channel_at'] = time.time()
+            status['status'] = "pobieranie"
+        status['channels'] = count
+        status['bytes'] = received
+        bump_state_version()
+
+    try:
+        result = fetch_remote_playlist(url, catalog, on_channel)
+        if result is not catalog:
+            # 304 lub brak sieci - gotowy katalog z cache
+            PLAYLIST = result
+        bump_state_version()
+        status['channels'] = len(PLAYLIST)
+        status['status'] = "zakończono" if result is catalog else "z pamięci podręcznej"
+    except Exception as e:
+        logging.error(f"Błąd pobierania playlisty {url}: {e}")
+        status['status'] = f"błąd: {e}"
+    finally:
+        with PLAYLIST_LOCK:
+            status['running'] = False
+            status['finished_at'] = time.time()
+
+# Funkcja do strumieniowego pobierania zdalnej playlisty
+def fetch_remote_playlist(url, catalog=None, on_channel=None, report_every=1000):
+    """Pobierz playlistę z URL, przetwarzając linie w trakcie pobierania; zwraca katalog (nowy lub z cache)."""
+    if catalog is None:
+        catalog = ChannelCatalog()
+    cache_path = remote_playlist_cache_path(url)
+    header = read_playlist_cache_header(cache_path)
+    headers = {}
+    if header and header.get('path') == url:
+        if header.get('etag'):
+            headers['If-None-Match'] = header['etag']
+        if header.get('last_modified'):
+            headers['If-Modified-Since'] = header['last_modified']
+    else:
+        header = None
+    try:
+        response = http_get(url, stream=True, headers=headers)
+    except requests.exceptions.RequestException as e:
+        cached = read_playlist_cache(cache_path) if header else None
+        if cached is not None:
+            logging.warning(f"Brak połączenia z {url} ({e}) - użyto playlisty z cache")
+            return cached
+        raise
+    if response.status_code == 304 and header:
+        response.close()
+        cached = read_playlist_cache(cache_path)
+        if cached is not None:
+            return cached
+        response = http_get(url, stream=True)
+    with response:
+        if response.status_code != 200:
+            raise RuntimeError(f"Status {response.status_code}")
+
+        # gzip/deflate z Content-Encoding dekoduje urllib3; plik .gz rozpakowujemy sami
+        response.raw.decode_content = True
+        response.raw.auto_close = False  # TextIOWrapper sam zamyka strumień; urllib3 nie może zrobić tego wcześniej przy EOF
+        stream = response.raw
+        if url.split('?', 1)[0].endswith('.gz') or "gzip" in response.headers.get("Content-Type", ""):
+            stream = gzip.GzipFile(fileobj=response.raw)
+        lines = io.TextIOWrapper(stream, encoding="utf-8", errors="replace")
+        with lines:
+            for record in iter_playlist(lines):
+                catalog.add(record)
+                if on_channel and (len(catalog) == 1 or len(catalog) % report_every == 0):
+                    on_channel(len(catalog), response.raw.tell())
+        if on_channel:
+            on_channel(len(catalog), response.raw.tell())
+    catalog.build_search_index()
+    write_remote_playlist_cache(cache_path, url, catalog, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    return catalog
+
+# Funkcja do wyznaczania ścieżki cache zdalnej playlisty
+def remote_playlist_cache_path(url):
+    """Zwróć ścieżkę pliku cache zdalnej playlisty (w podfolderze playlists/remote)."""
+    cache_dir = os.path.join(resource_path(PLAYLISTS_DIR), REMOTE_PLAYLISTS_CACHE_DIR)
+    return os.path.join(cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + PLAYLIST_CACHE_SUFFIX)
+
+# Funkcja do zapisu cache zdalnej playlisty
+def write_remote_playlist_cache(cache_path, url, catalog, etag, last_modified):
+    """Zapisz katalog zdalnej playlisty razem z ETag/Last-Modified do warunkowego odświeżania."""
+    try:
+        header = {
+            'version': PLAYLIST_CACHE_VERSION,
+            'path': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time(),
+        }
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump(header, file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(catalog.to_columns(), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logging.warning(f"Nie udało się zapisać cache playlisty {url}: {e}")
+
+# Funkcja do wyświetlania stanu ładowania zdalnej playlisty
+def show_playlist_load_status():
+    """Wyświetl postęp pobierania zdalnej playlisty."""
+    status = PLAYLIST_LOAD_STATUS
+    if not status['source']:
+        console.print("[info]Nie ładowano jeszcze zdalnej playlisty.[/info]")
+        return
+    end = status['finished_at'] or time.time()
+    console.print(f"[info]Playlista '{status['source']}': {status['status']}, {status['channels']} kanałów, "
+                  f"{status['bytes'] / 1024 / 1024:.1f} MB, {end - status['started_at']:.1f} s[/info]")
+    if status['first_channel_at']:
+        console.print(f"[info]Pierwszy kanał po {status['first_channel_at'] - status['started_at']:.2f} s[/info]")
+
+# Funkcja do sprawdzania pojedynczego strumienia
+def probe_stream(session, url, options=None):
+    """Pobierz pierwsze bajty strumienia i zwróć stan: kod HTTP, czas do pierwszego bajtu, typ treści i rodzaj."""
+    result = {'alive': False, 'status': None, 'ttfb': None, 'content_type': None, 'kind': None,
+              'error': None, 'checked_at': time.time()}
+    if not url.lower().startswith(("http://", "https://")):
+        # udp/rtmp itp. - nie da się sprawdzić zapytaniem HTTP
+        result['error'] = "nieobsługiwany protokół"
+        return result
+    headers = {}
+    for option in options or []:
+        key, _, value = option.partition('=')
+        if key == 'http-user-agent':
+            headers['User-Agent'] = value
+        elif key == 'http-referrer':
+            headers['Referer'] = value
+    start = time.perf_counter()
+    try:
+        with session.get(url, stream=True, timeout=STREAM_PROBE_TIMEOUT, headers=headers) as response:
+            result['status'] = response.status_code
+            result['content_type'] = response.headers.get('Content-Type', '').split(';', 1)[0].strip() or None
+            head = b''
+            if response.status_code < 400:
+                # Czas mierzony po pierwszym bajcie, a dopiero potem doczytywana jest reszta próbki
+                head = next(response.iter_content(chunk_size=1), b'')
+                if head:
+                    result['ttfb'] = time.perf_counter() - start
+                    head += next(response.iter_content(chunk_size=STREAM_PROBE_BYTES - 1), b'')
+            if result['ttfb'] is None:
+                result['ttfb'] = time.perf_counter() - start
+    except requests.exceptions.RequestException as e:
+        result['error'] = type(e).__name__
+        return result
+    result['kind'] = stream_kind(head, result['content_type'])
+    result['alive'] = response.status_code < 400 and result['kind'] is not None
+    return result
+
+# Funkcja do rozpoznawania rodzaju strumienia po pierwszych bajtach
+def stream_kind(head, content_type):
+    """Rozpoznaj rodzaj strumienia: nagłówek playlisty HLS, bajty synchronizacji MPEG-TS lub typ treści."""
+    if head.lstrip(b'\xef\xbb\xbf \r\n').startswith(b'#EXTM3U'):
+        return "hls"
+    if head[:1] == b'\x47' and (len(head) <= 188 or head[188:189] == b'\x47'):
+        return "ts"
+    if head and content_type and content_type.startswith(("video/", "audio/", "application/octet-stream")):
+        return content_type
+    return None
+
+# Funkcja do sprawdzania wielu strumieni równolegle
+def probe_streams(channels, progress_callback=None, force=False):
+    """Sprawdź kanały (pary adres, opcje) w puli wątków; wyniki trafiają do STREAM_HEALTH z czasem ważności."""
+    now = time.time()
+    pending = {}
+    for url, options in channels:
+        cached = STREAM_HEALTH.get(url)
+        if force or cached is None or now - cached['checked_at'] > STREAM_PROBE_TTL:
+            pending.setdefault(url, options)
+    done = len(channels) - len(pending)
+    if progress_callback:
+        progress_callback(done, len(channels))
+    if not pending:
+        return {'checked': 0, 'cached': done, 'alive': 0, 'elapsed': 0.0}
+
+    # Profil "probe" ma pulę tak dużą jak liczba wątków - kanały jednego dostawcy współdzielą połączenia keep-alive
+    session = get_http_session(PROXY_URL, "probe")
+    start = time.perf_counter()
+    alive = 0
+    with concurrent_futures.ThreadPoolExecutor(max_workers=STREAM_PROBE_WORKERS) as executor:
+        futures = {executor.submit(probe_stream, session, url, options): url for url, options in pending.items()}
+        for future in concurrent_futures.as_completed(futures):
+            url = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.warning(f"Błąd sprawdzania strumienia {url}: {e}")
+                result = {'alive': False, 'status': None, 'ttfb': None, 'content_type': None, 'kind': None,
+                          'error': str(e), 'checked_at': time.time()}
+            STREAM_HEALTH[url] = result
+            alive += result['alive']
+            done += 1
+            if progress_callback:
+                progress_callback(done, len(channels))
+    return {'checked': len(pending), 'cached': len(channels) - len(pending), 'alive': alive,
+            'elapsed': time.perf_counter() - start}
+
+# Funkcja do odczytu stanu strumienia z cache
+def get_stream_health(url):
+    """Zwróć wynik ostatniego sprawdzenia strumienia lub None, jeśli go brak albo jest przeterminowany."""
+    result = STREAM_HEALTH.get(url)
+    if result is None or time.time() - result['checked_at'] > STREAM_PROBE_TTL:
+        return None
+    return result
+
+# Funkcja do formatowania stanu strumienia w tabeli
+def format_stream_health(result):
+    """Zwróć krótki opis stanu strumienia do kolumny tabeli kanałów."""
+    if result is None:
+        return "[dim]?[/dim]"
+    if result['alive']:
+        return f"[success]OK {result['ttfb'] * 1000:.0f} ms[/success]"
+    return f"[error]✗ {result['status'] or result['error']}[/error]"
+
+# Funkcja do sprawdzania kanałów z Rich Progress
+def probe_channels_with_progress(channels, label):
+    """Sprawdź dostępność kanałów z paskiem postępu i wypisz podsumowanie."""
+    entries = [(channel['url'], channel['options']) for channel in channels]
+    from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TextColumn("{task.completed}/{task.total}"),
+        TimeElapsedColumn(),
+        console=console
+    ) as progress:
+        task = progress.add_task(f"Sprawdzanie: {label}", total=len(entries))
+        summary = probe_streams(entries, lambda done, total: progress.update(task, completed=done))
+    console.print(f"[info]Sprawdzono {summary['checked']} strumieni w {summary['elapsed']:.1f} s "
+                  f"(działa: {summary['alive']}, z pamięci podręcznej: {summary['cached']}).[/info]")
+    return summary
+
+# Funkcja do sprawdzania dostępności kanałów grupy lub całej playlisty
+def probe_channels_menu():
+    """Wybierz grupę (lub całą playlistę) i sprawdź, które kanały działają."""
+    if not PLAYLIST:
+        console.print("[error]Brak załadowanych playlist.[/error]")
+        wait_for_enter("Naciśnij Enter, aby wrócić...")
+        return
+    groups = PLAYLIST.groups()
+    options = [f"Cała playlista ({len(PLAYLIST)} kanałów)"] + [f"{group} ({count} kanałów)" for group, count in groups] + ["Powrót"]
+    choice = display_menu(options, "Sprawdź dostępność kanałów")
+    if choice is None or choice == len(options) - 1:
+        return
+    if choice == 0:
+        channels = [PLAYLIST.channel(idx) for idx in range(len(PLAYLIST))]
+        label = "cała playlista"
+    else:
+        label = groups[choice - 1][0]
+        channels = list(PLAYLIST.group_view(label))
+    probe_channels_with_progress(channels, label)
+    wait_for_enter("Naciśnij Enter, aby kontynuować...")
+
+# Funkcja do wyświetlania kanałów w wybranej grupie
+def display_channels():
+    """Wyświetl kanały w wybranej grupie."""
+    global CURRENT_GROUP
+    channels = PLAYLIST.group_view(CURRENT_GROUP)
+    if not channels:
+        console.print("[error]Brak dostępnych kanałów w tej grupie.[/error]")
+        wait_for_enter("Naciśnij Enter, aby wrócić...")
+        return
+
+    page_size = 20
+    current_page = 0
+
+    while True:
+        # Liczba stron liczona na bieżąco - grupa może rosnąć w trakcie pobierania zdalnej playlisty
+        total_pages = (len(channels) + page_size - 1) // page_size
+        console.clear()
+        draw_header(f"Kanały: {CURRENT_GROUP} (Strona {current_page + 1}/{total_pages})")
+        table = Table(show_header=True, header_style="bold magenta", box=box.ROUNDED)
+        table.add_column("Nr", style="dim", width=6)
+        table.add_column("Kanał", style="options")
+        table.add_column("Stan", width=12)
+        table.add_column("Teraz", style="highlight")
+        table.add_column("Następnie", style="highlight")
+
+        start_idx = current_page * page_size
+        end_idx = start_idx + page_size
+        page_channels = channels[start_idx:end_idx]
+        epg_start = time.perf_counter()
+        page_epg = get_channels_epg([channel['name'] for channel in page_channels])
+        epg_time = time.perf_counter() - epg_start
+        for idx, (channel, (epg_current, epg_next)) in enumerate(zip(page_channels, page_epg), start=1):
+            current_title = epg_current['title'] if epg_current else "-"
+            next_title = epg_next['title'] if epg_next else "-"
+            health = format_stream_health(get_stream_health(channel['url']))
+            table.add_row(str(idx), channel['name'], health, current_title, next_title)
+
+        console.print(table)
+        console.print(f"[info]Wybierz kanał (1 - {len(channels[start_idx:end_idx])}), 'n' - następna strona, 'p' - poprzednia strona, 'r' - odśwież EPG, 's' - sprawdź kanały grupy, '+nr' - nowe okno VLC, 'q' - powrót[/info]")
+        choice = Prompt.ask("[bold cyan]Twój wybór[/bold cyan]")
+        if choice.lower() == 'q':
+            break
+        elif choice.lower() == 'r':
+            continue
+        elif choice.lower() == 's':
+            probe_channels_with_progress(list(channels), CURRENT_GROUP)
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+        elif choice.lower() == 'n':
+            if current_page < total_pages - 1:
+                current_page += 1
+            else:
+                console.print("[error]To jest ostatnia strona.[/error]")
+                time.sleep(1)
+        elif choice.lower() == 'p':
+            if current_page > 0:
+                current_page -= 1
+            else:
+                console.print("[error]To jest pierwsza strona.[/error]")
+                time.sleep(1)
+        elif choice.lstrip('+').isdigit():
+            # '+nr' otwiera kanał w kolejnym oknie VLC obok już odtwarzanego
+            num = int(choice.lstrip('+'))
+            if 1 <= num <= len(channels[start_idx:end_idx]):
+                channel = channels[start_idx + num - 1]
+                zap = start_zap(channel['name'], CURRENT_GROUP, epg_time)
+                play_stream_vlc(channel['url'], channel['name'], channel.get('options'), new_window=choice.startswith('+'), zap=zap)
+            else:
+                console.print("[error]Nieprawidłowy wybór. Spróbuj ponownie.[/error]")
+                time.sleep(1)
+        else:
+            console.print("[error]Nieprawidłowy wybór. Spróbuj ponownie.[/error]")
+            time.sleep(1)
+
+# Funkcja do wyszukiwania kanałów
+def search_channels():
+    """Wyszukaj kanały po nazwie."""
+    if not PLAYLIST:
+        console.print("[error]Brak załadowanych playlist.[/error]")
+        wait_for_enter("Naciśnij Enter, aby wrócić...")
+        return
+
+    search_term = Prompt.ask("[bold yellow]Wprowadź nazwę lub fragment nazwy kanału do wyszukania[/bold yellow]").strip()
+    if not search_term:
+        console.print("[error]Wyszukiwana fraza nie może być pusta.[/error]")
+        wait_for_enter("Naciśnij Enter, aby kontynuować...")
+        return
+
+    # Wyszukaj kanały pasujące do frazy (bez względu na wielkość liter i znaki diakrytyczne)
+    matching_channels = [(PLAYLIST.channel(idx), PLAYLIST.group_of(idx)) for idx, _ in PLAYLIST.search(search_term)]
+
+    if not matching_channels:
+        console.print("[error]Nie znaleziono kanałów pasujących do wyszukiwania.[/error]")
+        wait_for_enter("Naciśnij Enter, aby kontynuować...")
+        return
+
+    page_size = 20
+    total_pages = (len(matching_channels) + page_size - 1) // page_size
+    current_page = 0
+
+    while True:
+        console.clear()
+        draw_header(f"Wyniki wyszukiwania dla '{search_term}' (Strona {current_page + 1}/{total_pages})")
+        table = Table(show_header=True, header_style="bold magenta", box=box.ROUNDED)
+        table.add_column("Nr", style="dim", width=6)
+        table.add_column("Kanał", style="options")
+        table.add_column("Grupa", style="options")
+        table.add_column("Teraz", style="highlight")
+        table.add_column("Następnie", style="highlight")
+
+        start_idx = current_page * page_size
+        end_idx = min(start_idx + page_size, len(matching_channels))
+        page_channels = matching_channels[start_idx:end_idx]
+        epg_start = time.perf_counter()
+        page_epg = get_channels_epg([channel['name'] for channel, _ in page_channels])
+        epg_time = time.perf_counter() - epg_start
+        for idx, ((channel, group), (epg_current, epg_next)) in enumerate(zip(page_channels, page_epg), start=1):
+            current_title = epg_current['title'] if epg_current else "-"
+            next_title = epg_next['title'] if epg_next else "-"
+            table.add_row(str(idx), channel['name'], group, current_title, next_title)
+
+        console.print(table)
+        console.print(f"[info]Wybierz kanał (1 - {end_idx - start_idx}), 'n' - następna strona, 'p' - poprzednia strona, 'r' - odśwież EPG, '+nr' - nowe okno VLC, 'q' - powrót[/info]")
+        choice = Prompt.ask("[bold cyan]Twój wybór[/bold cyan]")
+        if choice.lower() == 'q':
+            break
+        elif choice.lower() == 'r':
+            continue
+        elif choice.lower() == 'n':
+            if current_page < total_pages - 1:
+                current_page += 1
+            else:
+                console.print("[error]To jest ostatnia strona.[/error]")
+                time.sleep(1)
+        elif choice.lower() == 'p':
+            if current_page > 0:
+                current_page -= 1
+            else:
+                console.print("[error]To jest pierwsza strona.[/error]")
+                time.sleep(1)
+        elif choice.lstrip('+').isdigit():
+            num = int(choice.lstrip('+'))
+            if 1 <= num <= (end_idx - start_idx):
+                channel_idx = start_idx + num - 1
+                channel, group = matching_channels[channel_idx]
+                zap = start_zap(channel['name'], group, epg_time)
+                play_stream_vlc(channel['url'], channel['name'], channel.get('options'), new_window=choice.startswith('+'), zap=zap)
+            else:
+                console.print("[error]Nieprawidłowy wybór. Spróbuj ponownie.[/error]")
+                time.sleep(1)
+        else:
+            console.print("[error]Nieprawidłowy wybór. Spróbuj ponownie.[/error]")
+            time.sleep(1)
+
+# Funkcja do wyświetlania grup kanałów
+def display_groups():
+    """Wyświetl dostępne grupy kanałów."""
+    global CURRENT_GROUP
+    if not PLAYLIST:
+        console.print("[error]Brak załadowanych playlist.[/error]")
+        wait_for_enter("Naciśnij Enter, aby wrócić...")
+        return
+
+    groups = PLAYLIST.groups()
+    if not groups:
+        console.print("[error]Brak dostępnych grup w playliście.[/error]")
+        wait_for_enter("Naciśnij Enter, aby wrócić...")
+        return
+
+    options = [f"{group} ({count} kanałów)" for group, count in groups]
+    choice = display_menu(options, "Grupy Kanałów")
+    if choice is not None:
+        CURRENT_GROUP = groups[choice][0]
+        display_channels()
+
+# Funkcja do wyświetlania głównego menu
+def main_menu():
+    """Wyświetl główne menu."""
+    options = [
+        "Załaduj playlistę z pliku",
+        "Załaduj playlistę z URL",
+        "Wyświetl grupy kanałów",
+        "Wyszukaj kanał",
+        "Sprawdź dostępność kanałów",
+        "Odtwarzacze VLC",
+        "Załaduj EPG",  # Opcja ładowania EPG z możliwością wyboru źródła
+        "Skonfiguruj EPG",
+        "Skonfiguruj proxy",
+        "Zarządzaj źródłami proxy",
+        "Skonfiguruj ścieżkę do VLC",
+        "Serwer API (start/stop)",
+        "Eksport playlisty",
+        "Wyjdź",
+    ]
+    while True:
+        choice = display_menu(options, "FastIPTV  by Swir")
+        if choice == 0:
+            load_playlist_from_file()
+        elif choice == 1:
+            remote_playlists_menu()
+        elif choice == 2:
+            display_groups()
+        elif choice == 3:
+            search_channels()
+        elif choice == 4:
+            probe_channels_menu()
+        elif choice == 5:
+            manage_players()
+        elif choice == 6:
+            load_epg()  # Opcja ładowania EPG
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+        elif choice == 7:
+            configure_epg_sources()
+        elif choice == 8:
+            configure_proxy()
+        elif choice == 9:
+            configure_proxy_sources()
+        elif choice == 10:
+            configure_vlc_path()
+        elif choice == 11:
+            api_server_menu()
+        elif choice == 12:
+            export_menu()
+        elif choice is None or choice == 13:
+            stop_players()
+            console.print("[success]Dziękujemy za korzystanie z programu IPTV Player. Do zobaczenia![/success]")
+            break
+
+# Pozostałe funkcje (configure_proxy, configure_proxy_sources, play_stream_vlc, itd.) pozostają bez zmian
+
+# Funkcja do konfiguracji proxy
+def configure_proxy():
+    """Konfiguracja proxy dla VLC."""
+    global PROXY_URL
+    while True:
+        sources = list(AVAILABLE_PROXY_SOURCES.keys())
+        known_count = min(len(get_proxy_db()), PROXY_DB_RETEST)
+        enabled_sources = [source for source in ENABLED_PROXY_SOURCES if source in AVAILABLE_PROXY_SOURCES]
+        options = sources + [f"Wszystkie włączone źródła ({len(enabled_sources)})",
+                             f"Sprawdzone wcześniej proxy ({known_count})", "Wprowadź proxy ręcznie", "Wyłącz proxy",
+                             "Stan monitora proxy", "Sprawdź moje IP", "Powrót"]
+        choice = display_menu(options, "Konfiguracja Proxy")
+        if choice is None or choice == len(options) - 1:  # Opcja "Powrót"
+            console.print("[info]Powrót do menu głównego.[/info]")
+            break
+        elif choice == len(options) - 7:  # Opcja "Wszystkie włączone źródła"
+            if not enabled_sources:
+                console.print("[error]Brak włączonych źródeł proxy - włącz je w zarządzaniu źródłami proxy.[/error]")
+                wait_for_enter("Naciśnij Enter, aby wrócić...")
+                continue
+            source_stats = {}
+            tested_proxies = test_proxies([], enabled_sources, source_stats)
+            record_proxy_results(tested_proxies)
+            show_proxy_source_stats(enabled_sources, source_stats)
+            if any(is_working for _, is_working, _ in tested_proxies):
+                wait_for_enter("Naciśnij Enter, aby wybrać proxy...")
+                select_working_proxy(tested_proxies)
+                release_proxy_test_sessions()
+                break
+            console.print("[error]Nie znaleziono działających proxy. Spróbuj ponownie później.[/error]")
+            wait_for_enter("Naciśnij Enter, aby wrócić...")
+        elif choice == len(options) - 6:  # Opcja "Sprawdzone wcześniej proxy"
+            known = known_good_proxies()
+            if not known:
+                console.print("[error]Baza proxy jest pusta - najpierw przetestuj proxy z któregoś źródła.[/error]")
+                wait_for_enter("Naciśnij Enter, aby wrócić...")
+                continue
+            tested_proxies = test_proxies(known)
+            record_proxy_results(tested_proxies)
+            if any(is_working for _, is_working, _ in tested_proxies):
+                select_working_proxy(tested_proxies)
+                release_proxy_test_sessions()
+                break
+            console.print("[error]Żadne z zapamiętanych proxy już nie działa. Wybierz źródło proxy.[/error]")
+            wait_for_enter("Naciśnij Enter, aby wrócić...")
+        elif choice == len(options) - 5:  # Opcja "Wprowadź proxy ręcznie"
+            while True:
+                proxy = Prompt.ask("[bold yellow]Podaj adres proxy (IP:PORT) lub 'q' aby wrócić[/bold yellow]")
+                if proxy.lower() == 'q':
+                    break
+                if ":" in proxy:
+                    ip_port = proxy.split(":")
+                    if len(ip_port) == 2 and test_proxy_quick({"ip": ip_port[0], "port": ip_port[1]}):
+                        if test_proxy(proxy):
+                            PROXY_URL = proxy
+                            release_proxy_test_sessions()
+                            start_proxy_monitor()
+                            console.print(f"[success]Ustawiono proxy: {PROXY_URL}[/success]")
+                            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+                            return
+                        else:
+                            console.print("[error]Podane proxy nie działa poprawnie. Spróbuj inne.[/error]")
+                    else:
+                        console.print("[error]Podane proxy ma nieprawidłowy format lub nie działa. Spróbuj ponownie.[/error]")
+                else:
+                    console.print("[error]Podane proxy ma nieprawidłowy format. Użyj IP:PORT[/error]")
+            release_proxy_test_sessions()
+        elif choice == len(options) - 4:  # Opcja "Wyłącz proxy"
+            PROXY_URL = None
+            stop_proxy_monitor()
+            release_proxy_test_sessions()
+            console.print("[success]Proxy zostało wyłączone.[/success]")
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+            break
+        elif choice == len(options) - 3:  # Opcja "Stan monitora proxy"
+            show_proxy_monitor_status()
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+        elif choice == len(options) - 2:  # Opcja "Sprawdź moje IP"
+            check_my_ip()
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+        else:
+            selected_source = sources[choice]
+            console.print(f"[info]Pobieranie proxy ze źródła: {selected_source}...[/info]")
+
+            proxies = fetch_proxies(selected_source)
+            if proxies:
+                # Proxy, które działały wcześniej, są testowane jako pierwsze
+                tested_proxies = test_proxies(rank_proxies(proxies))
+                record_proxy_results(tested_proxies)
+                if any(is_working for _, is_working, _ in tested_proxies):
+                    select_working_proxy(tested_proxies)
+                    break
+                else:
+                    console.print("[error]Nie znaleziono działających proxy. Spróbuj ponownie później.[/error]")
+                    wait_for_enter("Naciśnij Enter, aby wrócić...")
+            else:
+                console.print("[error]Nie udało się pobrać listy proxy.[/error]")
+                wait_for_enter("Naciśnij Enter, aby wrócić...")
+
+# Funkcja do wyświetlania wydajności źródeł proxy
+def show_proxy_source_stats(source_names, source_stats):
+    """Wyświetl dla każdego źródła liczbę pobranych, nowych i działających proxy oraz czasy."""
+    table = Table(show_header=True, header_style="bold magenta", box=box.ROUNDED)
+    table.add_column("Źródło", style="options")
+    table.add_column("Pobrano", justify="right")
+    table.add_column("Nowe", justify="right")
+    table.add_column("Działa", justify="right")
+    table.add_column("Skuteczność", justify="right")
+    table.add_column("Pobieranie", justify="right")
+    table.add_column("Mediana latencji", justify="right")
+    for source_name in source_names:
+        stats = source_stats.get(source_name)
+        if stats is None:
+            # Testy zakończyły się przed pobraniem listy z tego źródła
+            table.add_row(source_name, "-", "-", "-", "-", "nie ukończono", "-")
+            continue
+        success_rate = stats['working'] / stats['new'] * 100 if stats['new'] else 0
+        median = latency_percentile(stats['latencies'], 50)
+        table.add_row(source_name, str(stats['fetched']), str(stats['new']), str(stats['working']),
+                      f"{success_rate:.1f}%", f"{stats['fetch_time']:.2f} s",
+                      f"{median * 1000:.0f} ms" if median is not None else "-")
+        logging.info(f"Źródło proxy {source_name}: pobrano {stats['fetched']}, nowe {stats['new']}, "
+                     f"działa {stats['working']}, pobieranie {stats['fetch_time']:.2f} s")
+    console.print(table)
+
+# Funkcja do zarządzania źródłami proxy
+def configure_proxy_sources():
+    """Zarządzaj źródłami proxy (włącz/wyłącz/dodaj własne)."""
+    global ENABLED_PROXY_SOURCES, AVAILABLE_PROXY_SOURCES
+    while True:
+        # Usuń nieistniejące źródła z ENABLED_PROXY_SOURCES
+        ENABLED_PROXY_SOURCES = [source for source in ENABLED_PROXY_SOURCES if source in AVAILABLE_PROXY_SOURCES]
+        options = [f"{'[X]' if source in ENABLED_PROXY_SOURCES else '[ ]'} {source}" for source in AVAILABLE_PROXY_SOURCES.keys()]
+        options.extend(["Dodaj własne źródło", "Usuń własne źródło", "Zapisz i powrót"])
+        choice = display_menu(options, "Zarządzanie źródłami proxy")
+        if choice is None or choice == len(options) - 1:
+            save_config()
+            console.print("[success]Zapisano zmiany w źródłach proxy.[/success]")
+            wait_for_enter("Naciśnij Enter, aby powrócić do menu głównego...")
+            break
+        elif choice == len(options) - 3:
+            add_custom_proxy_source()
+        elif choice == len(options) - 2:
+            remove_custom_proxy_source()
+        else:
+            selected_source = list(AVAILABLE_PROXY_SOURCES.keys())[choice]
+            if selected_source in ENABLED_PROXY_SOURCES:
+                ENABLED_PROXY_SOURCES.remove(selected_source)
+            else:
+                ENABLED_PROXY_SOURCES.append(selected_source)
+            console.print(f"[info]Źródło '{selected_source}' {'włączone' if selected_source in ENABLED_PROXY_SOURCES else 'wyłączone'}.[/info]")
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+
+# Funkcja do dodawania własnego źródła proxy
+def add_custom_proxy_source():
+    """Dodaj własne źródło proxy."""
+    global AVAILABLE_PROXY_SOURCES, ENABLED_PROXY_SOURCES
+    name = Prompt.ask("[bold yellow]Podaj nazwę dla nowego źródła proxy[/bold yellow]").strip()
+    url = Prompt.ask("[bold yellow]Podaj URL API nowego źródła proxy[/bold yellow]").strip()
+    if name and url:
+        if name in AVAILABLE_PROXY_SOURCES:
+            console.print("[error]Źródło o tej nazwie już istnieje.[/error]")
+        else:
+            AVAILABLE_PROXY_SOURCES[name] = url
+            ENABLED_PROXY_SOURCES.append(name)
+            console.print(f"[success]Dodano nowe źródło proxy: {name}[/success]")
+    else:
+        console.print("[error]Nazwa i URL nie mogą być puste.[/error]")
+
+# Funkcja do usuwania własnego źródła proxy
+def remove_custom_proxy_source():
+    """Usuń własne źródło proxy."""
+    global AVAILABLE_PROXY_SOURCES, ENABLED_PROXY_SOURCES
+    custom_sources = [src for src in AVAILABLE_PROXY_SOURCES.keys() if src not in DEFAULT_PROXY_SOURCES]
+    if not custom_sources:
+        console.print("[error]Brak własnych źródeł do usunięcia.[/error]")
+        wait_for_enter("Naciśnij Enter, aby kontynuować...")
+        return
+    options = custom_sources + ["Anuluj"]
+    choice = display_menu(options, "Usuń własne źródło")
+    if choice is not None and choice < len(custom_sources):
+        source_to_remove = custom_sources[choice]
+        AVAILABLE_PROXY_SOURCES.pop(source_to_remove)
+        if source_to_remove in ENABLED_PROXY_SOURCES:
+            ENABLED_PROXY_SOURCES.remove(source_to_remove)
+        console.print(f"[success]Usunięto źródło proxy: {source_to_remove}[/success]")
+    else:
+        console.print("[info]Anulowano usuwanie źródła.[/info]")
+
+# Funkcja do pobierania proxy
+def fetch_proxies(source_name):
+    """Pobierz listę proxy z wybranego źródła."""
+    proxies = []
+    if source_name not in AVAILABLE_PROXY_SOURCES:
+        logging.warning(f"Źródło proxy '{source_name}' nie jest dostępne.")
+        return proxies
+
+    api_url = AVAILABLE_PROXY_SOURCES[source_name]
+    try:
+        response = http_get(api_url)
+        logging.debug(f"URL: {response.url}")
+        logging.debug(f"Status code: {response.status_code}")
+        logging.debug(f"Response text: {response.text[:200]}")  # Wyświetl pierwsze 200 znaków odpowiedzi
+
+        if response.status_code == 200:
+            data = response.text
+            proxies.extend(parse_proxy_data(api_url, data, source_name))
+        else:
+            logging.warning(f"Błąd pobierania proxy z {source_name}: Status {response.status_code}")
+    except Exception as e:
+        logging.warning(f"Błąd pobierania proxy z {source_name}: {e}")
+    return proxies
+
+# Funkcja do przetwarzania danych proxy
+def parse_proxy_data(api_url, data, source_name):
+    """Przetwórz dane proxy."""
+    proxies = []
+    try:
+        if "geonode" in api_url.lower():
+            json_data = json.loads(data)
+            for item in json_data.get("data", []):
+                proxy = {
+                    "ip": item["ip"],
+                    "port": item["port"],
+                    "country": item.get("country"),
+                    "country_code": item.get("country_code")
+                }
+                proxies.append(proxy)
+        else:
+            lines = data.strip().splitlines()
+            for line in lines:
+                if ":" in line:
+                    ip, port = line.split(":")
+                    proxy = {"ip": ip.strip(), "port": port.strip(), "country": None, "country_code": None}
+                    proxies.append(proxy)
+    except Exception as e:
+        logging.error(f"Błąd przetwarzania danych z {source_name}: {e}")
+    return proxies
+
+# Funkcja do testowania listy proxy z użyciem Rich Progress
+def test_proxies(proxies, source_names=None, source_stats=None):
+    """Przetestuj listę proxy (i kandydatów pobieranych równolegle ze źródeł source_names), zwróć ich status (Ctrl+C przerywa testy)."""
+    total = len(proxies)
+    outcome = {'results': []}
+    cancel_event = threading.Event()
+
+    if source_names:
+        console.print(f"[info]Pobieranie i testowanie proxy z {len(source_names)} źródeł (do {PROXY_TEST_ENOUGH} działających)...[/info]")
+    else:
+        console.print(f"[info]Testowanie {total} proxy (do {PROXY_TEST_ENOUGH} działających)...[/info]")
+
+    from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+        TimeElapsedColumn(),
+        console=console
+    ) as progress:
+        task = progress.add_task("Testowanie proxy", total=total or None)
+
+        def on_result(done, working, candidates):
+            progress.update(task, completed=done, total=candidates, description=f"Testowanie proxy (działa: {working})")
+
+        def worker():
+            try:
+                outcome['results'] = run_proxy_tests(proxies, PROXY_TEST_ENOUGH, on_result, cancel_event,
+                                                     source_names=source_names, source_stats=source_stats)
+            except Exception as e:
+                logging.error(f"Błąd testowania proxy: {e}")
+
+        # Pętla asyncio działa w osobnym wątku, żeby Ctrl+C w głównym wątku mógł zakończyć testy z wynikami częściowymi
+        thread = threading.Thread(target=worker, name="proxy-tester", daemon=True)
+        start = time.perf_counter()
+        thread.start()
+        try:
+            while thread.is_alive():
+                thread.join(0.2)
+        except KeyboardInterrupt:
+            cancel_event.set()
+            console.print("[info]Przerywanie testów proxy...[/info]")
+            thread.join()
+    results = outcome['results']
+    working = sum(1 for _, is_working, _ in results if is_working)
+    logging.info(f"Test proxy: {len(results)} przetestowanych, {working} działających "
+                 f"w {time.perf_counter() - start:.1f} s")
+    return results
+
+# Funkcja do asynchronicznego testowania jednego proxy
+async def check_proxy_async(proxy, semaphore, request_bytes, stopped):
+    """Połącz się z proxy (szybki test TCP), wyślij przez nie zapytanie do PROXY_TEST_URL; zwraca (proxy, działa, latencja, kraj)."""
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(proxy['ip'], int(proxy['port'])), PROXY_CONNECT_TIMEOUT)
+        except (OSError, ValueError, asyncio.TimeoutError):
+            return proxy, False, None, None
+        if stopped.is_set():
+            # wait_for może zwrócić wynik mimo anulowania zadania - nie zaczynaj wtedy kolejnego oczekiwania
+            writer.close()
+            return proxy, False, None, None
+        try:
+            writer.write(request_bytes)
+            await writer.drain()
+            response = await asyncio.wait_for(read_proxy_response(reader), PROXY_HTTP_TIMEOUT)
+        except (OSError, asyncio.TimeoutError):
+            return proxy, False, None, None
+        finally:
+            writer.close()
+        latency = time.perf_counter() - start
+    head, _, body = response.partition(b"\r\n\r\n")
+    status_line = head.split(b"\r\n", 1)[0].split()
+    if len(status_line) < 2 or status_line[1] != b"200":
+        return proxy, False, None, None
+    try:
+        # Proxy zwracające stronę HTML zamiast odpowiedzi API nie działa poprawnie
+        data = json.loads(body)
+    except ValueError:
+        return proxy, False, None, None
+    return proxy, True, latency, data.get("countryCode") if isinstance(data, dict) else None
+
+# Funkcja do odczytu odpowiedzi HTTP/1.0 z proxy
+async def read_proxy_response(reader):
+    """Czytaj odpowiedź do zamknięcia połączenia (najwyżej PROXY_RESPONSE_LIMIT bajtów)."""
+    chunks = []
+    size = 0
+    while size < PROXY_RESPONSE_LIMIT:
+        chunk = await reader.read(16384)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    return b"".join(chunks)
+
+# Funkcja do asynchronicznego testowania listy proxy
+async def test_proxies_async(proxies, concurrency=None, max_working=None, progress_callback=None, cancel_event=None,
+                             source_names=None, source_stats=None):
+    """Testuj proxy współbieżnie; kończy po znalezieniu max_working działających lub po ustawieniu cancel_event.
+
+    Źródła z source_names są pobierane równolegle w tle, a ich kandydaci trafiają do testów zaraz po pobraniu
+    (bez powtórzeń IP:PORT). Statystyki źródeł są zapisywane w słowniku source_stats.
+    """
+    target = urllib.parse.urlsplit(PROXY_TEST_URL)
+    # HTTP/1.0 z pełnym adresem - proxy zamyka połączenie po odpowiedzi, bez kodowania chunked
+    request_bytes = (f"GET {PROXY_TEST_URL} HTTP/1.0\r\nHost: {target.netloc}\r\n"
+                     f"User-Agent: Mozilla/5.0\r\nAccept: application/json\r\n\r\n").encode("ascii")
+    semaphore = asyncio.Semaphore(concurrency or PROXY_ASYNC_CONCURRENCY)
+    finished = asyncio.Queue()
+    stopped = asyncio.Event()
+    tasks = []
+    seen = set()
+
+    def submit(batch):
+        added = 0
+        for proxy in batch:
+            key = f"{proxy['ip']}:{proxy['port']}"
+            if key in seen:
+                continue
+            seen.add(key)
+            task = asyncio.ensure_future(check_proxy_async(proxy, semaphore, request_bytes, stopped))
+            task.add_done_callback(finished.put_nowait)
+            tasks.append(task)
+            added += 1
+        return added
+
+    submit(proxies)
+    fetches = {}
+    executor = None
+    if source_names:
+        executor = concurrent_futures.ThreadPoolExecutor(max_workers=len(source_names))
+        loop = asyncio.get_running_loop()
+        for source_name in source_names:
+            fetch = loop.run_in_executor(executor, fetch_proxy_source, source_name)
+            fetch.add_done_callback(finished.put_nowait)
+            fetches[fetch] = source_name
+            tasks.append(fetch)
+    if cancel_event:
+        # Co 0.1 s pusty wpis w kolejce, żeby cancel_event był sprawdzany także wtedy, gdy żaden test się nie kończy
+        tasks.append(asyncio.ensure_future(queue_ticks(finished, 0.1)))
+    results = []
+    working = 0
+    try:
+        while len(results) < len(seen) or fetches:
+            task = await finished.get()
+            if task in fetches:
+                # Kandydaci ze źródła idą do testów od razu, znane z bazy jako pierwsze
+                source_name = fetches.pop(task)
+                batch, stats = task.result()
+                stats['new'] = submit(rank_proxies(batch))
+                if source_stats is not None:
+                    source_stats[source_name] = stats
+                if progress_callback:
+                    progress_callback(len(results), working, len(seen))
+            elif task is not None:
+                proxy, is_working, latency, country_code = task.result()
+                proxy['country_code'] = country_code or proxy.get('country_code')
+                results.append((proxy, is_working, latency))
+                working += is_working
+                if progress_callback:
+                    progress_callback(len(results), working, len(seen))
+            if (max_working and working >= max_working) or (cancel_event and cancel_event.is_set()):
+                break
+    finally:
+        # Wczesne zakończenie - pozostałe testy są anulowane, a ich gniazda zamykane
+        stopped.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if executor is not None:
+            # Trwające pobrania nie blokują zakończenia testów
+            executor.shutdown(wait=False)
+    if source_stats is not None:
+        for proxy, is_working, latency in results:
+            stats = source_stats.get(proxy.get('source'))
+            if stats is not None and is_working:
+                stats['working'] += 1
+                stats['latencies'].append(latency)
+    return results
+
+# Funkcja do pobierania kandydatów z jednego źródła z pomiarem czasu
+def fetch_proxy_source(source_name):
+    """Pobierz proxy ze źródła (w wątku); zwraca listę proxy oznaczonych źródłem i statystyki pobrania."""
+    start = time.perf_counter()
+    proxies = fetch_proxies(source_name)
+    for proxy in proxies:
+        proxy['source'] = source_name
+    stats = {'fetched': len(proxies), 'new': 0, 'working': 0, 'latencies': [],
+             'fetch_time': time.perf_counter() - start}
+    return proxies, stats
+
+# Funkcja do cyklicznego budzenia pętli czekającej na kolejce
+async def queue_ticks(queue, interval):
+    """Wstawiaj None do kolejki co interval sekund (do anulowania)."""
+    while True:
+        await asyncio.sleep(interval)
+        queue.put_nowait(None)
+
+# Funkcja do uruchamiania testów proxy w pętli asyncio
+def run_proxy_tests(proxies, max_working=None, progress_callback=None, cancel_event=None, concurrency=None,
+                    source_names=None, source_stats=None):
+    """Synchroniczna nakładka na test_proxies_async; zwraca listę (proxy, działa, latencja) przetestowanych proxy."""
+    return asyncio.run(test_proxies_async(proxies, concurrency, max_working, progress_callback, cancel_event,
+                                          source_names, source_stats))
+
+# Funkcja do testowania połączenia przez proxy
+def test_proxy(proxy_url):
+    """Testuj połączenie przez ustawione proxy."""
+    try:
+        response = http_get("http://ip-api.com/json", proxy=proxy_url, profile="proxy-test", timeout=(5, 10))
+        if response.status_code == 200:
+            data = response.json()
+            country = data.get("country", "Nieznany")
+            ip = data.get("query", "Nieznany")
+            console.print(f"[success]Proxy działa! Twój adres IP: {ip} (Kraj: {country})[/success]")
+            return True
+        else:
+            console.print("[error]Nie udało się połączyć przez proxy.[/error]")
+            return False
+    except Exception as e:
+        logging.error(f"Błąd podczas testowania proxy: {e}")
+        console.print(f"[error]Błąd podczas testowania proxy: {e}[/error]")
+        return False
+
+# Funkcja do szybkiego testowania proxy (bez pomiaru latencji)
+def test_proxy_quick(proxy):
+    """Szybko sprawdź, czy proxy działa."""
+    proxy_url = f"{proxy['ip']}:{proxy['port']}"
+    try:
+        response = http_get("http://www.google.com", proxy=proxy_url, profile="proxy-test")
+        return response.status_code == 200
+    except requests.exceptions.RequestException:
+        return False
+
+# Funkcja do wczytywania bazy skuteczności proxy
+def get_proxy_db():
+    """Zwróć bazę wyników testów proxy (IP:PORT -> statystyki), wczytując ją z pliku przy pierwszym użyciu.
+
+    Iterowanie i zmiany bazy wymagają PROXY_DB_LOCK (monitor proxy zapisuje wyniki z własnego wątku).
+    """
+    global PROXY_DB
+    with PROXY_DB_LOCK:
+        if PROXY_DB is None:
+            try:
+                with open(resource_path(PROXY_DB_FILE), "r", encoding="utf-8") as file:
+                    PROXY_DB = json.load(file)
+            except FileNotFoundError:
+                PROXY_DB = {}
+            except Exception as e:
+                logging.warning(f"Nie udało się wczytać bazy proxy: {e}")
+                PROXY_DB = {}
+        return PROXY_DB
+
+# Funkcja do zapisu bazy skuteczności proxy
+def save_proxy_db():
+    """Zapisz bazę wyników testów proxy."""
+    db_path = resource_path(PROXY_DB_FILE)
+    tmp_path = db_path + ".tmp"
+    try:
+        with PROXY_DB_LOCK:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(get_proxy_db(), file)
+            os.replace(tmp_path, db_path)
+    except Exception as e:
+        logging.error(f"Nie udało się zapisać bazy proxy: {e}")
+
+# Funkcja do zapisywania wyników testów w bazie proxy
+def record_proxy_results(results, now=None):
+    """Dopisz wyniki (proxy, działa, latencja) do bazy; nieznane proxy, które nie działają, są pomijane."""
+    with PROXY_DB_LOCK:
+        db = get_proxy_db()
+        now = now or time.time()
+        for proxy, is_working, latency in results:
+            key = f"{proxy['ip']}:{proxy['port']}"
+            entry = db.get(key)
+            if entry is None:
+                if not is_working:
+                    continue
+                entry = db[key] = {'successes': 0.0, 'tests': 0.0, 'latencies': [], 'last_tested': now,
+                                   'last_seen': None, 'country_code': None}
+            # Starsze wyniki ważą mniej - liczniki maleją o połowę co PROXY_DB_HALF_LIFE_HOURS
+            decay = 0.5 ** (max(now - entry['last_tested'], 0) / (PROXY_DB_HALF_LIFE_HOURS * 3600))
+            entry['successes'] = entry['successes'] * decay + (1 if is_working else 0)
+            entry['tests'] = entry['tests'] * decay + 1
+            entry['last_tested'] = now
+            if is_working:
+                entry['last_seen'] = now
+                if latency is not None:
+                    entry['latencies'] = (entry['latencies'] + [round(latency * 1000)])[-PROXY_DB_LATENCY_SAMPLES:]
+            entry['country_code'] = proxy.get('country_code') or entry['country_code']
+        prune_proxy_db(db, now)
+        save_proxy_db()
+
+# Funkcja do usuwania przestarzałych wpisów z bazy proxy
+def prune_proxy_db(db, now):
+    """Usuń proxy niewidziane od PROXY_DB_MAX_AGE_DAYS dni i ogranicz bazę do PROXY_DB_MAX_ENTRIES najlepszych."""
+    max_age = PROXY_DB_MAX_AGE_DAYS * 86400
+    for key in [key for key, entry in db.items() if now - (entry['last_seen'] or 0) > max_age]:
+        del db[key]
+    if len(db) > PROXY_DB_MAX_ENTRIES:
+        ranked = sorted(db, key=lambda key: proxy_score(db[key], now)[0], reverse=True)
+        for key in ranked[PROXY_DB_MAX_ENTRIES:]:
+            del db[key]
+
+# Funkcja do wyznaczania percentyla latencji
+def latency_percentile(latencies, percent):
+    """Zwróć percentyl (metodą najbliższej pozycji) z listy latencji lub None dla pustej listy."""
+    if not latencies:
+        return None
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+# Funkcja do liczenia oceny proxy
+def proxy_score(entry, now=None):
+    """Zwróć (ocena, skuteczność, mediana latencji w ms); im wyższa ocena, tym lepsze proxy."""
+    now = now or time.time()
+    decay = 0.5 ** (max(now - entry['last_tested'], 0) / (PROXY_DB_HALF_LIFE_HOURS * 3600))
+    # Wygładzenie (+1/+2): pojedynczy test nie daje 100%, a dawne wyniki z czasem zbliżają się do 50%
+    success_rate = (entry['successes'] * decay + 1) / (entry['tests'] * decay + 2)
+    median = latency_percentile(entry['latencies'], 50)
+    latency_penalty = 1 + (median if median is not None else PROXY_HTTP_TIMEOUT * 1000) / 1000
+    return success_rate / latency_penalty, success_rate, median
+
+# Funkcja do ustawiania kandydatów w kolejności oceny
+def rank_proxies(proxies):
+    """Posortuj kandydatów: najpierw znane z bazy (według oceny), potem pozostałe w pierwotnej kolejności."""
+    db = get_proxy_db()
+    now = time.time()
+    scores = {}
+    with PROXY_DB_LOCK:
+        for proxy in proxies:
+            entry = db.get(f"{proxy['ip']}:{proxy['port']}")
+            if entry is not None:
+                scores[id(proxy)] = proxy_score(entry, now)[0]
+    return sorted(proxies, key=lambda proxy: -scores.get(id(proxy), -1))
+
+# Funkcja do pobierania najlepszych proxy z bazy
+def known_good_proxies(limit=None):
+    """Zwróć proxy z bazy, które kiedyś działały, posortowane według oceny (w formacie parse_proxy_data)."""
+    db = get_proxy_db()
+    now = time.time()
+    with PROXY_DB_LOCK:
+        ranked = sorted(db.items(), key=lambda item: proxy_score(item[1], now)[0], reverse=True)
+    proxies = []
+    for key, entry in ranked[:limit or PROXY_DB_RETEST]:
+        ip, port = key.rsplit(":", 1)
+        proxies.append({"ip": ip, "port": port, "country": None, "country_code": entry['country_code']})
+    return proxies
+
+# Funkcja do uruchamiania monitora proxy
+def start_proxy_monitor(standby=None):
+    """Uruchom w tle monitor aktywnego proxy; standby to lista zapasowych proxy (IP:PORT) w kolejności preferencji."""
+    with PROXY_MONITOR_LOCK:
+        if standby is not None:
+            PROXY_MONITOR_STATUS['standby'] = {proxy_url: None for proxy_url in standby[:PROXY_STANDBY_SIZE] if proxy_url != PROXY_URL}
+        PROXY_MONITOR_STATUS['failures'] = 0
+        thread = PROXY_MONITOR_STATUS['thread']
+        if thread is not None and thread.is_alive():
+            return
+        stop_event = threading.Event()
+        thread = threading.Thread(target=run_proxy_monitor, args=(stop_event,), name="proxy-monitor", daemon=True)
+        PROXY_MONITOR_STATUS.update(thread=thread, stop_event=stop_event)
+        thread.start()
+
+# Funkcja do zatrzymywania monitora proxy
+def stop_proxy_monitor():
+    """Zatrzymaj monitor proxy (np. po wyłączeniu proxy)."""
+    with PROXY_MONITOR_LOCK:
+        stop_event = PROXY_MONITOR_STATUS['stop_event']
+        PROXY_MONITOR_STATUS.update(thread=None, stop_event=None)
+    if stop_event is not None:
+        stop_event.set()
+
+# Funkcja wykonywana w wątku monitora proxy
+def run_proxy_monitor(stop_event):
+    """Co PROXY_MONITOR_INTERVAL sekund sprawdzaj aktywne proxy i zapasowe."""
+    while not stop_event.wait(PROXY_MONITOR_INTERVAL):
+        try:
+            check_proxy_health()
+        except Exception as e:
+            logging.exception(f"Błąd monitora proxy: {e}")
+        finally:
+            # Sesje kandydatów sprawdzanych przy przełączaniu nie są potrzebne do następnego cyklu
+            release_proxy_test_sessions()
+
+# Funkcja do jednorazowego sprawdzenia aktywnego i zapasowych proxy
+def check_proxy_health():
+    """Sprawdź aktywne proxy zapytaniem HTTP, a zapasowe samym połączeniem TCP; przełącz proxy, gdy aktywne zawodzi."""
+    active = PROXY_URL
+    if not active:
+        return
+    is_working, latency = check_proxy_http(active)
+    status = PROXY_MONITOR_STATUS
+    status['last_check'] = time.time()
+    status['latency'] = latency
+    refill_proxy_standby(active)
+    with PROXY_MONITOR_LOCK:
+        standby = list(status['standby'])
+    # Połączenia testowe bez blokady; wyniki są nanoszone pod PROXY_MONITOR_LOCK
+    for proxy_url in standby:
+        connect_latency = probe_proxy_connect(proxy_url)
+        with PROXY_MONITOR_LOCK:
+            if connect_latency is None:
+                status['standby'].pop(proxy_url, None)
+            elif proxy_url in status['standby']:
+                status['standby'][proxy_url] = connect_latency
+        if connect_latency is None:
+            log_proxy_event(f"Zapasowe proxy {proxy_url} nie odpowiada - usunięto z puli")
+    with PROXY_MONITOR_LOCK:
+        if is_working and latency <= PROXY_MONITOR_MAX_LATENCY:
+            status['failures'] = 0
+            return
+        status['failures'] += 1
+    reason = "nie działa" if not is_working else f"latencja {latency * 1000:.0f} ms"
+    logging.warning(f"Monitor proxy: {active} {reason} ({status['failures']}/{PROXY_MONITOR_FAILURES})")
+    if status['failures'] >= PROXY_MONITOR_FAILURES:
+        failover_proxy(active, reason)
+
+# Funkcja do przełączania na zapasowe proxy
+def failover_proxy(active, reason):
+    """Przełącz PROXY_URL na najszybsze działające proxy z puli zapasowej; zwraca nowe proxy lub None."""
+    global PROXY_URL
+    status = PROXY_MONITOR_STATUS
+    start = time.perf_counter()
+    with PROXY_MONITOR_LOCK:
+        standby = dict(status['standby'])
+    candidates = sorted(standby, key=lambda proxy_url: standby[proxy_url] or PROXY_CONNECT_TIMEOUT)
+    for candidate in candidates:
+        is_working, latency = check_proxy_http(candidate)
+        with PROXY_MONITOR_LOCK:
+            status['standby'].pop(candidate, None)
+        record_proxy_results([(proxy_from_url(candidate), is_working, latency)])
+        if not is_working:
+            continue
+        with PROXY_MONITOR_LOCK:
+            if PROXY_URL != active:
+                # Proxy zmieniono w międzyczasie ręcznie - nie nadpisuj wyboru użytkownika
+                return None
+            PROXY_URL = candidate
+            status['failures'] = 0
+        log_proxy_event(f"Przełączono proxy {active} -> {candidate} ({reason}); nowe proxy {latency * 1000:.0f} ms, "
+                        f"przełączenie {time.perf_counter() - start:.2f} s")
+        record_proxy_results([(proxy_from_url(active), False, None)])
+        refill_proxy_standby(candidate)
+        return candidate
+    log_proxy_event(f"Proxy {active} {reason}, brak działającego proxy zapasowego")
+    return None
+
+# Funkcja do uzupełniania puli zapasowych proxy
+def refill_proxy_standby(active):
+    """Dobierz do puli zapasowej najlepsze proxy z bazy (bez aktywnego), aż będzie ich PROXY_STANDBY_SIZE."""
+    standby = PROXY_MONITOR_STATUS['standby']
+    if len(standby) >= PROXY_STANDBY_SIZE:
+        return
+    known = known_good_proxies(PROXY_STANDBY_SIZE * 2)
+    with PROXY_MONITOR_LOCK:
+        for proxy in known:
+            proxy_url = f"{proxy['ip']}:{proxy['port']}"
+            if len(standby) >= PROXY_STANDBY_SIZE:
+                break
+            if proxy_url != active and proxy_url not in standby:
+                standby[proxy_url] = None
+
+# Funkcja do sprawdzania proxy zapytaniem HTTP przez współdzieloną sesję
+def check_proxy_http(proxy_url):
+    """Wyślij zapytanie do PROXY_TEST_URL przez proxy (połączenie keep-alive z puli); zwraca (działa, latencja)."""
+    start = time.perf_counter()
+    try:
+        response = http_get(PROXY_TEST_URL, proxy=proxy_url, profile="proxy-test")
+        latency = time.perf_counter() - start
+        if response.status_code == 200:
+            response.json()
+            return True, latency
+    except (requests.exceptions.RequestException, ValueError):
+        pass
+    return False, None
+
+# Funkcja do taniego sprawdzania, czy proxy przyjmuje połączenia
+def probe_proxy_connect(proxy_url):
+    """Zmierz czas nawiązania połączenia TCP z proxy; None, jeśli się nie udało."""
+    ip, _, port = proxy_url.rpartition(":")
+    start = time.perf_counter()
+    try:
+        with socket.create_connection((ip, int(port)), timeout=PROXY_CONNECT_TIMEOUT):
+            return time.perf_counter() - start
+    except (OSError, ValueError):
+        return None
+
+# Funkcja do zamiany adresu IP:PORT na słownik proxy
+def proxy_from_url(proxy_url):
+    """Zwróć słownik proxy w formacie parse_proxy_data dla adresu IP:PORT."""
+    ip, _, port = proxy_url.rpartition(":")
+    return {"ip": ip, "port": port, "country": None, "country_code": None}
+
+# Funkcja do zapisywania zdarzeń monitora proxy
+def log_proxy_event(message):
+    """Zapisz zdarzenie monitora proxy w logu i na liście ostatnich zdarzeń."""
+    logging.warning(f"Monitor proxy: {message}")
+    with PROXY_MONITOR_LOCK:
+        events = PROXY_MONITOR_STATUS['events']
+        events.append((time.time(), message))
+        del events[:-PROXY_MONITOR_EVENTS]
+
+# Funkcja do wyświetlania stanu monitora proxy
+def show_proxy_monitor_status():
+    """Wyświetl aktywne proxy, wynik ostatniego sprawdzenia, pulę zapasową i ostatnie przełączenia."""
+    status = PROXY_MONITOR_STATUS
+    if not PROXY_URL:
+        console.print("[info]Proxy jest wyłączone - monitor nie działa.[/info]")
+        return
+    running = status['thread'] is not None and status['thread'].is_alive()
+    console.print(f"[info]Aktywne proxy: {PROXY_URL}, monitor {'działa' if running else 'zatrzymany'} "
+                  f"(co {PROXY_MONITOR_INTERVAL} s).[/info]")
+    if status['last_check']:
+        latency = f"{status['latency'] * 1000:.0f} ms" if status['latency'] is not None else "brak odpowiedzi"
+        console.print(f"[info]Ostatnie sprawdzenie: {datetime.fromtimestamp(status['last_check']):%H:%M:%S}, "
+                      f"{latency}, nieudane z rzędu: {status['failures']}[/info]")
+    table = Table(show_header=True, header_style="bold magenta", box=box.ROUNDED)
+    table.add_column("Zapasowe proxy", style="options")
+    table.add_column("Połączenie TCP", justify="right")
+    with PROXY_MONITOR_LOCK:
+        standby = list(status['standby'].items())
+        events = list(status['events'])
+    for proxy_url, connect_latency in standby:
+        table.add_row(proxy_url, f"{connect_latency * 1000:.0f} ms" if connect_latency is not None else "-")
+    console.print(table)
+    for timestamp, message in events:
+        console.print(f"[highlight]{datetime.fromtimestamp(timestamp):%H:%M:%S}[/highlight] {message}")
+
+# Funkcja do wyboru działającego proxy
+def select_working_proxy(tested_proxies):
+    """Pozwól użytkownikowi wybrać działające proxy i upewnij się, że działa."""
+    global PROXY_URL
+    working_proxies = [(proxy, latency) for proxy, is_working, latency in tested_proxies if is_working]
+    if not working_proxies:
+        console.print("[error]Brak działających proxy do wyświetlenia.[/error]")
+        wait_for_enter("Naciśnij Enter, aby kontynuować...")
+        return
+
+    # Kolejność według oceny z historii testów (skuteczność i mediana latencji), a nie jednego pomiaru
+    db = get_proxy_db()
+    now = time.time()
+    history = {}
+    with PROXY_DB_LOCK:
+        for proxy, _ in working_proxies:
+            entry = db.get(f"{proxy['ip']}:{proxy['port']}")
+            if entry is not None:
+                history[id(proxy)] = proxy_score(entry, now)
+    # Najpierw proxy z historią (malejąco według oceny), potem pozostałe według zmierzonej latencji
+    working_proxies.sort(key=lambda item: (id(item[0]) not in history,
+                                           -history[id(item[0])][0] if id(item[0]) in history else 0.0,
+                                           item[1] if item[1] is not None else float("inf")))
+
+    while True:
+        options = []
+        for idx, (proxy, latency) in enumerate(working_proxies):
+            country_code = proxy.get("country_code", "??")
+            proxy_str = f"{proxy['ip']}:{proxy['port']} ({country_code}) - {latency*1000:.0f} ms"
+            if id(proxy) in history:
+                _, success_rate, median = history[id(proxy)]
+                proxy_str += f", skuteczność {success_rate * 100:.0f}%"
+                if median is not None:
+                    proxy_str += f", mediana {median:.0f} ms"
+            options.append(proxy_str)
+            if len(options) >= 50:  # Ograniczenie do 50 działających proxy
+                break
+
+        if not options:
+            console.print("[error]Brak działających proxy do wyświetlenia.[/error]")
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+            return
+
+        choice = display_menu(options, "Wybierz Proxy")
+        if choice is not None:
+            selected_proxy = working_proxies[choice][0]
+            proxy_url = f"{selected_proxy['ip']}:{selected_proxy['port']}"
+            console.print(f"[info]Testowanie wybranego proxy: {proxy_url}...[/info]")
+            is_working = test_proxy(proxy_url)
+            record_proxy_results([(selected_proxy, is_working, None)])
+            if is_working:
+                PROXY_URL = proxy_url
+                # Pozostałe działające proxy (w kolejności oceny) stają się pulą zapasową monitora
+                start_proxy_monitor([f"{proxy['ip']}:{proxy['port']}" for proxy, _ in working_proxies])
+                console.print(f"[success]Ustawiono proxy: {PROXY_URL}[/success]")
+                wait_for_enter("Naciśnij Enter, aby kontynuować...")
+                return
+            else:
+                console.print("[error]Wybrane proxy nie działa poprawnie. Wybierz inne.[/error]")
+                # Usuń niedziałające proxy z listy
+                working_proxies.pop(choice)
+                if not working_proxies:
+                    console.print("[error]Brak pozostałych działających proxy do wybrania.[/error]")
+                    wait_for_enter("Naciśnij Enter, aby kontynuować...")
+                    return
+        else:
+            console.print("[info]Nie wybrano proxy.[/info]")
+            return
+
+# Funkcja do sprawdzania aktualnego adresu IP
+def check_my_ip():
+    """Sprawdź aktualny adres IP."""
+    try:
+        response = http_get("http://ip-api.com/json", proxy=PROXY_URL)
+        if response.status_code == 200:
+            data = response.json()
+            ip = data.get("query", "Nieznany")
+            country = data.get("country", "Nieznany")
+            console.print(f"[success]Twój aktualny adres IP: {ip} (Kraj: {country})[/success]")
+        else:
+            console.print("[error]Nie udało się pobrać adresu IP.[/error]")
+    except Exception as e:
+        logging.error(f"Błąd podczas sprawdzania IP: {e}")
+        console.print(f"[error]Błąd podczas sprawdzania IP: {e}[/error]")
+
+# Funkcja do odtwarzania strumienia za pomocą VLC
+def play_stream_vlc(url, channel_name, options=None, new_window=False, zap=None):
+    """Odtwórz strumień w VLC bez blokowania programu; działające VLC przełącza kanał przez interfejs RC."""
+    console.print(f"[info]Odtwarzanie kanału: [bold]{channel_name}[/bold][/info]")
+    if zap is None:
+        zap = start_zap(channel_name)
+    watched = False  # Po uruchomieniu VLC lub wysłaniu poleceń RC pomiar zapisuje wątek VLCPlayer
+    try:
+        global VLC_PATH
+        path_start = time.perf_counter()
+        if VLC_PATH is None:
+            VLC_PATH = get_vlc_path()
+            if VLC_PATH is None:
+                zap['error'] = "Nie znaleziono VLC"
+                console.print("[error]Nie znaleziono aplikacji VLC Media Player.[/error]")
+                wait_for_enter("Upewnij się, że VLC jest zainstalowany. Naciśnij Enter, aby kontynuować...")
+                return
+            else:
+                save_config()
+
+        if not os.path.exists(VLC_PATH):
+            console.print("[error]Ścieżka do VLC jest nieprawidłowa.[/error]")
+            configure_vlc_path()
+            if VLC_PATH is None:
+                zap['error'] = "Nieprawidłowa ścieżka do VLC"
+                return
+        zap_phase(zap, 'vlc_path', time.perf_counter() - path_start)
+
+        if ZAP_PROBE_STREAM:
+            # Osobne zapytanie przed startem VLC - wydłuża zmianę kanału, dlatego domyślnie wyłączone.
+            # Wynik starszego sprawdzenia (STREAM_HEALTH) nie jest pomiarem tej zmiany kanału.
+            health = probe_stream(get_http_session(PROXY_URL, "probe"), url, options)
+            STREAM_HEALTH[url] = health
+            zap_phase(zap, 'stream_ttfb', health['ttfb'])
+
+        reap_players()
+        launch_start = time.perf_counter()
+        player = PLAYERS[-1] if PLAYERS and not new_window else None
+        # Opcji #EXTVLCOPT ani zmiany proxy nie da się przekazać przez RC - wtedy VLC jest uruchamiany ponownie
+        if player is not None and not options and player.proxy == PROXY_URL and player.vlc_path == VLC_PATH:
+            if player.switch(url, channel_name, zap, launch_start):
+                watched = True
+                return
+        if player is not None:
+            stop_players([player])
+        player = VLCPlayer(VLC_PATH, PROXY_URL)
+        player.start(url, channel_name, options, zap, launch_start)
+        watched = True
+        with PLAYER_LOCK:
+            PLAYERS.append(player)
+    except Exception as e:
+        if not watched:
+            zap['error'] = str(e)
+        logging.error(f"Błąd podczas uruchamiania VLC: {e}")
+        console.print(f"[error]Błąd podczas uruchamiania VLC: {e}[/error]")
+        wait_for_enter("Naciśnij Enter, aby kontynuować...")
+    finally:
+        if not watched:
+            finish_zap(zap)
+
+# Proces VLC sterowany przez interfejs RC (zdalne polecenia po TCP)
+class VLCPlayer:
+    """Jeden proces VLC: uruchamiany przez Popen, kanały przełączane poleceniami RC bez ponownego startu."""
+
+    def __init__(self, vlc_path, proxy=None):
+        self.vlc_path = vlc_path
+        self.proxy = proxy
+        self.process = None
+        self.rc_port = None
+        self.rc_socket = None
+        self.lock = threading.Lock()
+        self.channel_name = None
+        self.url = None
+        self.started_at = None
+        self.switch_started = None
+        self.last_switch = None  # (rodzaj, czas do odtwarzania w s) ostatniej zmiany kanału
+        self.switches = 0
+
+    def start(self, url, channel_name, options=None, zap=None, launch_start=None):
+        """Uruchom VLC z interfejsem RC na wolnym porcie lokalnym; nie czeka na zakończenie procesu."""
+        self.rc_port = free_local_port()
+        command = [self.vlc_path, url]
+        # Opcje z #EXTVLCOPT (np. http-user-agent) VLC przyjmuje jako ":opcja" po adresie
+        command.extend(f":{option}" for option in options or [])
+        command.extend(["--extraintf", "rc", "--rc-host", f"127.0.0.1:{self.rc_port}"])
+        if sys.platform == "win32":
+            command.append("--rc-quiet")  # Bez dodatkowego okna konsoli RC
+        if self.proxy:
+            command.extend(["--http-proxy", self.proxy])
+        self.switch_started = time.perf_counter()
+        self.process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.DEVNULL)
+        self.started_at = time.time()
+        self.channel_name = channel_name
+        self.url = url
+        self.watch_switch("uruchomienie", zap, launch_start)
+
+    def alive(self):
+        """Czy proces VLC nadal działa (poll odbiera też status zakończonego procesu, więc nie zostaje zombie)."""
+        return self.process is not None and self.process.poll() is None
+
+    def switch(self, url, channel_name, zap=None, launch_start=None):
+        """Przełącz kanał poleceniami RC; False, jeśli interfejs RC nie odpowiada.
+
+        Świeżo uruchomiony VLC może jeszcze nie nasłuchiwać na porcie RC - wtedy polecenia czekają w wątku
+        w tle (najwyżej PLAYER_RC_STARTUP_WAIT od startu procesu), a menu nie jest blokowane.
+        """
+        started = self.switch_started = time.perf_counter()
+        if self.rc_command("clear") is None:
+            if time.time() - self.started_at >= PLAYER_RC_STARTUP_WAIT:
+                return False
+            self.channel_name = channel_name
+            self.url = url
+            zap_phase(zap, 'launch', time.perf_counter() - (launch_start or started))
+            threading.Thread(target=self.queued_switch, args=(started, url, zap), name="vlc-rc-switch",
+                             daemon=True).start()
+            return True
+        if self.rc_command(f"add {url}") is None:
+            return False
+        self.channel_name = channel_name
+        self.url = url
+        self.switches += 1
+        self.watch_switch("przełączenie", zap, launch_start)
+        return True
+
+    def queued_switch(self, started, url, zap=None):
+        """Wyślij odłożone polecenia przełączenia, gdy VLC otworzy port RC; nowsza zmiana kanału unieważnia tę."""
+        deadline = self.started_at + PLAYER_RC_STARTUP_WAIT
+        while self.switch_started == started and self.alive():
+            if self.rc_command("clear") is not None and self.rc_command(f"add {url}") is not None:
+                self.switches += 1
+                self.watch_switch("przełączenie", zap)
+                return
+            if time.time() >= deadline:
+                logging.warning(f"VLC (PID {self.process.pid}): interfejs RC nie odpowiada, nie przełączono kanału")
+                if zap is not None:
+                    zap['error'] = "Interfejs RC nie odpowiada"
+                break
+            time.sleep(0.05)
+        finish_zap(zap)
+
+    def watch_switch(self, kind, zap=None, launch_start=None):
+        """W tle poczekaj, aż VLC zgłosi odtwarzanie, i zapisz czas zmiany kanału (także w pomiarze zap).
+
+        Od tej chwili rekord zap należy do wątku obserwującego - tylko on go uzupełnia i zapisuje (finish_zap).
+        """
+        started = self.switch_started
+        if launch_start is not None:
+            zap_phase(zap, 'launch', time.perf_counter() - launch_start)
+        if zap is not None:
+            zap['mode'] = kind
+
+        def watch():
+            deadline = started + PLAYER_SWITCH_TIMEOUT
+            try:
+                while time.perf_counter() < deadline and self.alive() and self.switch_started == started:
+                    if (self.rc_command("is_playing") or "").strip().endswith("1"):
+                        latency = time.perf_counter() - started
+                        self.last_switch = (kind, latency)
+                        PLAYER_SWITCH_TIMES.append((kind, latency))
+                        del PLAYER_SWITCH_TIMES[:-PLAYER_SWITCH_SAMPLES]
+                        zap_phase(zap, 'playing', latency)
+                        if zap is not None:
+                            # Całość: renderowanie EPG strony + od wyboru kanału do rozpoczęcia odtwarzania
+                            zap_phase(zap, 'total', zap['phases'].get('epg', 0) + time.perf_counter() - zap['started'])
+                        logging.info(f"VLC (PID {self.process.pid}): {kind} kanału '{self.channel_name}' w {latency:.2f} s")
+                        return
+                    time.sleep(0.05)
+            finally:
+                # Zapis także bez odtwarzania (limit czasu, zamknięte okno, kolejna zmiana kanału)
+                finish_zap(zap)
+
+        threading.Thread(target=watch, name="vlc-switch-watch", daemon=True).start()
+
+    def rc_command(self, command):
+        """Wyślij polecenie RC i zwróć odpowiedź (bez znaku zachęty) lub None, gdy interfejs jest niedostępny."""
+        with self.lock:
+            if self.rc_socket is None and not self.rc_connect():
+                return None
+            try:
+                self.rc_socket.sendall(command.encode("utf-8") + b"\n")
+                return self.rc_read()
+            except OSError:
+                self.rc_close()
+                return None
+
+    def rc_connect(self):
+        """Połącz się z interfejsem RC (jedna próba - VLC otwiera port dopiero po starcie)."""
+        try:
+            self.rc_socket = socket.create_connection(("127.0.0.1", self.rc_port), timeout=PLAYER_RC_TIMEOUT)
+            self.rc_read()  # Powitanie i pierwszy znak zachęty
+            return True
+        except OSError:
+            self.rc_close()
+            return False
+
+    def rc_read(self):
+        """Czytaj odpowiedź RC aż do znaku zachęty '> '."""
+        data = b""
+        while not data.endswith(b"> "):
+            chunk = self.rc_socket.recv(4096)
+            if not chunk:
+                raise OSError("Interfejs RC zamknął połączenie")
+            data += chunk
+        return data[:-2].decode("utf-8", errors="replace")
+
+    def rc_close(self):
+        if self.rc_socket is not None:
+            try:
+                self.rc_socket.close()
+            except OSError:
+                pass
+            self.rc_socket = None
+
+    def stop(self):
+        """Zamknij VLC: najpierw poleceniem RC, potem terminate/kill; zawsze odbiera status procesu."""
+        if self.alive():
+            self.rc_command("quit")
+            try:
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+                    self.process.wait()
+        self.rc_close()
+
+# Funkcja do rozpoczynania pomiaru zmiany kanału
+def start_zap(channel_name, group=None, epg_time=None):
+    """Zwróć rekord pomiaru zmiany kanału; fazy są dopisywane przez zap_phase, a rekord zapisuje finish_zap."""
+    zap = {'ts': time.time(), 'started': time.perf_counter(), 'channel': channel_name, 'group': group,
+           'mode': None, 'phases': {}}
+    zap_phase(zap, 'epg', epg_time)
+    return zap
+
+# Funkcja do zapisywania czasu fazy zmiany kanału
+def zap_phase(zap, phase, seconds):
+    """Zapisz czas fazy (w sekundach) w rekordzie pomiaru; None jest pomijane."""
+    if zap is not None and seconds is not None:
+        zap['phases'][phase] = round(seconds, 6)
+
+# Funkcja do zapisu pomiaru zmiany kanału
+def finish_zap(zap):
+    """Dopisz rekord do pliku metryk (JSON lines); wywołuje ją właściciel rekordu po ostatniej fazie."""
+    if zap is None:
+        return
+    metrics_path = resource_path(ZAP_METRICS_FILE)
+    try:
+        with ZAP_LOCK:
+            if zap.pop('started', None) is None:
+                return  # Już zapisany
+            if os.path.exists(metrics_path) and os.path.getsize(metrics_path) > ZAP_METRICS_MAX_MB * 1024 * 1024:
+                os.replace(metrics_path, metrics_path + ".1")
+            with open(metrics_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(zap, ensure_ascii=False) + "\n")
+    except Exception as e:
+        logging.warning(f"Nie udało się zapisać pomiaru zmiany kanału: {e}")
+
+# Funkcja do wczytywania pomiarów zmian kanału
+def load_zap_metrics():
+    """Wczytaj rekordy pomiarów z pliku metryk (pomijając uszkodzone linie)."""
+    records = []
+    try:
+        with open(resource_path(ZAP_METRICS_FILE), "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+# Funkcja do wyświetlania raportu czasów zmiany kanału
+def show_zap_report():
+    """Wyświetl p50/p95/p99 każdej fazy zmiany kanału oraz czas całkowity w podziale na grupy."""
+    records = load_zap_metrics()
+    if not records:
+        console.print("[info]Brak pomiarów - przełącz kilka kanałów, aby zebrać dane.[/info]")
+        return
+    table = Table(title=f"Fazy zmiany kanału ({len(records)} pomiarów)", show_header=True,
+                  header_style="bold magenta", box=box.ROUNDED)
+    table.add_column("Faza", style="options")
+    table.add_column("Pomiarów", justify="right")
+    for label in ("p50", "p95", "p99"):
+        table.add_column(label, justify="right")
+    for phase, label in ZAP_PHASES.items():
+        values = [record['phases'][phase] for record in records if record['phases'].get(phase) is not None]
+        table.add_row(label, str(len(values)), *zap_percentiles(values))
+    console.print(table)
+    if not ZAP_PROBE_STREAM and not any(record['phases'].get('stream_ttfb') is not None for record in records):
+        console.print("[info]Pierwszy bajt strumienia nie jest mierzony - włącz go opcją \"zap_probe_stream\": true "
+                      "w config.json (osobne zapytanie przed startem VLC wydłuża zmianę kanału).[/info]")
+
+    groups = {}
+    for record in records:
+        total = record['phases'].get('total')
+        if total is not None:
+            groups.setdefault(record.get('group') or "-", []).append(total)
+    table = Table(title="Czas całkowity według grup", show_header=True, header_style="bold magenta", box=box.ROUNDED)
+    table.add_column("Grupa", style="options")
+    table.add_column("Pomiarów", justify="right")
+    for label in ("p50", "p95", "p99"):
+        table.add_column(label, justify="right")
+    for group, values in sorted(groups.items(), key=lambda item: -len(item[1])):
+        table.add_row(group, str(len(values)), *zap_percentiles(values))
+    console.print(table)
+    failed = sum(1 for record in records if 'playing' not in record['phases'])
+    console.print(f"[info]Bez rozpoczęcia odtwarzania: {failed}. Plik metryk: {resource_path(ZAP_METRICS_FILE)}[/info]")
+
+# Funkcja do formatowania percentyli czasów
+def zap_percentiles(values):
+    """Zwróć teksty p50/p95/p99 (w ms) dla listy czasów w sekundach."""
+    return [f"{latency_percentile(values, percent) * 1000:.1f} ms" if values else "-" for percent in (50, 95, 99)]
+
+# Funkcja do wyszukiwania wolnego portu lokalnego
+def free_local_port():
+    """Zwróć numer wolnego portu TCP na 127.0.0.1."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+# Funkcja do usuwania zakończonych procesów VLC
+def reap_players():
+    """Usuń z listy odtwarzaczy zamknięte procesy VLC (odbierając ich status, żeby nie zostawały procesy zombie)."""
+    with PLAYER_LOCK:
+        for player in [player for player in PLAYERS if not player.alive()]:
+            player.rc_close()
+            PLAYERS.remove(player)
+
+# Funkcja do zamykania odtwarzaczy
+def stop_players(players=None):
+    """Zamknij wskazane (lub wszystkie) procesy VLC."""
+    with PLAYER_LOCK:
+        players = list(PLAYERS if players is None else players)
+        for player in players:
+            if player in PLAYERS:
+                PLAYERS.remove(player)
+    for player in players:
+        player.stop()
+
+# Funkcja do wyświetlania i zamykania uruchomionych odtwarzaczy
+def manage_players():
+    """Wyświetl uruchomione procesy VLC (PID, kanał, czasy przełączania) i pozwól je zamknąć."""
+    while True:
+        reap_players()
+        console.clear()
+        draw_header("Odtwarzacze VLC")
+        table = Table(show_header=True, header_style="bold magenta", box=box.ROUNDED)
+        table.add_column("Nr", style="dim", width=6)
+        table.add_column("PID", justify="right")
+        table.add_column("Kanał", style="options")
+        table.add_column("Działa od", justify="right")
+        table.add_column("Przełączeń", justify="right")
+        table.add_column("Ostatnia zmiana kanału", justify="right")
+        for idx, player in enumerate(list(PLAYERS), start=1):
+            last_switch = f"{player.last_switch[0]} {player.last_switch[1]:.2f} s" if player.last_switch else "-"
+            table.add_row(str(idx), str(player.process.pid), player.channel_name or "-",
+                          f"{time.time() - player.started_at:.0f} s", str(player.switches), last_switch)
+        console.print(table)
+        for kind in ("uruchomienie", "przełączenie"):
+            times = sorted(latency for sample_kind, latency in PLAYER_SWITCH_TIMES if sample_kind == kind)
+            if times:
+                console.print(f"[info]{kind.capitalize()}: {len(times)} pomiarów, mediana {times[len(times) // 2]:.2f} s[/info]")
+        console.print("[info]Podaj numer, aby zamknąć odtwarzacz, 'a' - zamknij wszystkie, 'z' - raport czasów zmiany kanału, 'r' - odśwież, 'q' - powrót[/info]")
+        choice = Prompt.ask("[bold cyan]Twój wybór[/bold cyan]").lower()
+        if choice == 'q':
+            break
+        elif choice == 'z':
+            show_zap_report()
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+        elif choice == 'a':
+            stop_players()
+        elif choice.isdigit() and 1 <= int(choice) <= len(PLAYERS):
+            stop_players([PLAYERS[int(choice) - 1]])
+        elif choice != 'r':
+            console.print("[error]Nieprawidłowy wybór. Spróbuj ponownie.[/error]")
+            time.sleep(1)
+
+# Funkcja do znajdowania ścieżki do VLC
+def get_vlc_path():
+    """Próbuj znaleźć plik wykonywalny VLC w standardowych lokalizacjach."""
+    possible_paths = [
+        r"C:\Program Files\VideoLAN\VLC\vlc.exe",
+        r"C:\Program Files (x86)\VideoLAN\VLC\vlc.exe",
+        r"/usr/bin/vlc",
+        r"/usr/local/bin/vlc",
+        r"/Applications/VLC.app/Contents/MacOS/VLC",
+        # Dodaj inne potencjalne ścieżki, jeśli to konieczne
+    ]
+    for path in possible_paths:
+        if os.path.exists(path):
+            return path
+    return None
+
+# Funkcja do konfiguracji ścieżki do VLC
+def configure_vlc_path():
+    """Pozwól użytkownikowi ustawić ścieżkę do VLC."""
+    global VLC_PATH
+    while True:
+        vlc_path = Prompt.ask("[bold yellow]Podaj pełną ścieżkę do pliku VLC lub 'q' aby anulować[/bold yellow]")
+        if vlc_path.lower() == 'q':
+            break
+        if os.path.exists(vlc_path):
+            VLC_PATH = vlc_path
+            console.print(f"[success]Ustawiono ścieżkę do VLC: {VLC_PATH}[/success]")
+            save_config()
+            wait_for_enter("Naciśnij Enter, aby kontynuować...")
+            break
+        else:
+            console.print("[error]Podana ścieżka jest nieprawidłowa. Spróbuj ponownie.[/error]")
+
+# Funkcja do rysowania nagłówka z logo
+def draw_header(title):
+    """Wyświetl nagłówek z logo za pomocą Rich."""
+    logo = r"""
+      _____   ___       ___    _____   ______     ________   __    __   ________    _____     ____       __    __    
+     / ____\ (  (       )  )  (_   _) (   __ \   (___  ___)  ) )  ( (  (___  ___)  / ___/    (    )      \ \  / /    
+    ( (___    \  \  _  /  /     | |    ) (__) )      ) )    ( (    ) )     ) )    ( (__      / /\ \      () \/ ()    
+     \___ \    \  \/ \/  /      | |   (    __/      ( (      \ \  / /     ( (      ) __)    ( (__) )     / _  _ \    
+         ) )    )   _   (       | |    ) \ \  _      ) )      \ \/ /       ) )    ( (        )    (     / / \/ \ \   
+     ___/ /     \  ( )  /      _| |__ ( ( \ \_))    ( (        \  /       ( (      \ \___   /  /\  \   /_/      \_\  
+    /____/       \_/ \_/      /_____(  )_) \__/     /__\        \/        /__\      \____\ /__(  )__\ (/          \) 
+                                                                                                                     
+    
+    
+    """
+    header_text = Text(logo + "\n" + title, justify="center", style="title")
+    header = Panel(header_text, style="bold green", expand=True, box=box.DOUBLE)
+    console.print(header)
+
+# Funkcja do oczekiwania na wciśnięcie Enter
+def wait_for_enter(prompt):
+    """Poczekaj na wciśnięcie Enter."""
+    console.print(f"[bold white]{prompt}[/bold white]")
+    Prompt.ask("", default="", show_default=False)
+
+# Funkcja do wyświetlania menu
+def display_menu(options, title="Menu"):
+    """Wyświetl menu za pomocą Rich i pobierz wybór użytkownika."""
+    while True:
+        console.clear()
+        draw_header(title)
+        table = Table(show_header=True, header_style="bold magenta", box=box.ROUNDED)
+        table.add_column("Nr", style="dim", width=6)
+        table.add_column("Opcja", style="options")
+
+        for idx, option in enumerate(options, start=1):
+            table.add_row(str(idx), option)
+
+        console.print(table)
+        console.print(f"[info]Wybierz opcję (1 - {len(options)}), lub 'q' aby wrócić.[/info]")
+        choice = Prompt.ask("[bold cyan]Twój wybór[/bold cyan]")
+        if choice.lower() == 'q':
+            return None
+        elif choice.isdigit():
+            num = int(choice)
+            if 1 <= num <= len(options):
+                return num - 1
+            else:
+                console.print("[error]Nieprawidłowy wybór. Spróbuj ponownie.[/error]")
+                time.sleep(1)
+        else:
+            console.print("[error]Nieprawidłowy wybór. Spróbuj ponownie.[/error]")
+            time.sleep(1)
+
+# Funkcja do wyszukiwania playlist w folderze
+def list_playlists(directory=None):
+    """Wyszukaj wszystkie playlisty M3U w podanym folderze."""
+    if directory is None:
+        directory = resource_path(PLAYLISTS_DIR)
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    return [f for f in os.listdir(directory) if f.endswith(".m3u")]
+
+# Funkcja do rozbioru wyrażenia filtra kanałów
+def parse_channel_filter(expression):
+    """Rozbierz wyrażenie 'pole op wartość[|wartość...]' na (pole, op, wartości ujednolicone fold_text).
+
+    Pola: group, name, url, health (ok/dead/unknown) lub dowolny atrybut #EXTINF (np. tvg-id).
+    Operatory: = (równe), != (różne), ~ (zawiera), !~ (nie zawiera), ^= (zaczyna się od).
+    Pusta wartość z = oznacza brak atrybutu (np. 'tvg-id=').
+    """
+    expression = expression.strip()
+    end = 0
+    while end < len(expression) and (expression[end].isalnum() or expression[end] in "-_"):
+        end += 1
+    field = expression[:end]
+    rest = expression[end:].lstrip()
+    op = next((op for op in CHANNEL_FILTER_OPS if rest.startswith(op)), None)
+    if not field or op is None:
+        raise ValueError(f"Nieprawidłowy filtr '{expression}' (oczekiwano np. group=Sport, name~hd, tvg-id=)")
+    values = tuple(fold_text(value.strip()) for value in rest[len(op):].split("|"))
+    return field, op, values
+
+# Funkcja do budowania predykatu z filtrów kanałów
+def compile_channel_filter(catalog, expressions):
+    """Zwróć (predykat idx -> bool lub None, posortowane indeksy kanałów do sprawdzenia lub None dla całej playlisty).
+
+    Warunki są łączone przez AND. Warunek group= zawęża przeglądanie do członków wskazanych grup.
+    """
+    conditions = [parse_channel_filter(expression) for expression in expressions or []]
+    candidates = None
+    for field, op, values in conditions:
+        if field == "group" and op == "=":
+            group_ids = [group_id for name, group_id in catalog.group_lookup.items() if fold_text(name) in values]
+            members = sorted(idx for group_id in group_ids for idx in catalog.group_members[group_id])
+            candidates = members if candidates is None else sorted(set(candidates).intersection(members))
+    if not conditions:
+        return None, candidates
+
+    # Nazwy ujednolicone przez indeks wyszukiwania nie muszą być przeliczane dla każdego kanału
+    index = catalog.search_index
+    folded_names = index.folded if index is not None and len(index.folded) == len(catalog.names) else None
+
+    def field_value(field, idx):
+        if field == "name":
+            return catalog.names[idx]
+        if field == "group":
+            return catalog.group_of(idx)
+        if field == "url":
+            return catalog.urls[idx]
+        if field == "health":
+            result = get_stream_health(catalog.urls[idx])
+            return "unknown" if result is None else "ok" if result['alive'] else "dead"
+        flat = catalog.attrs[idx]
+        for pos in range(0, len(flat), 2):
+            if flat[pos] == field:
+                return flat[pos + 1]
+        return ""
+
+    def matches(idx):
+        for field, op, values in conditions:
+            if field == "name" and folded_names is not None:
+                value = folded_names[idx]
+            else:
+                value = field_value(field, idx)
+                if value:
+                    value = fold_text(value)
+            if op in ("=", "!="):
+                hit = value in values
+            elif op == "^=":
+                hit = value.startswith(values)
+            else:
+                hit = any(part in value for part in values)
+            if hit != (op[0] != "!"):
+                return False
+        return True
+
+    return matches, candidates
+
+# Funkcja do wybierania kanałów do eksportu
+def iter_export_indices(catalog, expressions=None):
+    """Zwracaj kolejno identyfikatory kanałów spełniających filtry (w kolejności playlisty)."""
+    predicate, candidates = compile_channel_filter(catalog, expressions)
+    for idx in range(len(catalog)) if candidates is None else candidates:
+        if predicate is None or predicate(idx):
+            yield idx
+
+# Funkcja do hurtowego dopasowania kanałów do EPG
+def match_epg_ids(names):
+    """Zwróć słownik nazwa -> identyfikator kanału EPG (lub None) dla unikalnych nazw, na jednej migawce indeksu."""
+    with EPG_LOCK:
+        loaded, index = EPG_LOADED, EPG_MATCH_INDEX
+    if not loaded:
+        return {}
+    matched = {}
+    for name in names:
+        if name not in matched:
+            matched[name] = match_channel_epg(name, index)
+    return matched
+
+# Funkcja do generowania linii playlisty M3U
+def iter_m3u_lines(catalog, indices, tvg_ids=None, proxy=None, url_tvg=None):
+    """Zwracaj fragmenty tekstu M3U kanał po kanale (bez budowania całej playlisty w pamięci)."""
+    yield f'#EXTM3U url-tvg="{url_tvg}"\n' if url_tvg else "#EXTM3U\n"
+    proxy_line = f"#EXTVLCOPT:http-proxy={proxy}\n" if proxy else ""
+    names, urls, attrs, durations, options = catalog.names, catalog.urls, catalog.attrs, catalog.durations, catalog.options
+    for idx in indices:
+        flat = attrs[idx]
+        keys = flat[::2]
+        parts = [f' {key}="{value}"' for key, value in zip(keys, flat[1::2])]
+        if tvg_ids and "tvg-id" not in keys:
+            tvg_id = tvg_ids.get(names[idx])
+            if tvg_id:
+                parts.insert(0, f' tvg-id="{tvg_id}"')
+        if "group-title" not in keys:
+            parts.append(f' group-title="{catalog.group_of(idx)}"')
+        extra = "".join(f"#EXTVLCOPT:{option}\n" for option in options.get(idx, ()))
+        yield f"#EXTINF:{durations.get(idx, '-1')}{''.join(parts)},{names[idx]}\n{extra}{proxy_line}{urls[idx]}\n"
+
+# Funkcja do eksportu playlisty do pliku M3U
+def export_playlist(path, catalog, filters=None, enrich_tvg_id=False, proxy=None, url_tvg=None):
+    """Zapisz przefiltrowaną playlistę do pliku .m3u/.m3u8 strumieniowo (plik tymczasowy podmieniany na końcu).
+
+    Z enrich_tvg_id kanały bez tvg-id dostają identyfikator z dopasowania do EPG, liczonego raz na unikalną nazwę.
+    Zwraca statystyki: liczba kanałów, uzupełnione tvg-id, rozmiar i czas.
+    """
+    start = time.perf_counter()
+    tvg_ids = None
+    if enrich_tvg_id:
+        tvg_ids = match_epg_ids(catalog.names[idx] for idx in iter_export_indices(catalog, filters)
+                                if "tvg-id" not in catalog.attrs[idx][::2])
+    stats = {'channels': 0, 'enriched': sum(1 for tvg_id in (tvg_ids or {}).values() if tvg_id)}
+
+    def counted(indices):
+        for idx in indices:
+            stats['channels'] += 1
+            yield idx
+
+    stats['bytes'] = write_export_file(path, iter_m3u_lines(catalog, counted(iter_export_indices(catalog, filters)),
+                                                            tvg_ids, proxy, url_tvg))
+    stats['elapsed'] = time.perf_counter() - start
+    return stats
+
+# Funkcja do strumieniowego zapisu pliku eksportu
+def write_export_file(path, chunks, compress=False):
+    """Zapisz fragmenty tekstu do pliku tymczasowego (opcjonalnie gzip) i podmień nim plik docelowy; zwraca rozmiar."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    try:
+        if compress:
+            file = gzip.open(tmp_path, "wt", encoding="utf-8", newline="\n", compresslevel=EXPORT_GZIP_LEVEL)
+        else:
+            file = open(tmp_path, "w", encoding="utf-8", newline="\n", buffering=EXPORT_BUFFER_BYTES)
+        with file:
+            file.writelines(chunks)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return os.path.getsize(path)
+
+# Funkcja do formatowania czasu XMLTV
+def format_xmltv_time(timestamp, offset, cache):
+    """Zamień znacznik z xmltv_epoch z powrotem na czas XMLTV z przesunięciem strefy ze źródła (w minutach).
+
+    Wynik jest zapamiętywany w cache; czas i strefa są zapisywane dokładnie tak, jak podało je źródło.
+    """
+    key = (timestamp, offset)
+    text = cache.get(key)
+    if text is None:
+        sign = "-" if offset < 0 else "+"
+        text = time.strftime("%Y%m%d%H%M%S", time.gmtime(timestamp)) + f" {sign}{abs(offset) // 60:02}{abs(offset) % 60:02}"
+        cache[key] = text
+    return text
+
+# Funkcja do generowania fragmentów przewodnika XMLTV
+def iter_xmltv_chunks(data, channel_ids, window_start, window_end, stats):
+    """Zwracaj fragmenty XMLTV: nagłówek, kanały, a potem programy kanał po kanale z okna [window_start, window_end).
+
+    Program trafia do pliku, jeśli choć częściowo mieści się w oknie; początek okna wyznacza bisect na startach.
+    """
+    from xml.sax.saxutils import escape, quoteattr
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<tv generator-info-name="FastIPTV">\n'
+    channel_names = data.get('channel_names', {})
+    for channel_id in channel_ids:
+        names = "".join(f"    <display-name>{escape(name)}</display-name>\n"
+                        for name in channel_names.get(channel_id, ()) if name)
+        yield f"  <channel id={quoteattr(channel_id)}>\n{names}  </channel>\n"
+        stats['channels'] += 1
+    times = {}
+    titles = {}
+    for channel_id in channel_ids:
+        schedule = data.get(channel_id)
+        if not schedule:
+            continue
+        starts, stops, programme_titles = schedule['starts'], schedule['stops'], schedule['titles']
+        start_offsets, stop_offsets = schedule['start_offsets'], schedule['stop_offsets']
+        # Ostatni program zaczęty przed oknem może jeszcze trwać
+        first = max(bisect.bisect_right(starts, window_start) - 1, 0)
+        end = bisect.bisect_left(starts, window_end, first)
+        channel_attr = quoteattr(channel_id)
+        parts = []
+        for idx in range(first, end):
+            stop = stops[idx]
+            if stop <= window_start:
+                continue
+            title = programme_titles[idx]
+            escaped = titles.get(title)
+            if escaped is None:
+                escaped = titles[title] = escape(title)
+            parts.append(f'  <programme start="{format_xmltv_time(starts[idx], start_offsets[idx], times)}" '
+                         f'stop="{format_xmltv_time(stop, stop_offsets[idx], times)}" channel={channel_attr}>\n'
+                         f'    <title>{escaped}</title>\n  </programme>\n')
+        stats['programmes'] += len(parts)
+        yield "".join(parts)
+    yield "</tv>\n"
+
+# Funkcja do eksportu przewodnika XMLTV dla playlisty
+def export_xmltv(path, catalog, hours=None, filters=None, compress=None):
+    """Zapisz przewodnik XMLTV tylko z kanałami EPG dopasowanymi do kanałów playlisty i z najbliższych hours godzin.
+
+    Dane są pisane strumieniowo z zaindeksowanego EPG (jedna migawka danych i indeksu dopasowań);
+    plik .gz jest kompresowany, chyba że compress mówi inaczej. Zwraca statystyki eksportu.
+    """
+    start = time.perf_counter()
+    with EPG_LOCK:
+        loaded, data, index = EPG_LOADED, EPG_DATA, EPG_MATCH_INDEX
+    if not loaded:
+        raise RuntimeError("EPG nie jest załadowane")
+    if hours is None:
+        hours = EXPORT_XMLTV_HOURS
+    if compress is None:
+        compress = path.lower().endswith(".gz")
+    names = {catalog.names[idx] for idx in iter_export_indices(catalog, filters)}
+    matched = {match_channel_epg(name, index) for name in names}
+    # Kolejność kanałów jak w źródle EPG
+    channel_ids = [channel_id for channel_id in data.get('channel_names', {}) if channel_id in matched]
+    window_start = calendar.timegm(datetime.now().timetuple())
+    window_end = window_start + int(hours * 3600)
+    stats = {'names': len(names), 'channels': 0, 'programmes': 0,
+             'source_channels': len(data.get('channel_names', {})),
+             'source_programmes': sum(len(schedule['starts']) for key, schedule in data.items() if key != 'channel_names')}
+    stats['bytes'] = write_export_file(path, iter_xmltv_chunks(data, channel_ids, window_start, window_end, stats),
+                                       compress)
+    stats['hours'] = hours
+    stats['compressed'] = compress
+    stats['elapsed'] = time.perf_counter() - start
+    return stats
+
+# Funkcja do wyboru rodzaju eksportu
+def export_menu():
+    """Wyświetl menu eksportu."""
+    while True:
+        choice = display_menu(["Playlista M3U", "Przewodnik XMLTV", "Powrót"], "Eksport")
+        if choice is None or choice == 2:
+            return
+        if choice == 0:
+            export_playlist_menu()
+        elif choice == 1:
+            export_xmltv_menu()
+
+# Funkcja do eksportu playlisty z menu
+def export_playlist_menu():
+    """Zapytaj o filtry, uzupełnienie tvg-id i plik, a potem wyeksportuj załadowaną playlistę."""
+    if not PLAYLIST:
+        console.print("[error]Brak załadowanych playlist.[/error]")
+        wait_for_enter("Naciśnij Enter, aby wrócić...")
+        return
+    console.print("[info]Filtry oddzielone średnikiem, np.: group=Sport|Filmy; name!~xxx; health=ok; tvg-id=[/info]")
+    console.print("[info]Operatory: = != ~ (zawiera) !~ ^= (zaczyna się od). Puste - cała playlista.[/info]")
+    text = Prompt.ask("[bold cyan]Filtry[/bold cyan]", default="", show_default=False)
+    filters = [part for part in text.split(";") if part.strip()]
+    try:
+        for expression in filters:
+            parse_channel_filter(expression)
+    except ValueError as e:
+        console.print(f"[error]{e}[/error]")
+        wait_for_enter("Naciśnij Enter, aby wrócić...")
+        return
+    enrich = False
+    if EPG_LOADED:
+        enrich = Prompt.ask("[bold cyan]Uzupełnić brakujące tvg-id z EPG?[/bold cyan]", choices=["t", "n"], default="t") == "t"
+    proxy = None
+    if PROXY_URL:
+        if Prompt.ask(f"[bold cyan]Dodać proxy {PROXY_URL} do kanałów?[/bold cyan]", choices=["t", "n"], default="n") == "t":
+            proxy = PROXY_URL
+    default_path = os.path.join(resource_path(EXPORT_DIR), "export.m3u")
+    path = Prompt.ask("[bold cyan]Plik wynikowy (.m3u/.m3u8)[/bold cyan]", default=default_path)
+    try:
+        stats = export_playlist(path, PLAYLIST, filters, enrich, proxy)
+    except OSError as e:
+        logging.error(f"Błąd eksportu playlisty do {path}: {e}")
+        console.print(f"[error]Nie udało się zapisać pliku: {e}[/error]")
+    else:
+        console.print(f"[success]Zapisano {stats['channels']} kanałów do {path} "
+                      f"({stats['bytes'] / 1024 / 1024:.1f} MB, {stats['elapsed']:.2f} s).[/success]")
+        if enrich:
+            console.print(f"[info]Uzupełniono tvg-id dla {stats['enriched']} nazw kanałów.[/info]")
+    wait_for_enter("Naciśnij Enter, aby kontynuować...")
+
+# Funkcja do eksportu przewodnika XMLTV z menu
+def export_xmltv_menu():
+    """Zapytaj o okno czasowe i plik, a potem zapisz przewodnik XMLTV dla kanałów załadowanej playlisty."""
+    global EXPORT_XMLTV_HOURS
+    if not PLAYLIST:
+        console.print("[error]Brak załadowanych playlist.[/error]")
+        wait_for_enter("Naciśnij Enter, aby wrócić...")
+        return
+    if not EPG_LOADED:
+        console.print("[error]EPG nie jest załadowane. Użyj opcji 'Załaduj EPG'.[/error]")
+        wait_for_enter("Naciśnij Enter, aby wrócić...")
+        return
+    value = Prompt.ask("[bold cyan]Ile godzin przewodnika (od teraz)?[/bold cyan]", default=str(EXPORT_XMLTV_HOURS))
+    if not value.isdigit() or int(value) <= 0:
+        console.print("[error]Podaj dodatnią liczbę godzin.[/error]")
+        wait_for_enter("Naciśnij Enter, aby wrócić...")
+        return
+    hours = int(value)
+    if hours != EXPORT_XMLTV_HOURS:
+        EXPORT_XMLTV_HOURS = hours
+        save_config()
+    default_path = os.path.join(resource_path(EXPORT_DIR), "epg.xml.gz")
+    path = Prompt.ask("[bold cyan]Plik wynikowy (.xml lub .xml.gz - z kompresją)[/bold cyan]", default=default_path)
+    try:
+        stats = export_xmltv(path, PLAYLIST, hours)
+    except OSError as e:
+        logging.error(f"Błąd eksportu XMLTV do {path}: {e}")
+        console.print(f"[error]Nie udało się zapisać pliku: {e}[/error]")
+    else:
+        console.print(f"[success]Zapisano {stats['channels']} z {stats['source_channels']} kanałów EPG "
+                      f"i {stats['programmes']} z {stats['source_programmes']} programów do {path} "
+                      f"({stats['bytes'] / 1024:.0f} KB, {stats['elapsed']:.2f} s).[/success]")
+    wait_for_enter("Naciśnij Enter, aby kontynuować...")
+
+# Funkcja do wypisywania rekordów trybu wsadowego
+def cli_emit(record, output):
+    """Wypisz rekord jako linię NDJSON albo zbierz go do wspólnego dokumentu JSON (output['records'])."""
+    if output['records'] is not None:
+        output['records'].append(record)
+    else:
+        sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+# Funkcja do wczytywania playlisty w trybie wsadowym
+def cli_load_playlist(source, use_cache=True):
+    """Wczytaj playlistę z URL, pliku lub nazwy pliku w folderze playlists; zwraca (katalog, status)."""
+    if source in REMOTE_PLAYLISTS:
+        source = REMOTE_PLAYLISTS[source]
+    if source.lower().startswith(("http://", "https://")):
+        return fetch_remote_playlist(source), "network"
+    if not os.path.exists(source):
+        source = os.path.join(resource_path(PLAYLISTS_DIR), source)
+    if not use_cache:
+        return load_playlist(source), "przetworzono"
+    stats = {}
+    catalog = load_playlist_cached(source, stats)
+    return catalog, stats['status']
+
+# Funkcja do wybierania kanałów playlisty w trybie wsadowym
+def cli_select_channels(catalog, groups=None, limit=None):
+    """Zwróć identyfikatory kanałów z podanych grup (lub całej playlisty), najwyżej limit."""
+    if groups:
+        indices = [idx for group in groups for idx in catalog.group_view(group).indices]
+    else:
+        indices = range(len(catalog))
+    return list(indices[:limit] if limit else indices)
+
+# Funkcja do zamiany programu EPG na słownik JSON
+def programme_json(programme):
+    """Zwróć program (start, stop, title) z datami w formacie ISO 8601 lub None."""
+    if programme is None:
+        return None
+    return {'start': programme['start'].isoformat(), 'stop': programme['stop'].isoformat(),
+            'title': programme['title']}
+
+# Funkcja obsługująca polecenie "playlist parse"
+def cli_playlist_parse(args, output):
+    """Wczytaj playlistę (i zapisz jej cache); rekordy to grupy albo, z --channels, kanały."""
+    start = time.perf_counter()
+    catalog, status = cli_load_playlist(args.source, not args.no_cache)
+    elapsed = time.perf_counter() - start
+    if args.channels:
+        for idx in cli_select_channels(catalog, args.group):
+            record = catalog.record(idx)
+            record['id'] = idx
+            cli_emit(record, output)
+    else:
+        for group, count in catalog.groups():
+            cli_emit({'group': group, 'channels': count}, output)
+    return {'source': args.source, 'status': status, 'channels': len(catalog),
+            'groups': len(catalog.group_names), 'elapsed': round(elapsed, 3)}
+
+# Funkcja obsługująca polecenie "playlist export"
+def cli_playlist_export(args, output):
+    """Wyeksportuj przefiltrowaną playlistę, opcjonalnie po sprawdzeniu strumieni i z tvg-id z EPG."""
+    catalog, _ = cli_load_playlist(args.source)
+    for expression in args.filter or []:
+        parse_channel_filter(expression)
+    if args.tvg_id:
+        cli_load_epg(args.epg_source)
+    probed = None
+    if args.probe:
+        # Sprawdzane są kanały spełniające pozostałe warunki - filtr health= korzysta z tych wyników
+        filters = [expression for expression in args.filter or [] if parse_channel_filter(expression)[0] != "health"]
+        probed = probe_streams([(catalog.urls[idx], list(catalog.options.get(idx, ())))
+                                for idx in iter_export_indices(catalog, filters)], force=True)
+    stats = export_playlist(args.output, catalog, args.filter, args.tvg_id, PROXY_URL if args.with_proxy else None,
+                            args.url_tvg)
+    summary = dict(stats, path=args.output, source_channels=len(catalog), elapsed=round(stats['elapsed'], 3))
+    if probed is not None:
+        summary['probe'] = dict(probed, elapsed=round(probed['elapsed'], 3))
+    return summary
+
+# Funkcja obsługująca polecenie "epg fetch"
+def cli_epg_fetch(args, output):
+    """Pobierz źródła EPG (lub użyj aktualnego cache) i wypisz statystyki każdego źródła po jego ukończeniu.
+
+    Liczba nieudanych źródeł w podsumowaniu ('failed') decyduje o kodzie wyjścia (run_cli).
+    """
+    sources = args.source or list(EPG_SOURCES)
+    if not sources:
+        raise RuntimeError("Brak źródeł EPG - podaj --source lub skonfiguruj EPG w menu")
+    start = time.perf_counter()
+
+    def on_done(idx, data, stats):
+        cli_emit(dict(stats, source=sources[idx], channels=len(data.get('channel_names', {})),
+                      fetch_time=round(stats['fetch_time'], 3), parse_time=round(stats['parse_time'], 3)), output)
+
+    results = fetch_epg_sources(sources, on_done)
+    failed = sum(1 for data, _ in results if not data)
+    return {'sources': len(sources), 'failed': failed, 'elapsed': round(time.perf_counter() - start, 3),
+            'http': http_stats()}
+
+# Funkcja obsługująca polecenie "epg now"
+def cli_epg_now(args, output):
+    """Wczytaj EPG i wypisz aktualny i następny program kanałów z --channel (lub wszystkich kanałów playlisty)."""
+    if not args.channel and not args.playlist:
+        raise RuntimeError("Podaj --channel lub --playlist")
+    load_time, sources, failed = cli_load_epg(args.source)
+    names = list(args.channel or [])
+    if args.playlist:
+        catalog, _ = cli_load_playlist(args.playlist)
+        names += [catalog.names[idx] for idx in cli_select_channels(catalog, args.group)]
+    when = datetime.fromisoformat(args.at) if args.at else None
+    start = time.perf_counter()
+    matched = 0
+    for name, (current, upcoming) in zip(names, get_channels_epg(names, when)):
+        epg_id = match_channel_epg(name)
+        matched += epg_id is not None
+        cli_emit({'channel': name, 'epg_id': epg_id, 'now': programme_json(current), 'next': programme_json(upcoming)},
+                 output)
+    return {'channels': len(names), 'matched': matched, 'epg_channels': len(EPG_DATA.get('channel_names', {})),
+            'sources': sources, 'failed': failed, 'load_time': round(load_time, 3),
+            'lookup_time': round(time.perf_counter() - start, 3)}
+
+# Funkcja obsługująca polecenie "epg export"
+def cli_epg_export(args, output):
+    """Wczytaj playlistę i EPG, a potem zapisz przewodnik XMLTV tylko z dopasowanymi kanałami i oknem --hours."""
+    if args.hours is not None and args.hours <= 0:
+        raise RuntimeError("--hours musi być dodatnie")
+    catalog, _ = cli_load_playlist(args.source)
+    for expression in args.filter or []:
+        parse_channel_filter(expression)
+    load_time, sources, failed = cli_load_epg(args.epg_source)
+    stats = export_xmltv(args.output, catalog, args.hours, args.filter, True if args.gzip else None)
+    return dict(stats, path=args.output, sources=sources, failed=failed, load_time=round(load_time, 3),
+                elapsed=round(stats['elapsed'], 3))
+
+# Funkcja do wczytywania EPG w trybie wsadowym
+def cli_load_epg(sources=None):
+    """Wczytaj EPG (z cache lub sieci) ze źródeł lub z konfiguracji i zainstaluj je.
+
+    Zwraca (czas w sekundach, liczba źródeł, liczba nieudanych); gdy nie wczytało się żadne źródło, zgłasza błąd.
+    """
+    sources = sources or list(EPG_SOURCES)
+    if not sources:
+        raise RuntimeError("Brak źródeł EPG - podaj źródło lub skonfiguruj EPG w menu")
+    start = time.perf_counter()
+    loaded = [data for data, _ in fetch_epg_sources(sources) if data]
+    if not loaded:
+        raise RuntimeError(f"Nie udało się wczytać żadnego źródła EPG ({len(sources)})")
+    install_epg_data(merge_epg_data(loaded))
+    return time.perf_counter() - start, len(sources), len(sources) - len(loaded)
+
+# Funkcja obsługująca polecenie "proxies test"
+def cli_proxies_test(args, output):
+    """Przetestuj proxy ze źródeł (lub sprawdzone wcześniej z --known), zapisz wyniki w bazie i wypisz je."""
+    start = time.perf_counter()
+    source_stats = {}
+    if args.known:
+        results = run_proxy_tests(known_good_proxies(args.limit), args.max_working, concurrency=args.concurrency)
+    else:
+        source_names = args.source or list(ENABLED_PROXY_SOURCES)
+        results = run_proxy_tests([], args.max_working, concurrency=args.concurrency, source_names=source_names,
+                                  source_stats=source_stats)
+    record_proxy_results(results)
+    working = 0
+    for proxy, is_working, latency in results:
+        working += is_working
+        if is_working or not args.working:
+            cli_emit({'proxy': f"{proxy['ip']}:{proxy['port']}", 'working': is_working,
+                      'latency_ms': round(latency * 1000) if latency is not None else None,
+                      'country_code': proxy.get('country_code'), 'source': proxy.get('source')}, output)
+    sources = {name: {'fetched': stats['fetched'], 'new': stats['new'], 'working': stats['working'],
+                      'fetch_time': round(stats['fetch_time'], 3),
+                      'latency_p50_ms': round(latency_percentile(stats['latencies'], 50) * 1000)
+                      if stats['latencies'] else None}
+               for name, stats in source_stats.items()}
+    return {'tested': len(results), 'working': working, 'elapsed': round(time.perf_counter() - start, 3),
+            'sources': sources}
+
+# Funkcja obsługująca polecenie "streams probe"
+def cli_streams_probe(args, output):
+    """Sprawdź dostępność kanałów playlisty (całej lub wybranych grup) i wypisz stan każdego strumienia."""
+    catalog, _ = cli_load_playlist(args.source)
+    indices = cli_select_channels(catalog, args.group, args.limit)
+    summary = probe_streams([(catalog.urls[idx], list(catalog.options.get(idx, ()))) for idx in indices],
+                            force=args.force)
+    for idx in indices:
+        result = STREAM_HEALTH.get(catalog.urls[idx])
+        cli_emit({'id': idx, 'name': catalog.names[idx], 'group': catalog.group_of(idx), 'url': catalog.urls[idx],
+                  'alive': result['alive'], 'status': result['status'],
+                  'ttfb_ms': round(result['ttfb'] * 1000) if result['ttfb'] is not None else None,
+                  'content_type': result['content_type'], 'kind': result['kind'], 'error': result['error']}, output)
+    summary['elapsed'] = round(summary['elapsed'], 3)
+    return summary
+
+# Funkcja obsługująca polecenie "serve"
+def cli_serve(args, output):
+    """Wczytaj playlistę i EPG, uruchom serwer API i obsługuj zapytania do Ctrl+C."""
+    global PLAYLIST
+    if args.playlist:
+        PLAYLIST, _ = cli_load_playlist(args.playlist)
+        bump_state_version()
+    if args.epg or args.epg_source:
+        cli_load_epg(args.epg_source)
+    url = start_api_server(args.host, args.port)
+    cli_emit({'url': url, 'channels': len(PLAYLIST) if PLAYLIST is not None else 0,
+              'epg_channels': len(EPG_DATA.get('channel_names', {}))}, output)
+    start = time.perf_counter()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_api_server()
+    return {'url': url, 'uptime': round(time.perf_counter() - start, 3)}
+
+# Funkcja do budowania parsera poleceń trybu wsadowego
+def build_cli_parser():
+    """Zbuduj parser argumentów poleceń trybu wsadowego (bez menu i bez Rich)."""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="run.py", description="FastIPTV w trybie wsadowym. Bez argumentów uruchamia menu interaktywne.",
+        epilog="Rekordy są wypisywane jako NDJSON (jeden obiekt JSON na linię), a podsumowanie jako JSON na stderr.")
+    parser.add_argument("--json", action="store_true",
+                        help="wypisz jeden dokument JSON {records, summary} zamiast NDJSON")
+    parser.add_argument("--proxy", help="proxy IP:PORT dla strumieni (jak PROXY_URL w menu)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    playlist = commands.add_parser("playlist", help="playlisty M3U").add_subparsers(dest="action", required=True)
+    parse = playlist.add_parser("parse", help="wczytaj playlistę (plik, nazwa w playlists/ lub URL) i zapisz cache")
+    parse.add_argument("source")
+    parse.add_argument("--channels", action="store_true", help="wypisz kanały zamiast grup")
+    parse.add_argument("--group", action="append", help="tylko kanały z tej grupy (można powtarzać)")
+    parse.add_argument("--no-cache", action="store_true", help="przetwórz plik bez pamięci podręcznej")
+    parse.set_defaults(handler=cli_playlist_parse)
+    export = playlist.add_parser("export", help="zapisz przefiltrowaną playlistę do pliku .m3u/.m3u8")
+    export.add_argument("source", help="plik, nazwa w playlists/ lub URL playlisty")
+    export.add_argument("output", help="plik wynikowy")
+    export.add_argument("--filter", action="append",
+                        help="warunek pole op wartość, np. group=Sport|Filmy, name!~xxx, health=ok, tvg-id= (można powtarzać)")
+    export.add_argument("--tvg-id", action="store_true", help="uzupełnij brakujące tvg-id z dopasowania do EPG")
+    export.add_argument("--epg-source", action="append", help="adres źródła EPG dla --tvg-id (domyślnie z konfiguracji)")
+    export.add_argument("--probe", action="store_true", help="sprawdź strumienie przed eksportem (dla filtra health=)")
+    export.add_argument("--with-proxy", action="store_true", help="dodaj #EXTVLCOPT:http-proxy z opcji --proxy")
+    export.add_argument("--url-tvg", help="adres przewodnika EPG w nagłówku #EXTM3U")
+    export.set_defaults(handler=cli_playlist_export)
+
+    epg = commands.add_parser("epg", help="przewodnik EPG").add_subparsers(dest="action", required=True)
+    fetch = epg.add_parser("fetch", help="pobierz źródła EPG do pamięci podręcznej")
+    fetch.add_argument("--source", action="append", help="adres źródła (domyślnie źródła z konfiguracji)")
+    fetch.set_defaults(handler=cli_epg_fetch)
+    now = epg.add_parser("now", help="aktualny i następny program kanałów")
+    now.add_argument("--channel", action="append", help="nazwa kanału (można powtarzać)")
+    now.add_argument("--playlist", help="wszystkie kanały tej playlisty")
+    now.add_argument("--group", action="append", help="tylko kanały playlisty z tej grupy")
+    now.add_argument("--at", help="chwila w formacie ISO 8601 (domyślnie teraz)")
+    now.add_argument("--source", action="append", help="adres źródła EPG (domyślnie źródła z konfiguracji)")
+    now.set_defaults(handler=cli_epg_now)
+    xmltv = epg.add_parser("export", help="zapisz przewodnik XMLTV tylko z kanałami playlisty")
+    xmltv.add_argument("source", help="plik, nazwa w playlists/ lub URL playlisty")
+    xmltv.add_argument("output", help="plik wynikowy (.xml lub .xml.gz - z kompresją)")
+    xmltv.add_argument("--hours", type=float, help=f"okno czasowe od teraz w godzinach (domyślnie {EXPORT_XMLTV_HOURS})")
+    xmltv.add_argument("--filter", action="append", help="tylko kanały playlisty spełniające warunek (jak w playlist export)")
+    xmltv.add_argument("--gzip", action="store_true", help="kompresuj gzip niezależnie od rozszerzenia pliku")
+    xmltv.add_argument("--epg-source", action="append", help="adres źródła EPG (domyślnie źródła z konfiguracji)")
+    xmltv.set_defaults(handler=cli_epg_export)
+
+    proxies = commands.add_parser("proxies", help="proxy").add_subparsers(dest="action", required=True)
+    test = proxies.add_parser("test", help="pobierz i przetestuj proxy, wyniki zapisz w bazie proxy")
+    test.add_argument("--source", action="append", help="nazwa źródła (domyślnie włączone źródła)")
+    test.add_argument("--known", action="store_true", help="sprawdź tylko proxy z bazy, które kiedyś działały")
+    test.add_argument("--limit", type=int, help=f"ile proxy z bazy sprawdzić z --known (domyślnie {PROXY_DB_RETEST})")
+    test.add_argument("--max-working", type=int, help="zakończ po znalezieniu tylu działających proxy")
+    test.add_argument("--concurrency", type=int, help=f"liczba równoczesnych testów (domyślnie {PROXY_ASYNC_CONCURRENCY})")
+    test.add_argument("--working", action="store_true", help="wypisz tylko działające proxy")
+    test.set_defaults(handler=cli_proxies_test)
+
+    streams = commands.add_parser("streams", help="strumienie kanałów").add_subparsers(dest="action", required=True)
+    probe = streams.add_parser("probe", help="sprawdź dostępność kanałów playlisty")
+    probe.add_argument("source", help="plik, nazwa w playlists/ lub URL playlisty")
+    probe.add_argument("--group", action="append", help="tylko kanały z tej grupy (można powtarzać)")
+    probe.add_argument("--limit", type=int, help="sprawdź najwyżej tyle kanałów")
+    probe.add_argument("--force", action="store_true", help="sprawdź ponownie także kanały z aktualnym wynikiem")
+    probe.set_defaults(handler=cli_streams_probe)
+
+    serve = commands.add_parser("serve", help="lokalny serwer HTTP/JSON z danymi playlisty, EPG i proxy")
+    serve.add_argument("--playlist", help="playlista do udostępnienia (plik, nazwa w playlists/ lub URL)")
+    serve.add_argument("--epg", action="store_true", help="wczytaj EPG ze źródeł z konfiguracji")
+    serve.add_argument("--epg-source", action="append", help="adres źródła EPG (można powtarzać)")
+    serve.add_argument("--host", help=f"adres nasłuchu (domyślnie {API_HOST})")
+    serve.add_argument("--port", type=int, help=f"port (domyślnie {API_PORT}, 0 - dowolny wolny)")
+    serve.set_defaults(handler=cli_serve)
+    return parser
+
+# Funkcja uruchamiająca tryb wsadowy
+def run_cli(argv):
+    """Wykonaj polecenie trybu wsadowego; zwraca kod wyjścia.
+
+    0 - sukces, 1 - błąd (także gdy zawiodły wszystkie źródła), CLI_EXIT_PARTIAL - zawiodła część źródeł
+    (pole 'failed' podsumowania), 130 - przerwano.
+    """
+    global PROXY_URL
+    args = build_cli_parser().parse_args(argv)
+    if args.proxy:
+        PROXY_URL = args.proxy
+    output = {'records': [] if args.json else None}
+    try:
+        summary = args.handler(args, output)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        logging.exception(f"Błąd polecenia {' '.join(argv)}")
+        sys.stderr.write(json.dumps({'error': str(e)}, ensure_ascii=False) + "\n")
+        return 1
+    finally:
+        close_http_sessions()
+    if args.json:
+        sys.stdout.write(json.dumps({'records': output['records'], 'summary': summary}, ensure_ascii=False) + "\n")
+    else:
+        sys.stderr.write(json.dumps(summary, ensure_ascii=False) + "\n")
+    failed = summary.get('failed', 0)
+    if failed:
+        return 1 if failed >= summary.get('sources', failed) else CLI_EXIT_PARTIAL
+    return 0
+
+# Błąd zapytania API z kodem HTTP
+class APIError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# Funkcja do tworzenia klas serwera API
+def api_server_classes():
+    """Zwróć (klasa serwera, klasa obsługi zapytań) lokalnego API; http.server jest importowany przy pierwszym starcie."""
+    global API_SERVER_CLASSES
+    if API_SERVER_CLASSES is not None:
+        return API_SERVER_CLASSES
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    # Serwer tworzący wątek na każde połączenie (keep-alive, wielu klientów naraz)
+    class APIServer(ThreadingHTTPServer):
+        daemon_threads = True
+        allow_reuse_address = True
+        request_queue_size = 128  # Wielu klientów łączy się naraz (domyślne 5 gubi połączenia)
+
+        def handle_error(self, request, client_address):
+            logging.debug(f"API: błąd połączenia z {client_address}", exc_info=True)
+
+    # Obsługa zapytań GET do /api/...
+    class APIRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = "FastIPTV-API"
+        disable_nagle_algorithm = True  # Nagłówki i treść idą osobno - bez TCP_NODELAY klient czeka ~40 ms na ACK
+
+        def do_GET(self):
+            parts = urllib.parse.urlsplit(self.path)
+            params = urllib.parse.parse_qs(parts.query)
+            status, etag, body, gzipped = api_response(parts.path, params)
+            if etag and etag_matches(self.headers.get("If-None-Match"), etag):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            use_gzip = gzipped is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+            payload = gzipped if use_gzip else body
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Vary", "Accept-Encoding")
+            if etag:
+                self.send_header("ETag", etag)
+            if use_gzip:
+                self.send_header("Content-Encoding", "gzip")
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    API_SERVER_CLASSES = (APIServer, APIRequestHandler)
+    return API_SERVER_CLASSES
+
+# Funkcja do uruchamiania lokalnego serwera API
+def start_api_server(host=None, port=None):
+    """Uruchom serwer API w wątku w tle; zwraca adres serwera (działającego już lub nowego)."""
+    global API_SERVER
+    if API_SERVER is not None:
+        return api_server_url()
+    server_class, handler_class = api_server_classes()
+    API_SERVER = server_class((host or API_HOST, API_PORT if port is None else port), handler_class)
+    threading.Thread(target=API_SERVER.serve_forever, name="api-server", daemon=True).start()
+    logging.info(f"Serwer API działa pod adresem {api_server_url()}")
+    return api_server_url()
+
+# Funkcja do zatrzymywania serwera API
+def stop_api_server():
+    """Zatrzymaj serwer API i wyczyść pamięć podręczną odpowiedzi."""
+    global API_SERVER
+    if API_SERVER is None:
+        return
+    API_SERVER.shutdown()
+    API_SERVER.server_close()
+    API_SERVER = None
+    with API_CACHE_LOCK:
+        API_CACHE.clear()
+
+# Funkcja do wyznaczania adresu serwera API
+def api_server_url():
+    """Zwróć adres http://host:port działającego serwera API lub None."""
+    if API_SERVER is None:
+        return None
+    host, port = API_SERVER.server_address[:2]
+    return f"http://{host}:{port}"
+
+# Funkcja do budowania odpowiedzi API (z pamięcią podręczną)
+def api_response(path, params):
+    """Zwróć (status, ETag, treść JSON, treść gzip lub None) dla ścieżki i parametrów zapytania.
+
+    Odpowiedzi tras z wersją stanu są pamiętane do zmiany tej wersji (nowa playlista, więcej kanałów,
+    nowe EPG, kolejna minuta dla programów), więc powtarzane zapytania nie budują JSON ani gzip od nowa.
+    """
+    route = API_ROUTES.get(path.rstrip("/") or "/")
+    if route is None:
+        return api_encode(404, {'error': f"Nieznany adres {path}", 'routes': sorted(API_ROUTES)})
+    handler, versioned = route
+    version = api_state_version(versioned)
+    key = (path, tuple(sorted((name, tuple(values)) for name, values in params.items())))
+    if version is None:
+        return api_build_response(path, handler, params)
+    # Jeden wątek buduje brakującą odpowiedź, pozostali z tym samym zapytaniem czekają na jej wynik
+    with API_BUILD_LOCKS[hash(key) % len(API_BUILD_LOCKS)]:
+        with API_CACHE_LOCK:
+            cached = API_CACHE.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        response = api_build_response(path, handler, params)
+        if response[0] == 200:
+            with API_CACHE_LOCK:
+                API_CACHE.pop(key, None)
+                API_CACHE[key] = (version, response)
+                while len(API_CACHE) > API_CACHE_SIZE:
+                    del API_CACHE[next(iter(API_CACHE))]  # najdawniej dodana odpowiedź
+    return response
+
+# Funkcja do budowania odpowiedzi API z obsługą błędów
+def api_build_response(path, handler, params):
+    """Wywołaj funkcję trasy i zakoduj wynik; błędy zamieniane są na odpowiedzi 4xx/5xx."""
+    try:
+        return api_encode(200, handler(params))
+    except APIError as e:
+        return api_encode(e.status, {'error': str(e)})
+    except Exception as e:
+        logging.exception(f"Błąd API {path}")
+        return api_encode(500, {'error': str(e)})
+
+# Funkcja do oznaczania zmiany danych playlisty lub EPG
+def bump_state_version():
+    """Zwiększ STATE_VERSION; wywoływana po (nie przed) podmianie lub zmianie PLAYLIST albo EPG_DATA."""
+    global STATE_VERSION
+    with STATE_VERSION_LOCK:
+        STATE_VERSION += 1
+
+# Funkcja do wyznaczania wersji stanu, od którego zależy odpowiedź
+def api_state_version(versioned):
+    """Zwróć krotkę opisującą stan danych trasy ('playlist' lub 'epg') albo None, gdy odpowiedź nie jest pamiętana."""
+    if versioned is None:
+        return None
+    catalog = PLAYLIST
+    # Liczba kanałów obejmuje też kanały dopisane przez wątek ładujący między kolejnymi bump_state_version
+    version = (STATE_VERSION, len(catalog) if catalog is not None else 0)
+    if versioned == "epg":
+        # Aktualny program zmienia się w czasie - odpowiedź ważna najwyżej do końca minuty
+        version += (int(time.time() // 60),)
+    return version
+
+# Funkcja do porównywania ETag z nagłówkiem If-None-Match
+def etag_matches(header, etag):
+    """Czy If-None-Match (lista tagów po przecinku lub '*') zawiera etag; prefiks słabego tagu W/ jest pomijany."""
+    if not header:
+        return False
+    for value in header.split(","):
+        value = value.strip()
+        if value.startswith("W/"):
+            value = value[2:]
+        if value == "*" or value == etag:
+            return True
+    return False
+
+# Funkcja do kodowania odpowiedzi API
+def api_encode(status, payload):
+    """Zakoduj odpowiedź jako JSON (oraz gzip dla większych treści) z ETag liczonym z treści."""
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"' if status == 200 else None
+    gzipped = gzip.compress(body, API_GZIP_LEVEL) if len(body) >= API_GZIP_MIN_BYTES else None
+    return status, etag, body, gzipped
+
+# Funkcja do odczytu parametru liczbowego zapytania API
+def api_int_param(params, name, default, maximum=None):
+    """Zwróć parametr liczbowy (nieujemny, najwyżej maximum) lub zgłoś APIError 400."""
+    try:
+        value = int(params.get(name, [default])[0])
+    except ValueError:
+        raise APIError(400, f"Parametr {name} musi być liczbą")
+    if value < 0:
+        raise APIError(400, f"Parametr {name} nie może być ujemny")
+    return min(value, maximum) if maximum else value
+
+# Funkcja do pobrania załadowanej playlisty dla API
+def api_catalog():
+    """Zwróć załadowany katalog kanałów lub zgłoś APIError 503."""
+    catalog = PLAYLIST
+    if catalog is None:
+        raise APIError(503, "Brak załadowanej playlisty")
+    return catalog
+
+# Funkcja do zamiany kanału na słownik API
+def api_channel_record(catalog, idx):
+    """Zwróć kanał jako rekord iter_playlist z identyfikatorem."""
+    record = catalog.record(idx)
+    record['id'] = idx
+    return record
+
+# Funkcja obsługująca /api/groups
+def api_groups(params):
+    """Grupy playlisty z liczbą kanałów."""
+    return {'groups': [{'name': name, 'channels': count} for name, count in api_catalog().groups()]}
+
+# Funkcja obsługująca /api/channels
+def api_channels(params):
+    """Kanały grupy (?group=) lub całej playlisty, stronicowane ?offset= i ?limit=."""
+    catalog = api_catalog()
+    offset = api_int_param(params, 'offset', 0)
+    limit = api_int_param(params, 'limit', API_DEFAULT_LIMIT, API_MAX_LIMIT)
+    if 'group' in params:
+        group = params['group'][0]
+        if group not in catalog.group_lookup:
+            raise APIError(404, f"Nieznana grupa {group}")
+        indices = catalog.group_view(group).indices
+    else:
+        indices = range(len(catalog))
+    return {'total': len(indices), 'offset': offset,
+            'channels': [api_channel_record(catalog, idx) for idx in indices[offset:offset + limit]]}
+
+# Funkcja obsługująca /api/channel
+def api_channel(params):
+    """Jeden kanał (?id=) wraz ze źródłami, z których pochodzi."""
+    catalog = api_catalog()
+    if 'id' not in params:
+        raise APIError(400, "Brak parametru id")
+    idx = api_int_param(params, 'id', 0)
+    if idx >= len(catalog):
+        raise APIError(404, f"Nieznany kanał {idx}")
+    record = api_channel_record(catalog, idx)
+    record['sources'] = catalog.sources_of(idx)
+    return record
+
+# Funkcja obsługująca /api/search
+def api_search(params):
+    """Wyszukiwanie kanałów po nazwie (?q=, ?limit=, ?fuzzy=0 wyłącza wyniki przybliżone)."""
+    catalog = api_catalog()
+    query = params.get('q', [""])[0].strip()
+    if not query:
+        raise APIError(400, "Brak parametru q")
+    limit = api_int_param(params, 'limit', API_DEFAULT_LIMIT, API_MAX_LIMIT)
+    fuzzy = params.get('fuzzy', ["1"])[0] != "0"
+    results = []
+    for idx, rank in catalog.search(query, limit, fuzzy):
+        record = api_channel_record(catalog, idx)
+        record['rank'] = rank
+        results.append(record)
+    return {'query': query, 'results': results}
+
+# Funkcja obsługująca /api/epg/now
+def api_epg_now(params):
+    """Aktualny i następny program kanałów: ?channel= (nazwa, można powtarzać), ?id= lub ?group=, stronicowane jak kanały."""
+    names = list(params.get('channel', []))
+    if 'id' in params or 'group' in params:
+        catalog = api_catalog()
+        for value in params.get('id', []):
+            if not value.isdigit() or int(value) >= len(catalog):
+                raise APIError(404, f"Nieznany kanał {value}")
+            names.append(catalog.names[int(value)])
+        for group in params.get('group', []):
+            if group not in catalog.group_lookup:
+                raise APIError(404, f"Nieznana grupa {group}")
+            names += [catalog.names[idx] for idx in catalog.group_view(group).indices]
+    if not names:
+        raise APIError(400, "Podaj channel, id lub group")
+    total = len(names)
+    offset = api_int_param(params, 'offset', 0)
+    names = names[offset:offset + api_int_param(params, 'limit', API_DEFAULT_LIMIT, API_MAX_LIMIT)]
+    # Jedna migawka (flaga, dane, indeks) dla całej odpowiedzi - wątek ładujący może ją podmienić w trakcie
+    with EPG_LOCK:
+        loaded, data, index = EPG_LOADED, EPG_DATA, EPG_MATCH_INDEX
+    timestamp = calendar.timegm(datetime.now().timetuple())
+    channels = []
+    for name in names:
+        current, upcoming = channel_epg_at(name, timestamp, data, index) if loaded else (None, None)
+        channels.append({'channel': name, 'epg_id': match_channel_epg(name, index) if loaded else None,
+                         'now': programme_json(current), 'next': programme_json(upcoming)})
+    return {'loaded': loaded, 'total': total, 'offset': offset, 'channels': channels}
+
+# Funkcja obsługująca /api/proxy
+def api_proxy(params):
+    """Aktywne proxy i stan monitora (ostatnie sprawdzenie, pula zapasowa, zdarzenia)."""
+    status = PROXY_MONITOR_STATUS
+    thread = status['thread']
+    with PROXY_MONITOR_LOCK:
+        standby = list(status['standby'].items())
+        events = list(status['events'])
+    return {
+        'proxy': PROXY_URL,
+        'monitor_running': thread is not None and thread.is_alive(),
+        'last_check': status['last_check'],
+        'latency_ms': round(status['latency'] * 1000) if status['latency'] is not None else None,
+        'failures': status['failures'],
+        'standby': [{'proxy': proxy_url, 'connect_ms': round(latency * 1000) if latency is not None else None}
+                    for proxy_url, latency in standby],
+        'events': [{'time': timestamp, 'message': message} for timestamp, message in events],
+    }
+
+# Funkcja obsługująca /api/status
+def api_status(params):
+    """Stan playlisty, EPG i ładowania w tle."""
+    catalog = PLAYLIST
+    epg_data = EPG_DATA
+    return {
+        'playlist': {'channels': len(catalog) if catalog is not None else 0,
+                     'groups': len(catalog.group_names) if catalog is not None else 0,
+                     'loading': dict(PLAYLIST_LOAD_STATUS)},
+        'epg': {'loaded': EPG_LOADED, 'channels': len(epg_data.get('channel_names', {})),
+                'loading': EPG_LOAD_STATUS['running']},
+        'proxy': PROXY_URL,
+    }
+
+# Trasy API: ścieżka -> (funkcja, rodzaj wersji stanu do pamięci podręcznej lub None)
+API_ROUTES = {
+    '/api/groups': (api_groups, "playlist"),
+    '/api/channels': (api_channels, "playlist"),
+    '/api/channel': (api_channel, "playlist"),
+    '/api/search': (api_search, "playlist"),
+    '/api/epg/now': (api_epg_now, "epg"),
+    '/api/proxy': (api_proxy, None),
+    '/api/status': (api_status, None),
+}
+
+# Funkcja do włączania i wyłączania serwera API z menu
+def api_server_menu():
+    """Uruchom lub zatrzymaj lokalny serwer API."""
+    if API_SERVER is not None:
+        url = api_server_url()
+        stop_api_server()
+        console.print(f"[info]Zatrzymano serwer API ({url}).[/info]")
+    else:
+        try:
+            url = start_api_server()
+        except OSError as e:
+            logging.error(f"Nie udało się uruchomić serwera API: {e}")
+            console.print(f"[error]Nie udało się uruchomić serwera API na porcie {API_PORT}: {e}[/error]")
+        else:
+            console.print(f"[success]Serwer API działa: {url}/api/status[/success]")
+            console.print(f"[info]Adresy: {', '.join(sorted(API_ROUTES))}[/info]")
+    wait_for_enter("Naciśnij Enter, aby kontynuować...")
+
+# Załaduj konfigurację przy starcie (bez ładowania EPG)
+load_config()
+
+# Funkcja startowa programu
+def main(argv):
+    """Wykonaj polecenie trybu wsadowego (gdy podano argumenty) albo pokaż menu główne; zwraca kod wyjścia."""
+    if argv:
+        return run_cli(argv)
+    try:
+        if EPG_AUTOLOAD and EPG_SOURCES:
+            start_epg_background_load(list(EPG_SOURCES))
+        main_menu()
+    except Exception as e:
+        logging.exception("Wystąpił błąd")
+        console.print(f"[error]Wystąpił błąd: {e}. Szczegóły zapisano do pliku 'error.log'.[/error]")
+        wait_for_enter("Naciśnij Enter, aby zakończyć...")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))